@@ -1,13 +1,16 @@
+import logging
 from flask_smorest import Api
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
+from app.serializers import OrjsonProvider
 
 load_dotenv()
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # Configure CORS
     CORS(app, supports_credentials=True, origins=["http://localhost:3000",
@@ -44,5 +47,11 @@ def create_app():
     with app.app_context():
         from app.db import init_db
         init_db()
+        from app.logic import load_card_names
+        try:
+            load_card_names()
+        except Exception as error:
+            # not fatal: /api/cards/suggest loads it on first use
+            logging.getLogger(__name__).warning(f"Card name index not loaded at startup: {error}")
 
     return app
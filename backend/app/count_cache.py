@@ -0,0 +1,66 @@
+import os
+import time
+import threading
+
+# Seconds a cached count is trusted. Writes made through app.crud invalidate
+# the cache at once; the TTL bounds staleness from writers in other processes.
+CARD_COUNT_CACHE_TTL = float(os.getenv("CARD_COUNT_CACHE_TTL", "60"))
+# "exact" always counts; "approximate" uses planner estimates on PostgreSQL
+# for result sets of at least CARD_COUNT_ESTIMATE_MIN rows.
+CARD_COUNT_MODE = os.getenv("CARD_COUNT_MODE", "exact")
+CARD_COUNT_ESTIMATE_MIN = int(os.getenv("CARD_COUNT_ESTIMATE_MIN", "10000"))
+CARD_COUNT_CACHE_SIZE = int(os.getenv("CARD_COUNT_CACHE_SIZE", "1024"))
+
+
+class CountCache:
+    """
+    Thread-safe cache of row counts keyed by a normalized filter.
+
+    invalidate() drops every entry and bumps a generation counter. A count
+    computed while a write was committing is not stored, since it may
+    predate the write.
+    """
+
+    def __init__(self, ttl: float = CARD_COUNT_CACHE_TTL, max_entries: int = CARD_COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, tuple[float, int, bool]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: tuple, compute) -> tuple[int, bool]:
+        """
+        Return (count, approximate) for `key`, calling compute() (which
+        returns the same pair) on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            generation = self._generation
+        count, approximate = compute()
+        if self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    if len(self._entries) >= self.max_entries and key not in self._entries:
+                        # filters are user input; drop the oldest entry
+                        self._entries.pop(next(iter(self._entries)))
+                    self._entries[key] = (time.monotonic() + self.ttl, count, approximate)
+        return count, approximate
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+card_counts = CountCache()
@@ -1,9 +1,15 @@
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update, insert, delete, func
-from app.models import Card, User, GoogleUser, LinkGoogle, Deck, DeckCard
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import select, update, insert, delete, func, case, cast, or_, tuple_, JSON, Text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import Card, User, GoogleUser, LinkGoogle, Deck, DeckCard, ImportJob, CARD_FIELD_COLUMNS
+from app.count_cache import card_counts, CARD_COUNT_MODE, CARD_COUNT_ESTIMATE_MIN
+from app.search import SEARCH_MIN_CHARS, search_backend, fts_hits
+from app.suggest import card_names
+from app.response_cache import catalog_responses
 import uuid
 import logging
+from datetime import datetime, UTC
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -12,25 +18,328 @@ def create_card(db: Session, **kwargs) -> Card:
         insert(Card).values(kwargs).returning(Card)
     )
     result = db.execute(stmt).scalars().first()
+    written = _suggestion_entries([result])
     db.commit()
+    _cards_written(written)
     return result
 
 
-def list_cards(db: Session, page: int, type_filter: str | None, pokemon_name: str | None, count_per_page: int = 12):
+def _suggestion_entries(cards) -> list[tuple]:
+    # read before commit expires them, which would cost a SELECT per card
+    return [(card.id, card.name, card.collector_number) for card in cards if card is not None]
+
+
+def _cards_written(entries: list[tuple] = ()):
+    """Bring the count and response caches and the autocomplete index up to date after a commit."""
+    card_counts.invalidate()
+    catalog_responses.invalidate()
+    for entry in entries:
+        card_names.put(*entry)
+
+
+def _write_rows_individually(db: Session, stmt, rows: list[dict]) -> list[tuple]:
+    # One savepoint per row, so a bad row only rolls back itself.
+    outcomes = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                card = db.scalars(stmt, [row]).first()
+            outcomes.append((card, None))
+        except Exception as error:
+            outcomes.append((None, error))
+    db.commit()
+    return outcomes
+
+
+# Natural key of a card; backed by the uq_card_set_collector unique index.
+CARD_KEY = ("set_code", "collector_number")
+
+
+def upsert_cards(db: Session, payloads: list[dict], batch_size: int = 500) -> list[tuple]:
+    """
+    Create or update cards keyed on (set_code, collector_number) with
+    INSERT ... ON CONFLICT DO UPDATE. Payloads in a batch must share the
+    same keys.
+
+    Rows identical to the stored card are not written at all, so repeating
+    an import costs one SELECT per batch. Returns one (card, action, error)
+    tuple per payload, in payload order, where action is "created",
+    "updated" or "unchanged" (None when the row failed).
+    """
+    outcomes = []
+    # Keep the returned rows loaded across commits; refreshing them would
+    # cost a SELECT per card.
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        for offset in range(0, len(payloads), batch_size):
+            outcomes.extend(_upsert_card_batch(db, payloads[offset:offset + batch_size]))
+    finally:
+        db.expire_on_commit = expire_on_commit
+        written = [card for card, action, _ in outcomes if action in ("created", "updated")]
+        if written:
+            _cards_written(_suggestion_entries(written))
+    return outcomes
+
+
+def _card_key(card) -> tuple | None:
+    values = tuple(card[k] if isinstance(card, dict) else getattr(card, k) for k in CARD_KEY)
+    # NULLs never conflict, so keyless rows are always inserted
+    return None if None in values else values
+
+
+def _card_matches(card: Card, row: dict) -> bool:
+    return all(getattr(card, column) == value for column, value in row.items())
+
+
+def _upsert_card_batch(db: Session, batch: list[dict]) -> list[tuple]:
+    keys = [_card_key(row) for row in batch]
+    known = [key for key in keys if key is not None]
+    existing = {}
+    if known:
+        stmt = select(Card).where(tuple_(*(getattr(Card, k) for k in CARD_KEY)).in_(set(known)))
+        existing = {_card_key(card): card for card in db.scalars(stmt)}
+
+    # A key repeated within the batch is written once, with its last payload;
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    last = {key: i for i, key in enumerate(keys) if key is not None}
+    writes = [i for i, (row, key) in enumerate(zip(batch, keys))
+              if key is None or (last[key] == i and not (
+                  key in existing and _card_matches(existing[key], row)))]
+
+    # Keyed rows go through ON CONFLICT, which may skip some, so their
+    # returned cards are matched back by key. Keyless rows never conflict;
+    # a plain INSERT returns them in parameter order.
+    statements = []
+    keyed = [i for i in writes if keys[i] is not None]
+    if keyed:
+        statements.append((_upsert_statement(db, batch[0].keys()), keyed, True))
+    keyless = [i for i in writes if keys[i] is None]
+    if keyless:
+        statements.append((insert(Card).returning(Card, sort_by_parameter_order=True), keyless, False))
+
+    written = {}
+    try:
+        for stmt, indexes, match_by_key in statements:
+            cards = db.scalars(stmt, [batch[i] for i in indexes]).all()
+            if match_by_key:
+                by_key = {_card_key(card): card for card in cards}
+                written.update((i, (by_key[keys[i]], None)) for i in indexes if keys[i] in by_key)
+            else:
+                written.update((i, (card, None)) for i, card in zip(indexes, cards))
+        db.commit()
+    except Exception as error:
+        db.rollback()
+        logger.warning(f"Bulk upsert of {len(writes)} cards failed, retrying row by row: {error}")
+        written = {}
+        for stmt, indexes, _ in statements:
+            outcomes = _write_rows_individually(db, stmt, [batch[i] for i in indexes])
+            written.update(zip(indexes, outcomes))
+
+    results = []
+    for i, key in enumerate(keys):
+        source = i if key is None else last[key]
+        card, error = written.get(source, (None, None))
+        if error is not None:
+            results.append((None, None, error))
+        elif card is not None:
+            results.append((card, "updated" if key in existing else "created", None))
+        elif key in existing:
+            # not written: identical to the stored card, or skipped by the
+            # WHERE clause because a concurrent writer already stored it
+            results.append((existing[key], "unchanged", None))
+        else:
+            results.append((None, None, RuntimeError("Card upsert returned no row")))
+    return results
+
+
+def _upsert_statement(db: Session, columns):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(Card)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(Card)
+    else:
+        raise NotImplementedError(f"Card upserts are not supported on {dialect}")
+
+    table = Card.__table__
+    updates = [c for c in columns if c not in CARD_KEY]
+
+    def comparable(column):
+        # json has no equality operator on PostgreSQL; compare its text form
+        return cast(column, Text) if isinstance(column.type, JSON) else column
+
+    changed = or_(*(comparable(table.c[c]).is_distinct_from(comparable(stmt.excluded[c]))
+                    for c in updates))
+    return (
+        stmt.on_conflict_do_update(
+            index_elements=list(CARD_KEY),
+            set_={c: stmt.excluded[c] for c in updates},
+            where=changed,
+        )
+        .returning(Card)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _card_filters(db: Session, type_filter: str | None, pokemon_name: str | None) -> list:
     filters = []
     if type_filter:
         filters.append(Card.type == type_filter.capitalize())
     if pokemon_name:
-        filters.append(Card.name.ilike(f"%{pokemon_name}%"))
+        backend = _name_search_backend(db, pokemon_name)
+        if backend == "fts5":
+            hits = fts_hits(Card.__table__, pokemon_name)
+            filters.append(Card.id.in_(select(hits.c.card_id)))
+        else:
+            # pg_trgm's GIN index serves this on PostgreSQL
+            filters.append(Card.name.icontains(pokemon_name, autoescape=True))
+    return filters
+
+
+def _name_search_backend(db: Session, pokemon_name: str) -> str | None:
+    if len(pokemon_name) < SEARCH_MIN_CHARS:
+        return None
+    return search_backend(db.connection(), Card.__table__)
+
+
+def _search_cards(db: Session, stmt, pokemon_name: str):
+    """
+    Restrict `stmt` to cards whose name contains `pokemon_name`, most
+    relevant first: exact names, then prefixes, then by the search
+    backend's score (bm25 on SQLite, trigram similarity on PostgreSQL).
+    """
+    backend = _name_search_backend(db, pokemon_name)
+    lowered = pokemon_name.lower()
+    order = [(func.lower(Card.name) == lowered).desc(),
+             func.lower(Card.name).startswith(lowered, autoescape=True).desc()]
+    if backend == "fts5":
+        hits = fts_hits(Card.__table__, pokemon_name)
+        stmt = stmt.join(hits, hits.c.card_id == Card.id)
+        order.append(hits.c.rank.asc())
+    else:
+        stmt = stmt.where(Card.name.icontains(pokemon_name, autoescape=True))
+        if backend == "trgm":
+            order.append(func.similarity(Card.name, pokemon_name).desc())
+    return stmt.order_by(*order)
+
+
+def _catalog_order():
+    # Numbered cards first, by number; id breaks ties so the order is total
+    return (Card.collector_number.asc().nulls_last(), Card.id.asc())
+
+
+def _only_fields(stmt, fields, *columns):
+    """
+    Load just the columns behind `fields` (to_dict keys), plus `columns`;
+    anything else raises on access instead of lazy-loading per row.
+    """
+    if fields is None:
+        return stmt
+    wanted = sorted({c for field in fields for c in CARD_FIELD_COLUMNS[field]} | set(columns))
+    return stmt.options(load_only(*(getattr(Card, c) for c in wanted), raiseload=True))
+
+
+def list_cards(db: Session, page: int, type_filter: str | None, pokemon_name: str | None, count_per_page: int = 12,
+               fields: list[str] | None = None):
+    total_count, _ = count_cards(db, type_filter, pokemon_name)
+    stmt = _only_fields(select(Card), fields).where(*_card_filters(db, type_filter, None))
+    if pokemon_name:
+        stmt = _search_cards(db, stmt, pokemon_name)
+    stmt = stmt.order_by(*_catalog_order()).limit(count_per_page).offset((page-1)*count_per_page)
+    result = db.execute(stmt).scalars().all()
+    return result, total_count
 
-    count_stmt = select(func.count(Card.id).filter(*filters))
-    total_count = db.execute(count_stmt).scalar()
+
+def list_cards_named(db: Session, page: int, type_filter: str | None, names: list[str],
+                     count_per_page: int = 12, fields: list[str] | None = None):
+    """
+    Like list_cards, for cards whose name is exactly one of `names`, in
+    the order the names are given. Used for fuzzy-search fallbacks, so
+    the count is not cached.
+    """
+    filters = [*_card_filters(db, type_filter, None), Card.name.in_(names)]
+    total_count = db.execute(select(func.count(Card.id).filter(*filters))).scalar()
+    rank = case({name: i for i, name in enumerate(names)}, value=Card.name)
     stmt = (
-        select(Card).where(*filters).order_by(Card.collector_number.asc()).limit(
-            count_per_page).offset((page-1)*count_per_page)
+        _only_fields(select(Card), fields).where(*filters).order_by(rank, *_catalog_order())
+        .limit(count_per_page).offset((page-1)*count_per_page)
     )
-    result = db.execute(stmt).scalars().all()
-    return result, total_count
+    return db.execute(stmt).scalars().all(), total_count
+
+
+def count_cards(db: Session, type_filter: str | None, pokemon_name: str | None,
+                mode: str | None = None) -> tuple[int, bool]:
+    """
+    Number of cards matching the list filters, as (count, approximate).
+
+    Counts are cached per normalized filter until the next card write. In
+    "approximate" mode (CARD_COUNT_MODE) PostgreSQL's planner estimate is
+    used instead of counting when it is at least CARD_COUNT_ESTIMATE_MIN
+    rows; smaller sets are cheap to count and poorly estimated.
+    """
+    mode = mode or CARD_COUNT_MODE
+    key = (Card.__tablename__, mode, (type_filter or "").capitalize() or None,
+           (pokemon_name or "").lower() or None)
+
+    def compute():
+        filters = _card_filters(db, type_filter, pokemon_name)
+        if mode == "approximate" and db.get_bind().dialect.name == "postgresql":
+            estimate = _estimate_rows(db, select(Card.id).where(*filters))
+            if estimate >= CARD_COUNT_ESTIMATE_MIN:
+                return estimate, True
+        return db.execute(select(func.count(Card.id).filter(*filters))).scalar(), False
+
+    return card_counts.get_or_compute(key, compute)
+
+
+def _estimate_rows(db: Session, stmt) -> int:
+    # Planner statistics, as kept fresh by autovacuum/ANALYZE; no rows are read.
+    # The statement goes to the driver as compiled, with its own parameters,
+    # so user input is never spliced into the SQL or parsed by text().
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def list_cards_after(db: Session, after: tuple | None, type_filter: str | None,
+                     pokemon_name: str | None, count_per_page: int = 12,
+                     fields: list[str] | None = None):
+    """
+    Keyset page of the catalog: up to `count_per_page` cards following
+    `after`, the (collector_number, id) of the last card already shown
+    (None for the first page), in the same order as list_cards.
+
+    Each page is a seek on the (collector_number, id) index, so it costs
+    the same however deep it is. Cards without a number come last; they
+    are read by a second seek on id once the numbered cards run out.
+    Name searches are filtered the same way but not ranked by relevance.
+    With `fields`, collector_number is always loaded for the next cursor.
+    """
+    filters = _card_filters(db, type_filter, pokemon_name)
+    number, card_id = after if after else (None, None)
+    cards = []
+    if after is None or number is not None:
+        stmt = _only_fields(select(Card), fields, "collector_number").where(
+            *filters, Card.collector_number.is_not(None))
+        if after is not None:
+            stmt = stmt.where(tuple_(Card.collector_number, Card.id) > (number, _card_id(card_id)))
+        stmt = stmt.order_by(*_catalog_order()).limit(count_per_page)
+        cards = list(db.execute(stmt).scalars())
+        card_id = None
+    remaining = count_per_page - len(cards)
+    if remaining > 0:
+        stmt = _only_fields(select(Card), fields, "collector_number").where(
+            *filters, Card.collector_number.is_(None))
+        if card_id is not None:
+            stmt = stmt.where(Card.id > _card_id(card_id))
+        cards.extend(db.execute(stmt.order_by(Card.id.asc()).limit(remaining)).scalars())
+    return cards
+
+
+def _card_id(value):
+    # cursors carry ids as text; bind them as the column's Python type
+    return Card.id.type.python_type(value)
 
 
 def get_card_by_id(db: Session, id: int):
@@ -41,7 +350,9 @@ def get_card_by_id(db: Session, id: int):
 def update_card(db: Session, id: int, **kwargs):
     stmt = (update(Card).where(Card.id == id).values(**kwargs).returning(Card))
     result = db.execute(stmt).scalar_one_or_none()
+    written = _suggestion_entries([result])
     db.commit()
+    _cards_written(written)
     return result
 
 
@@ -49,9 +360,50 @@ def delete_card(db: Session, id: int):
     stmt = (delete(Card).where(Card.id == id).returning(Card))
     result = db.execute(stmt).scalar_one_or_none()
     db.commit()
+    _cards_written()
+    if result is not None:
+        card_names.remove(id)
     return result
 
 
+DERIVED_CARD_INPUTS = ("id", "type", "hp", "attack_1_dmg", "attack_1_cost", "attack_2_dmg",
+                       "attack_2_cost", "retreat_cost", "rarity", "base_stat_total")
+
+
+def card_name_rows(db: Session):
+    """(id, name, collector_number) of every card, for the autocomplete index."""
+    return db.execute(select(Card.id, Card.name, Card.collector_number)).all()
+
+
+def card_name_signature(db: Session) -> tuple:
+    """Cheap probe that changes when cards are added or removed, by any process."""
+    return tuple(db.execute(select(func.count(Card.id), func.max(Card.created_at))).one())
+
+
+def card_derivation_inputs(db: Session, after_id=None, limit: int = 1000):
+    """
+    The next `limit` cards (by id, after `after_id`) as plain rows holding
+    the stored values derived fields are computed from, and their current
+    derived values.
+    """
+    stmt = select(*(getattr(Card, c) for c in DERIVED_CARD_INPUTS)).order_by(Card.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Card.id > after_id)
+    return db.execute(stmt).all()
+
+
+def bulk_update_cards(db: Session, changes: list[dict]) -> int:
+    """Apply [{"id": ..., column: value, ...}, ...] as one executemany UPDATE by id."""
+    if not changes:
+        return 0
+    db.execute(update(Card), changes)
+    db.commit()
+    _cards_written()
+    if any("name" in change or "collector_number" in change for change in changes):
+        card_names.reset()  # reloaded from the table on next use
+    return len(changes)
+
+
 def create_user(db: Session, **kwargs) -> User:
     stmt = (insert(User).values(kwargs).returning(User))
     result = db.execute(stmt).scalars().first()
@@ -278,3 +630,51 @@ def replace_deck_cards(db: Session, deck_id: uuid.UUID, card_ids: list[uuid.UUID
     )
     result = db.execute(stmt).scalars().all()
     return result
+
+
+def create_import_job(db: Session, **kwargs) -> ImportJob:
+    stmt = insert(ImportJob).values(kwargs).returning(ImportJob)
+    result = db.execute(stmt).scalars().first()
+    db.commit()
+    return result
+
+
+def get_import_job(db: Session, id: uuid.UUID):
+    stmt = select(ImportJob).where(ImportJob.id == id)
+    result = db.execute(stmt).scalar_one_or_none()
+    return result
+
+
+def update_import_job(db: Session, id: uuid.UUID, **kwargs):
+    stmt = (update(ImportJob).where(ImportJob.id == id)
+            .values(**{"updated_at": datetime.now(UTC), **kwargs})
+            .returning(ImportJob).execution_options(populate_existing=True))
+    result = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return result
+
+
+def touch_import_jobs(db: Session, ids: list[uuid.UUID]) -> int:
+    """Heartbeat: mark queued or running jobs as still owned by a live process."""
+    stmt = (update(ImportJob)
+            .where(ImportJob.id.in_(ids), ImportJob.status.in_(("queued", "running")))
+            .values(updated_at=datetime.now(UTC)))
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+def requeue_import_job(db: Session, job: ImportJob):
+    """
+    Put a stopped job back in the queue. Only succeeds if nobody touched the
+    job since it was read, so two concurrent resumes cannot both run it.
+    """
+    stmt = (update(ImportJob)
+            .where(ImportJob.id == job.id, ImportJob.status == job.status,
+                   ImportJob.updated_at.is_not_distinct_from(job.updated_at))
+            .values(status="queued", finished_at=None, message=None,
+                    updated_at=datetime.now(UTC))
+            .returning(ImportJob).execution_options(populate_existing=True))
+    result = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return result
@@ -0,0 +1,200 @@
+# datasource.py
+"""
+Offline PokeAPI data sources.
+
+Resources are addressed by their PokeAPI URL; only the path matters, so
+"https://pokeapi.co/api/v2/pokemon/25/" and "/api/v2/pokemon/25" are the same
+resource. Supported dumps:
+
+  * a directory laid out like PokeAPI's api-data repo
+    (<root>/api/v2/pokemon/25/index.json)
+  * a JSONL file, one {"url": ..., "data": {...}} object per line
+  * a tar archive of an api-data style tree
+
+JSONL and tar dumps may be gzip-compressed (.gz/.tgz); they are inflated once
+into a temporary file. Either way the file is memory-mapped and indexed by
+resource path, so a lookup only touches the bytes of that one resource.
+"""
+import re
+import gzip
+import json
+import mmap
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+class ResourceNotFound(LookupError):
+    pass
+
+
+def resource_key(url: str) -> str:
+    """'https://pokeapi.co/api/v2/pokemon/25/' -> 'api/v2/pokemon/25'"""
+    return urlparse(url).path.strip("/")
+
+
+class DataSource:
+    name = "base"
+
+    def read_raw(self, key: str) -> bytes | None:
+        """The JSON body stored under `key`, undecoded."""
+        raise NotImplementedError
+
+    def read(self, key: str) -> dict | None:
+        raw = self.read_raw(key)
+        return None if raw is None else json.loads(raw)
+
+    def get_raw(self, url: str) -> bytes:
+        key = resource_key(url)
+        raw = self.read_raw(key)
+        if raw is None:
+            resolved = self._resolve_name(key)
+            raw = self.read_raw(resolved) if resolved else None
+        if raw is None:
+            raise ResourceNotFound(f"{url} is not in the {self.name} data source")
+        return raw
+
+    def get_json(self, url: str) -> dict:
+        return json.loads(self.get_raw(url))
+
+    def _resolve_name(self, key: str) -> str | None:
+        # api-data only stores resources by id; resolve names through the
+        # resource's list index (e.g. api/v2/pokemon/index.json).
+        parent, _, name = key.rpartition("/")
+        if not parent or name.isdigit():
+            return None
+        listing = self.read(parent)
+        for entry in (listing or {}).get("results", []):
+            if entry["name"] == name.lower():
+                return resource_key(entry["url"])
+        return None
+
+
+class DirectorySource(DataSource):
+    name = "directory"
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        # api-data keeps its tree under data/
+        if not (self.root / "api").exists() and (self.root / "data" / "api").exists():
+            self.root = self.root / "data"
+
+    def read_raw(self, key: str) -> bytes | None:
+        for path in (self.root / key / "index.json", self.root / f"{key}.json"):
+            if path.is_file():
+                return path.read_bytes()
+        return None
+
+
+class _MappedSource(DataSource):
+    """A read-only memory-mapped file plus an index of key -> (start, end)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file = _open_inflated(self.path)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: dict[str, tuple[int, int]] = {}
+        self._build_index()
+
+    def _build_index(self):
+        raise NotImplementedError
+
+    def read_raw(self, key: str) -> bytes | None:
+        span = self._index.get(key)
+        if span is None:
+            return None
+        return self._mm[span[0]:span[1]]
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+_URL_PREFIX = re.compile(rb'\s*\{\s*"url"\s*:\s*"([^"]+)"')
+_DATA_KEY = re.compile(rb'\s*,\s*"data"\s*:\s*')
+
+
+class JsonlSource(_MappedSource):
+    name = "jsonl"
+
+    def _build_index(self):
+        # Lines written as {"url": ..., "data": ...} are indexed by the span
+        # of their data object, so reads need no unwrapping; any other
+        # layout falls back to decoding the whole line.
+        self._wrapped: set[str] = set()
+        mm = self._mm
+        start = 0
+        size = len(mm)
+        while start < size:
+            end = mm.find(b"\n", start)
+            if end == -1:
+                end = size
+            if end > start:
+                match = _URL_PREFIX.match(mm, start, end)
+                data = _DATA_KEY.match(mm, match.end(), end) if match else None
+                close = mm.rfind(b"}", start, end)
+                if data and close > data.end():
+                    self._index[resource_key(match.group(1).decode())] = (data.end(), close)
+                else:
+                    key = resource_key(json.loads(mm[start:end])["url"])
+                    self._index[key] = (start, end)
+                    self._wrapped.add(key)
+            start = end + 1
+
+    def read_raw(self, key: str) -> bytes | None:
+        raw = super().read_raw(key)
+        if raw is not None and key in self._wrapped:
+            return json.dumps(json.loads(raw)["data"]).encode()
+        return raw
+
+
+class TarSource(_MappedSource):
+    name = "tar"
+
+    def _build_index(self):
+        with tarfile.open(fileobj=self._file, mode="r:") as archive:
+            for member in archive:
+                if not member.isfile() or not member.name.endswith(".json"):
+                    continue
+                self._index[_tar_key(member.name)] = (
+                    member.offset_data, member.offset_data + member.size)
+        self._file.seek(0)
+
+
+def _tar_key(name: str) -> str:
+    # data/api/v2/pokemon/25/index.json -> api/v2/pokemon/25
+    key = name.lstrip("./")
+    key = key.removesuffix("/index.json").removesuffix(".json")
+    api = key.find("api/")
+    return key[api:] if api != -1 else key
+
+
+def _open_inflated(path: Path):
+    if path.suffix not in (".gz", ".tgz"):
+        return open(path, "rb")
+    inflated = tempfile.TemporaryFile()
+    with gzip.open(path, "rb") as compressed:
+        shutil.copyfileobj(compressed, inflated)
+    inflated.flush()
+    inflated.seek(0)
+    return inflated
+
+
+def open_source(spec: str | Path) -> DataSource:
+    """Pick a data source implementation for a dump path."""
+    path = Path(spec)
+    if path.is_dir():
+        return DirectorySource(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"PokeAPI dump not found: {spec}")
+    name = path.name.lower()
+    if name.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz")):
+        return JsonlSource(path)
+    if name.endswith((".tar", ".tar.gz", ".tgz")):
+        return TarSource(path)
+    raise ValueError(f"Unsupported PokeAPI dump format: {spec}")
@@ -1,13 +1,16 @@
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, func, select, inspect
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import StaticPool
 import os
+import logging
 from contextlib import contextmanager
 
 from dotenv import load_dotenv
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
@@ -38,6 +41,75 @@ def init_db():
     """Initialize the database by creating all tables."""
     from app.models import Card  # import all your ORM models so they register with Base
     Base.metadata.create_all(bind=engine)
+    ensure_card_key_index(Card)
+    ensure_card_columns(Card)
+    ensure_card_indexes(Card)
+    ensure_card_search(Card)
+
+
+def ensure_card_key_index(card_model, bind=None):
+    """
+    create_all only builds indexes for new tables; add the (set_code,
+    collector_number) unique index to card tables created before it existed.
+    If the table still holds duplicate cards the index cannot be built, so
+    warn instead of failing startup; imports will error until they are removed.
+    """
+    bind = bind or engine
+    if not inspect(bind).has_table(card_model.__tablename__):
+        return
+    index = next(i for i in card_model.__table__.indexes if i.unique)
+    try:
+        index.create(bind, checkfirst=True)
+    except IntegrityError:
+        duplicates = (
+            select(card_model.set_code, card_model.collector_number)
+            .group_by(card_model.set_code, card_model.collector_number)
+            .having(func.count() > 1)
+        )
+        with bind.connect() as conn:
+            count = conn.execute(select(func.count()).select_from(duplicates.subquery())).scalar()
+        logger.warning(f"Cannot create {index.name}: {count} (set_code, collector_number) "
+                       f"pairs have duplicate cards. Remove them to enable idempotent imports.")
+
+
+def ensure_card_indexes(card_model, bind=None):
+    """Add the card table's non-unique indexes if the table predates them."""
+    bind = bind or engine
+    if not inspect(bind).has_table(card_model.__tablename__):
+        return
+    for index in card_model.__table__.indexes:
+        if not index.unique:
+            index.create(bind, checkfirst=True)
+
+
+def ensure_card_search(card_model, bind=None):
+    """Add the card name search index if the table predates it; see app.search."""
+    from app.search import create_card_search
+    bind = bind or engine
+    if not inspect(bind).has_table(card_model.__tablename__):
+        return
+    with bind.begin() as conn:
+        create_card_search(card_model.__table__, conn)
+
+
+def ensure_card_columns(card_model, bind=None):
+    """
+    create_all never alters existing tables; add card columns introduced
+    after the table was created. They are all nullable and filled in as
+    cards are re-imported.
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    table = card_model.__table__
+    if not inspector.has_table(table.name):
+        return
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    with bind.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
 
 
 @contextmanager
@@ -0,0 +1,78 @@
+# fuzzy.py
+from collections import Counter, defaultdict
+from itertools import chain
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between a and b, or limit + 1 once it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _bigrams(word: str) -> set[str]:
+    # padded, so the first and last letters count as much as the middle ones
+    padded = f"^{word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NGramIndex:
+    """
+    Bigram index for bounded edit-distance lookups.
+
+    One edit destroys at most two of a word's bigrams, so a word within
+    distance k of the query shares at least len(bigrams(query)) - 2k of
+    them. search() counts shared bigrams over the posting lists, and only
+    words that pass that bound are compared letter by letter. Not
+    thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._words: set[str] = set()
+
+    def add(self, word: str):
+        if word not in self._words:
+            self._words.add(word)
+            for gram in _bigrams(word):
+                self._postings[gram].add(word)
+
+    def discard(self, word: str):
+        if word in self._words:
+            self._words.discard(word)
+            for gram in _bigrams(word):
+                self._postings[gram].discard(word)
+
+    def clear(self):
+        self._postings.clear()
+        self._words.clear()
+
+    def search(self, query: str, max_distance: int) -> list[tuple[int, str]]:
+        """(distance, word) for words within max_distance of query, closest first."""
+        grams = _bigrams(query)
+        needed = len(grams) - 2 * max_distance
+        if needed > 0:
+            shared = Counter(chain.from_iterable(
+                self._postings[gram] for gram in grams if gram in self._postings))
+            candidates = [word for word, count in shared.items() if count >= needed]
+        else:
+            # too short to filter on; every word is a candidate
+            candidates = self._words
+        matches = []
+        for word in candidates:
+            distance = edit_distance(query, word, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, word))
+        return sorted(matches)
+
+    def __len__(self):
+        return len(self._words)
@@ -0,0 +1,308 @@
+import os
+import time
+import queue
+import logging
+import threading
+from app import pokeapi
+
+logger = logging.getLogger(__name__)
+
+# Worker threads for the network-bound fetch stage
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "8"))
+# Worker threads for the CPU-bound derive stage; more than a couple only
+# contend for the GIL
+IMPORT_DERIVE_WORKERS = int(os.getenv("IMPORT_DERIVE_WORKERS", "2"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "100"))
+# Capacity of each queue between stages
+IMPORT_QUEUE_SIZE = int(os.getenv("IMPORT_QUEUE_SIZE", "32"))
+# Seconds the persister waits for more cards before writing a partial batch
+IMPORT_FLUSH_INTERVAL = float(os.getenv("IMPORT_FLUSH_INTERVAL", "1"))
+
+_DONE = object()
+
+
+class Stage:
+    """One step of the import pipeline: `fn(item, timings) -> item` on `workers` threads."""
+    __slots__ = ("name", "fn", "workers")
+
+    def __init__(self, name: str, fn, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+
+class _Failed:
+    """Carries a card's error past the remaining stages to the persister."""
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class _StageQueue(queue.Queue):
+    """Bounded queue that knows how many workers read from it."""
+
+    def __init__(self, maxsize: int, readers: int):
+        super().__init__(maxsize)
+        self.readers = readers
+
+
+class _StageStats:
+    __slots__ = ("busy", "blocked", "depth_total", "depth_max", "gets", "lock")
+
+    def __init__(self):
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.gets = 0
+        self.lock = threading.Lock()
+
+    def sample_depth(self, depth: int):
+        with self.lock:
+            self.gets += 1
+            self.depth_total += depth
+            self.depth_max = max(self.depth_max, depth)
+
+    def add(self, busy: float, blocked: float):
+        with self.lock:
+            self.busy += busy
+            self.blocked += blocked
+
+    def to_dict(self, workers: int) -> dict:
+        return {
+            "workers": workers,
+            "queue_max": self.depth_max,
+            "queue_mean": round(self.depth_total / self.gets, 2) if self.gets else 0.0,
+            "busy_seconds": round(self.busy, 3),
+            # time spent waiting on a full downstream queue (backpressure)
+            "blocked_seconds": round(self.blocked, 3),
+        }
+
+
+class ImportEngine:
+    """
+    Bulk card importer, run as a streaming pipeline:
+
+        identifiers -> [stage 1] -> queue -> [stage 2] -> ... -> queue -> persister
+
+    Every stage runs `fn(item, timings)` on its own worker threads and hands
+    the result downstream through a bounded queue, so a slow stage holds
+    back the ones before it instead of letting work pile up in memory.
+    The first stage receives the identifier; the last must return a card
+    payload. Stage functions may record sub-step durations in `timings`.
+
+    The persister runs on the calling thread (so DB sessions never cross
+    threads): it collects payloads and hands them to
+    `persist_batch(payloads)` when `batch_size` have arrived, or when the
+    pipeline has gone quiet for `flush_interval` seconds. It returns one
+    `(response, status)` per payload.
+    `prepare(identifiers)`, if given, runs once before anything else
+    (e.g. to batch-prefetch shared resources).
+    `on_result(result)`, if given, is called on the calling thread as each
+    card finishes (e.g. to record job progress).
+    Outbound PokeAPI traffic is throttled by the shared token bucket in
+    `app.pokeapi`, not by sleeping between cards.
+    """
+
+    def __init__(self, stages: list[Stage], persist_batch, prepare=None,
+                 batch_size: int | None = None, queue_size: int | None = None,
+                 flush_interval: float | None = None, rate: float | None = None,
+                 burst: float | None = None, on_result=None):
+        if not stages:
+            raise ValueError("ImportEngine needs at least one stage")
+        self.stages = stages
+        self.persist_batch = persist_batch
+        self.prepare = prepare
+        self.on_result = on_result
+        self.batch_size = max(1, batch_size or IMPORT_BATCH_SIZE)
+        self.queue_size = max(1, queue_size or IMPORT_QUEUE_SIZE)
+        self.flush_interval = IMPORT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        if rate is not None:
+            pokeapi.limiter.configure(rate, burst)
+
+    def _worker(self, stage, inbox, outbox, stats, remaining, lock, cancelled):
+        while True:
+            stats.sample_depth(inbox.qsize())
+            item = inbox.get()
+            if item is _DONE:
+                break
+            identifier, value, timings = item
+            started = time.perf_counter()
+            if cancelled.is_set():
+                value = _Failed(RuntimeError("Import cancelled"))
+            elif not isinstance(value, _Failed):
+                try:
+                    value = stage.fn(value, timings)
+                except Exception as error:
+                    logger.warning(f"Import of {identifier} failed in {stage.name}: {error}")
+                    value = _Failed(error)
+                timings[stage.name] = time.perf_counter() - started
+            finished = time.perf_counter()
+            outbox.put((identifier, value, timings))
+            stats.add(finished - started, time.perf_counter() - finished)
+
+        with lock:
+            remaining[stage.name] -= 1
+            last = remaining[stage.name] == 0
+        if last:
+            # the last worker out tells the next stage nothing else is coming
+            for _ in range(outbox.readers):
+                outbox.put(_DONE)
+
+    def run(self, identifiers) -> dict:
+        identifiers = list(identifiers)
+        results = {}
+        samples = {}
+        entered = {}
+        latencies = []
+        started = time.perf_counter()
+        if self.prepare:
+            self.prepare(identifiers)
+            samples["prepare"] = [time.perf_counter() - started]
+
+        queues = [_StageQueue(self.queue_size, stage.workers) for stage in self.stages]
+        persist_queue = _StageQueue(self.queue_size, 1)
+        outboxes = queues[1:] + [persist_queue]
+        stage_stats = {stage.name: _StageStats() for stage in self.stages}
+        persist_stats = _StageStats()
+        remaining = {stage.name: stage.workers for stage in self.stages}
+        lock = threading.Lock()
+        cancelled = threading.Event()
+
+        threads = [threading.Thread(target=self._feed, args=(identifiers, queues[0], entered, cancelled),
+                                    name="import-feed", daemon=True)]
+        for stage, inbox, outbox in zip(self.stages, queues, outboxes):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._worker,
+                    args=(stage, inbox, outbox, stage_stats[stage.name], remaining, lock, cancelled),
+                    name=f"import-{stage.name}-{n}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        pending = []
+
+        def finish(result):
+            results[result["identifier"]] = result
+            latencies.append(time.perf_counter() - entered[result["identifier"]])
+            if self.on_result:
+                self.on_result(result)
+
+        def flush():
+            if not pending:
+                return
+            persist_started = time.perf_counter()
+            try:
+                outcomes = self.persist_batch([payload for _, payload, _ in pending])
+            except Exception as error:
+                logger.warning(f"Persisting {len(pending)} cards failed: {error}")
+                outcomes = [({"error": _describe(error)}, 500)] * len(pending)
+            elapsed = time.perf_counter() - persist_started
+            samples.setdefault("persist", []).append(elapsed)
+            persist_stats.add(elapsed, 0.0)
+
+            for (identifier, _, timings), (response, status) in zip(pending, outcomes):
+                _collect(samples, timings)
+                if status >= 400:
+                    finish(_result(identifier, status, error=response))
+                else:
+                    finish(_result(identifier, status, data=response.get("data")))
+            pending.clear()
+
+        drained = False
+        try:
+            while True:
+                persist_stats.sample_depth(persist_queue.qsize())
+                try:
+                    item = persist_queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    flush()
+                    continue
+                if item is _DONE:
+                    drained = True
+                    break
+                identifier, value, timings = item
+                if isinstance(value, _Failed):
+                    _collect(samples, timings)
+                    finish(_result(identifier, 500, error=_describe(value.error)))
+                    continue
+                pending.append(item)
+                if len(pending) >= self.batch_size:
+                    flush()
+            flush()
+        except BaseException:
+            # let the workers wind down instead of blocking on full queues
+            cancelled.set()
+            while not drained and persist_queue.get() is not _DONE:
+                pass
+            raise
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started
+        ordered = [results[i] for i in identifiers]
+        imported = sum(1 for r in ordered if r["error"] is None)
+        pipeline = {stage.name: stage_stats[stage.name].to_dict(stage.workers) for stage in self.stages}
+        pipeline["persist"] = persist_stats.to_dict(1)
+        stats = {
+            "requested": len(identifiers),
+            "imported": imported,
+            "failed": len(identifiers) - imported,
+            "workers": {stage.name: stage.workers for stage in self.stages},
+            "batch_size": self.batch_size,
+            "queue_size": self.queue_size,
+            "elapsed_seconds": round(elapsed, 3),
+            "cards_per_second": round(imported / elapsed, 3) if elapsed else 0.0,
+            "stages": {stage: _summarize(values) for stage, values in samples.items()},
+            # from entering the pipeline to being persisted (or failing)
+            "card_latency": _summarize(latencies) if latencies else {},
+            "pipeline": pipeline,
+            "http_cache": pokeapi.cache_stats(),
+        }
+        logger.info(f"Imported {imported}/{len(identifiers)} cards in {elapsed:.1f}s")
+        return {"results": ordered, "stats": stats}
+
+    def _feed(self, identifiers, first, entered, cancelled):
+        for identifier in identifiers:
+            if cancelled.is_set():
+                break
+            entered[identifier] = time.perf_counter()
+            first.put((identifier, identifier, {}))
+        for _ in range(first.readers):
+            first.put(_DONE)
+
+
+def _collect(samples: dict, timings: dict):
+    for stage, seconds in timings.items():
+        samples.setdefault(stage, []).append(seconds)
+
+
+def _result(identifier, status, data=None, error=None):
+    return {"identifier": identifier, "status": status, "data": data, "error": error}
+
+
+def _describe(error: Exception) -> str:
+    # flask_smorest.abort raises an HTTPException carrying the message in .data
+    data = getattr(error, "data", None)
+    if isinstance(data, dict) and data.get("message"):
+        return data["message"]
+    return str(error)
+
+
+def _summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(samples),
+        "total_seconds": round(sum(samples), 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    # nearest-rank on already sorted samples
+    index = max(0, -(-len(ordered) * pct // 100) - 1)
+    return ordered[int(index)]
@@ -0,0 +1,213 @@
+# jobs.py
+"""
+Background execution for long-running admin work (card range imports).
+
+Jobs run on a small in-process thread pool so web workers return straight
+away. Their state lives in the import_job table, so any worker process can
+report on a job no matter which one is running it.
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime, UTC
+from concurrent.futures import ThreadPoolExecutor, Future
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+# Seconds between progress writes to the job row
+IMPORT_JOB_PROGRESS_INTERVAL = float(os.getenv("IMPORT_JOB_PROGRESS_INTERVAL", "1"))
+# Per-card errors kept on a job; the counters stay exact past this
+IMPORT_JOB_MAX_ERRORS = int(os.getenv("IMPORT_JOB_MAX_ERRORS", "500"))
+# A queued or running job whose row has not been touched for this long is
+# assumed to have died with its process and may be resumed
+IMPORT_JOB_STALE_SECONDS = float(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+# Seconds between heartbeats on the jobs a process has accepted; must stay
+# well under IMPORT_JOB_STALE_SECONDS
+IMPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", "30"))
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IMPORT_JOB_WORKERS,
+                                               thread_name_prefix="import-job")
+    return _executor
+
+
+def submit(fn, *args) -> Future:
+    """Run fn(*args) on the background pool, logging anything it raises."""
+    def run():
+        try:
+            return fn(*args)
+        except Exception:
+            logger.exception(f"Background job {fn.__name__}{args} crashed")
+            raise
+    return _get_executor().submit(run)
+
+
+class Heartbeat:
+    """
+    Keeps the rows of the jobs this process has accepted fresh: every
+    `interval` seconds a daemon thread calls `touch(job_ids)` with the jobs
+    still queued on, or running in, this process's executor. A queued job
+    waits without writing anything, so without this another process could
+    not tell it from one whose process is gone (see is_resumable).
+    """
+
+    def __init__(self, touch, interval: float = IMPORT_JOB_HEARTBEAT_SECONDS):
+        self.touch = touch
+        self.interval = interval
+        self._jobs = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, job_id):
+        with self._lock:
+            self._jobs.add(job_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="import-job-heartbeat",
+                                                daemon=True)
+                self._thread.start()
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.discard(job_id)
+
+    def beat(self):
+        with self._lock:
+            job_ids = sorted(self._jobs, key=str)
+        if job_ids:
+            try:
+                self.touch(job_ids)
+            except Exception as error:
+                logger.warning(f"Import job heartbeat failed: {error}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.beat()
+
+
+class ProgressRecorder:
+    """
+    ImportEngine `on_result` hook that tallies finished cards and writes the
+    counters and resume checkpoint through `save(**fields)` at most every
+    `interval` seconds. Call flush() once the run is over to store the final
+    numbers.
+
+    The checkpoint is a watermark over `identifiers`: cards finish out of
+    order, so it only advances past an identifier once everything before
+    it has finished too. Failures are kept in `failed_identifiers`, seeded
+    with the ones an earlier run left behind; those stay until their retry
+    finishes, so a run that dies first does not lose them.
+    """
+
+    def __init__(self, save, identifiers=(), checkpoint: int | None = None,
+                 imported: int = 0, failed_identifiers=(),
+                 interval: float = IMPORT_JOB_PROGRESS_INTERVAL,
+                 max_errors: int = IMPORT_JOB_MAX_ERRORS):
+        self.save = save
+        self.interval = interval
+        self.max_errors = max_errors
+        self.imported = imported
+        self.failed = 0
+        self.errors = []
+        self.failed_identifiers = set(failed_identifiers)
+        self.checkpoint = checkpoint
+        self._ahead = sorted(i for i in identifiers if checkpoint is None or i > checkpoint)
+        self._next = 0
+        self._finished = set()
+        self._last_flush = time.monotonic()
+
+    def __call__(self, result: dict):
+        identifier = result["identifier"]
+        self.failed_identifiers.discard(identifier)
+        if result["error"] is None:
+            self.imported += 1
+        else:
+            self.failed += 1
+            self.failed_identifiers.add(identifier)
+            if len(self.errors) < self.max_errors:
+                self.errors.append({
+                    "identifier": identifier,
+                    "status": result["status"],
+                    "error": result["error"],
+                })
+        self._advance(identifier)
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def _advance(self, identifier):
+        if self.checkpoint is not None and identifier <= self.checkpoint:
+            return  # a retry from below the watermark
+        self._finished.add(identifier)
+        while self._next < len(self._ahead) and self._ahead[self._next] in self._finished:
+            self.checkpoint = self._ahead[self._next]
+            self._finished.discard(self.checkpoint)
+            self._next += 1
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        self.save(imported=self.imported, failed=self.failed, errors=list(self.errors),
+                  checkpoint=self.checkpoint, failed_identifiers=sorted(self.failed_identifiers))
+
+
+def remaining_identifiers(job) -> list[int]:
+    """Identifiers a (re)run of the job still has to import, in order."""
+    start = job.range_start if job.checkpoint is None else job.checkpoint + 1
+    retry = set(job.failed_identifiers or [])
+    return sorted(retry.union(range(start, job.range_end + 1)))
+
+
+def is_resumable(job) -> bool:
+    if job.status == "failed":
+        return True
+    if job.status == "completed":
+        return bool(job.failed_identifiers)
+    # queued or running: only once the process that accepted it is clearly
+    # gone. Its Heartbeat touches the row while it waits for a worker, so a
+    # queued job behind long imports is not submitted a second time.
+    last_seen = _as_utc(job.updated_at or job.started_at or job.created_at)
+    return (last_seen is not None and
+            (datetime.now(UTC) - last_seen).total_seconds() > IMPORT_JOB_STALE_SECONDS)
+
+
+def _as_utc(moment: datetime | None) -> datetime | None:
+    # SQLite hands timestamps back without a timezone; they are stored as UTC
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment
+
+
+def job_progress(job) -> dict:
+    """Derived progress, throughput (cards/s) and ETA (s) for an import job."""
+    done = (job.imported or 0) + (job.failed or 0)
+    # Throughput only counts the current run; earlier runs of a resumed job
+    # are already in `done`.
+    run_done = done - (job.processed_before_run or 0)
+    started = _as_utc(job.started_at)
+    elapsed = 0.0
+    if started is not None:
+        elapsed = ((_as_utc(job.finished_at) or datetime.now(UTC)) - started).total_seconds()
+    throughput = run_done / elapsed if elapsed > 0 else 0.0
+    remaining = max(job.total - done, 0) if job.total else 0
+    eta = None
+    if job.status == "running" and throughput:
+        eta = round(remaining / throughput, 1)
+    elif job.status in ("completed", "failed"):
+        eta = 0.0
+    return {
+        "processed": done,
+        "progress": round(done / job.total, 4) if job.total else 0.0,
+        "elapsed_seconds": round(max(elapsed, 0.0), 3),
+        "cards_per_second": round(throughput, 3),
+        "eta_seconds": eta,
+        "resumable": is_resumable(job),
+    }
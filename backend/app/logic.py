@@ -1,10 +1,15 @@
 from flask_smorest import abort
 from app.db import SessionLocal
-from app import crud, services
-from app.pokeapi import Pokemon
+from app import crud, services, jobs
+from app.pokeapi import Pokemon, primed
+from app.pokeapi_async import prefetch_card_resources, prefetch_range_moves, PrefetchSession
+from app.importer import ImportEngine, Stage, IMPORT_BATCH_SIZE, IMPORT_WORKERS, IMPORT_DERIVE_WORKERS
+from app.suggest import card_names, CARD_SUGGEST_LIMIT, CARD_SUGGEST_MAX_LIMIT
+from app.models import CARD_FIELD_COLUMNS
 import uuid
 import time
 import logging
+from datetime import datetime, UTC
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 from app.poke_utils import (
@@ -12,9 +17,11 @@ from app.poke_utils import (
     map_power_to_damage,
     map_damage_to_cost,
     format_cost_symbols,
+    cost_text,
     map_hp_to_retreat,
     calculate_rarity,
     determine_set_code,
+    CardRules,
 )
 
 import os
@@ -48,18 +55,128 @@ def create_card_logic(**kwargs):
         return {"error create card logic": f"{error}"}, 500
 
 
-def list_cards(page: int, type_filter: str | None, pokemon_name: str | None, count_per_page: int = 12):
+_IMPORT_MESSAGES = {
+    "created": ("Card created", 201),
+    "updated": ("Card updated", 200),
+    "unchanged": ("Card unchanged", 200),
+}
+
+
+def import_cards_logic(payloads: list[dict], batch_size: int = IMPORT_BATCH_SIZE):
+    """
+    Upsert imported cards in batches, keyed on set code and collector
+    number. Returns one (response, status) per payload, in order: 201 for
+    new cards, 200 for updated or unchanged ones.
+    """
+    try:
+        with SessionLocal() as db:
+            outcomes = crud.upsert_cards(db, payloads, batch_size)
+            results = []
+            for card, action, error in outcomes:
+                if error is not None or card is None:
+                    results.append(({"error import card logic": f"{error or 'Card import failed'}"}, 500))
+                    continue
+                message, status = _IMPORT_MESSAGES[action]
+                response = services.generate_response(
+                    message=message,
+                    status=status,
+                    data=card.to_dict()
+                )
+                results.append((response, status))
+            return results
+    except Exception as error:
+        return [({"error import cards logic": f"{error}"}, 500)] * len(payloads)
+
+
+def import_card_logic(**kwargs):
+    return import_cards_logic([kwargs])[0]
+
+
+def rederive_cards(rules: CardRules | None = None, dry_run: bool = False, batch_size: int = 1000):
+    """
+    Recompute attack cost, retreat cost and rarity for every stored card
+    from its stored hp, damage and base stat total, writing only the cards
+    whose values changed. No PokeAPI requests are made.
+    """
+    rules = rules or CardRules()
+    started = time.perf_counter()
+    scanned = updated = missing_stats = 0
+    fields = dict.fromkeys(("attack_1_cost", "attack_2_cost", "retreat_cost", "rarity"), 0)
+    try:
+        with SessionLocal() as db:
+            after_id = None
+            while rows := crud.card_derivation_inputs(db, after_id, batch_size):
+                after_id = rows[-1].id
+                scanned += len(rows)
+                changes = []
+                for row in rows:
+                    missing_stats += row.base_stat_total is None
+                    changed = rules.changes(row)
+                    if changed:
+                        for field in changed:
+                            fields[field] += 1
+                        changes.append({"id": row.id, **changed})
+                updated += len(changes) if dry_run else crud.bulk_update_cards(db, changes)
+        elapsed = time.perf_counter() - started
+        response = services.generate_response(
+            message=f"{'Would update' if dry_run else 'Updated'} {updated} of {scanned} cards",
+            status=200,
+            data={
+                "scanned": scanned,
+                "updated": updated,
+                "unchanged": scanned - updated,
+                "fields": fields,
+                # rarity needs the stat total, stored only by newer imports
+                "missing_stat_total": missing_stats,
+                "dry_run": dry_run,
+                "elapsed_seconds": round(elapsed, 3),
+            }
+        )
+        return response, 200
+    except Exception as error:
+        return {"error rederive cards logic": f"{error}"}, 500
+
+
+def parse_card_fields(fields: str | None) -> list[str] | None:
+    """
+    "name,image_url" -> ["id", "name", "image_url"]: the to_dict keys of a
+    sparse fieldset, always led by id. None means every field.
+    """
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in CARD_FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown card fields: {', '.join(unknown)}. "
+                         f"Choose from: {', '.join(CARD_FIELD_COLUMNS)}")
+    return list(dict.fromkeys(["id", *requested]))
+
+
+def list_cards(page: int, type_filter: str | None, pokemon_name: str | None, count_per_page: int = 12,
+               fields: str | None = None):
     if page < 1:
         return {"error": "Page must be 1 or greater"}, 400
     try:
+        fields = parse_card_fields(fields)
+    except ValueError as error:
+        return {"error": f"{error}"}, 400
+    try:
 
         with SessionLocal() as db:
             cards, total_count = crud.list_cards(
-                db, page, type_filter, pokemon_name, count_per_page)
+                db, page, type_filter, pokemon_name, count_per_page, fields)
+            message = "Card List retrieved"
+            if total_count == 0 and pokemon_name:
+                # likely a typo; retry with the closest stored names
+                names = _loaded_card_names().similar(pokemon_name)
+                if names:
+                    cards, total_count = crud.list_cards_named(
+                        db, page, type_filter, names, count_per_page, fields)
+                    message = f"No cards match '{pokemon_name}'; showing close matches"
             response = services.generate_response(
-                message="Card List retrieved",
+                message=message,
                 status=200,
-                data=[card.to_dict() for card in cards],
+                data=[card.to_dict(fields) for card in cards],
                 pagination=services.generate_pagination(
                     page, total_count, count_per_page)
             )
@@ -68,6 +185,97 @@ def list_cards(page: int, type_filter: str | None, pokemon_name: str | None, cou
         return {"error list cards logic": f"{error}"}, 500
 
 
+def _card_cursor(cursor: str) -> tuple:
+    """(collector_number, id) from a list_cards_by_cursor cursor; ValueError if it is not one."""
+    values = services.decode_cursor(cursor)
+    if len(values) != 2:
+        raise ValueError("Invalid cursor")
+    number, card_id = values
+    if (number is not None and (type(number) is not int)) or not isinstance(card_id, str):
+        raise ValueError("Invalid cursor")
+    try:
+        uuid.UUID(card_id)
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+    return number, card_id
+
+
+def list_cards_by_cursor(cursor: str, type_filter: str | None, pokemon_name: str | None,
+                         count_per_page: int = 12, fields: str | None = None):
+    """Keyset-paginated list_cards; an empty cursor starts from the beginning."""
+    if count_per_page < 1:
+        return {"error": "count_per_page must be 1 or greater"}, 400
+    try:
+        fields = parse_card_fields(fields)
+    except ValueError as error:
+        return {"error": f"{error}"}, 400
+    after = None
+    if cursor:
+        try:
+            after = _card_cursor(cursor)
+        except ValueError as error:
+            return {"error": f"{error}"}, 400
+    try:
+        with SessionLocal() as db:
+            # one extra row tells whether there is a next page
+            cards = crud.list_cards_after(db, after, type_filter, pokemon_name, count_per_page + 1, fields)
+            page, more = cards[:count_per_page], len(cards) > count_per_page
+            next_cursor = None
+            if more:
+                last = page[-1]
+                next_cursor = services.encode_cursor(last.collector_number, str(last.id))
+            response = services.generate_response(
+                message="Card List retrieved",
+                status=200,
+                data=[card.to_dict(fields) for card in page],
+                pagination=services.generate_cursor_pagination(count_per_page, next_cursor)
+            )
+            return response, 200
+    except Exception as error:
+        return {"error list cards by cursor logic": f"{error}"}, 500
+
+
+def load_card_names():
+    """(Re)build the autocomplete index from the card table."""
+    def read_rows():
+        with SessionLocal() as db:
+            return crud.card_name_rows(db)
+    # read first: a write landing during the load only makes the next check reload
+    with SessionLocal() as db:
+        signature = crud.card_name_signature(db)
+    card_names.load(read_rows)
+    card_names.mark_checked(signature)
+
+
+def _loaded_card_names():
+    if not card_names.loaded:
+        load_card_names()
+    elif card_names.needs_check():
+        # cards written by other processes never reach this one's index
+        with SessionLocal() as db:
+            signature = crud.card_name_signature(db)
+        if signature != card_names.signature:
+            load_card_names()
+        else:
+            card_names.mark_checked(signature)
+    return card_names
+
+
+def suggest_cards(q: str, limit: int = CARD_SUGGEST_LIMIT):
+    if not 1 <= limit <= CARD_SUGGEST_MAX_LIMIT:
+        return {"error": f"Limit must be between 1 and {CARD_SUGGEST_MAX_LIMIT}"}, 400
+    try:
+        suggestions = _loaded_card_names().suggest(q.strip(), limit) if q.strip() else []
+        response = services.generate_response(
+            message="Card suggestions retrieved",
+            status=200,
+            data=suggestions,
+        )
+        return response, 200
+    except Exception as error:
+        return {"error suggest cards logic": f"{error}"}, 500
+
+
 def get_card_by_id(id: int):
     try:
         with SessionLocal() as db:
@@ -104,27 +312,34 @@ def delete_card(id: int):
         return {"error delete card logic": f"{error}"}, 500
 
 
-def create_tcg_card(identifier: str | int):
-    # 1) Core fetch
+def _timed(timings: dict | None, stage: str, fn, *args):
+    if timings is None:
+        return fn(*args)
+    started = time.perf_counter()
     try:
-        p = Pokemon.fetch(identifier)
-    except Exception:
-        abort(404, message=f"Pokémon '{identifier}' not found")
+        return fn(*args)
+    finally:
+        timings[stage] = time.perf_counter() - started
+
 
-    # 2) Single attack
-    move_info = select_best_levelup_move(p)
+def build_tcg_card_data(p: Pokemon, timings: dict | None = None) -> dict:
+    """Derive the card payload for an already fetched Pokémon."""
+    # 1) Single attack
+    move_info = _timed(timings, "move", select_best_levelup_move, p)
     dmg = map_power_to_damage(move_info["power"])
     cost_cnt = map_damage_to_cost(dmg)
-    cost_str = format_cost_symbols(cost_cnt, p.types[0])
+    # stored as text, so send the text form; a list would never compare
+    # equal to the stored card and every re-import would rewrite it
+    cost_str = cost_text(format_cost_symbols(cost_cnt, p.types[0]))
 
-    # 3) Other computed fields
-    relations = p.fetch_damage_relations()
+    # 2) Other computed fields
+    relations = _timed(timings, "relations", p.fetch_damage_relations)
     retreat = map_hp_to_retreat(p.hp)
-    rarity = calculate_rarity(p)
-    set_code = determine_set_code(p)
+    rarity = _timed(timings, "rarity", calculate_rarity, p)
+    set_code = _timed(timings, "set_code", determine_set_code, p)
 
-    # 4) Payload
-    card_data = {
+    # 3) Payload
+    return {
         "name":              p.name,
         "rarity":            rarity,
         "type":              p.types[0] if p.types else "Colorless",
@@ -142,25 +357,192 @@ def create_tcg_card(identifier: str | int):
         "resistance":        relations["resistance"],
         "retreat_cost":      retreat,
         "image_url":         p.sprite,
+        "base_stat_total":   sum(p.stats.values()),
     }
-    print(f"Creating card with data: {card_data}")
-    # 5) Persist
-    return create_card_logic(**card_data)
 
 
-def create_tcg_card_range(start: int, end: int):
+def create_tcg_card(identifier: str | int):
+    # 1) Fan out every PokeAPI request the card needs, then core fetch
+    fetched = _fetch_for_import(identifier)
+    # 2) Derive
+    card_data = _derive_for_import(fetched)
+    print(f"Creating card with data: {card_data}")
+    # 3) Persist; re-importing a card updates it in place
+    return import_card_logic(**card_data)
+
+
+def _fetch_for_import(identifier: str | int, timings: dict | None = None,
+                      session: PrefetchSession | None = None):
+    """Fetch stage: the Pokémon plus the responses its card will need."""
+    responses = _timed(timings, "prefetch", prefetch_card_resources, identifier, session)
+    with primed(responses):
+        try:
+            p = _timed(timings, "pokemon", Pokemon.fetch, identifier)
+        except Exception:
+            abort(404, message=f"Pokémon '{identifier}' not found")
+    # The /pokemon/ body is already parsed into `p`; don't hold it in the queue
+    return p, {url: body for url, body in responses.items() if "/pokemon/" not in url}
+
+
+def _derive_for_import(fetched, timings: dict | None = None) -> dict:
+    """Derive stage: build the card payload from the fetched responses."""
+    p, responses = fetched
+    with primed(responses):
+        return build_tcg_card_data(p, timings)
+
+
+def _run_import(identifiers, workers: int | None = None, on_result=None) -> dict:
+    # one event loop and HTTP connection pool for the whole import
+    with PrefetchSession() as session:
+        engine = ImportEngine(
+            stages=[
+                Stage("fetch", lambda identifier, timings: _fetch_for_import(identifier, timings, session),
+                      workers or IMPORT_WORKERS),
+                Stage("derive", _derive_for_import, IMPORT_DERIVE_WORKERS),
+            ],
+            persist_batch=import_cards_logic,
+            prepare=lambda identifiers: prefetch_range_moves(identifiers, session),
+            on_result=on_result)
+        return engine.run(identifiers)
+
+
+def create_tcg_card_range(start: int, end: int, workers: int | None = None):
     try:
-        cards = []
-        for i in range(start, end+1):
-            print(f"Creating card for Pokémon ID: {i}")
-            card = create_tcg_card(i)
-            cards.append(card)  # Append the response data, not the status code
-            time.sleep(1)  # Optional: Throttle requests to avoid rate limits
-        return cards, 200
+        summary = _run_import(range(start, end+1), workers)
+        response = services.generate_response(
+            message=f"Imported {summary['stats']['imported']} of {summary['stats']['requested']} cards",
+            status=200,
+            data=summary
+        )
+        return response, 200
     except Exception as error:
         return {"error create tcg card range logic": f"{error}"}, 500
 
 
+def submit_import_job(start: int, end: int):
+    if end < start:
+        return {"error": "End must be greater than or equal to start"}, 400
+    try:
+        with SessionLocal() as db:
+            job = crud.create_import_job(db, range_start=start, range_end=end, total=end - start + 1)
+            job_id = job.id
+            data = job.to_dict()
+        _submit_import_job(job_id)
+        response = services.generate_response(
+            message="Import job queued",
+            status=202,
+            data=data
+        )
+        return response, 202
+    except Exception as error:
+        return {"error submit import job logic": f"{error}"}, 500
+
+
+def _touch_import_jobs(job_ids):
+    with SessionLocal() as db:
+        crud.touch_import_jobs(db, job_ids)
+
+
+# Keeps the rows of jobs accepted by this process fresh, so that only jobs
+# whose process is gone look stale to is_resumable
+job_heartbeat = jobs.Heartbeat(_touch_import_jobs)
+
+
+def _submit_import_job(job_id):
+    job_heartbeat.add(job_id)
+    try:
+        jobs.submit(run_import_job, job_id)
+    except Exception:
+        job_heartbeat.discard(job_id)
+        raise
+
+
+def run_import_job(job_id):
+    """
+    Run a queued import job, recording progress and a resume checkpoint on
+    its row. A resumed job only imports what is left after its checkpoint
+    plus the identifiers that failed last time.
+    """
+    try:
+        _run_import_job(job_id)
+    finally:
+        job_heartbeat.discard(job_id)
+
+
+def _run_import_job(job_id):
+    with SessionLocal() as db:
+        job = crud.get_import_job(db, job_id)
+        if not job:
+            logger.warning(f"Import job {job_id} no longer exists")
+            return
+        identifiers = jobs.remaining_identifiers(job)
+        processed_before_run = job.total - len(identifiers)
+        job = crud.update_import_job(
+            db, job_id, status="running", started_at=datetime.now(UTC),
+            attempts=job.attempts + 1, processed_before_run=processed_before_run,
+            imported=processed_before_run, failed=0, errors=[])
+        recorder = jobs.ProgressRecorder(
+            lambda **fields: crud.update_import_job(db, job_id, **fields),
+            identifiers, checkpoint=job.checkpoint, imported=processed_before_run,
+            failed_identifiers=job.failed_identifiers or [])
+        try:
+            _run_import(identifiers, on_result=recorder)
+            recorder.flush()
+            crud.update_import_job(
+                db, job_id, status="completed", finished_at=datetime.now(UTC),
+                message=f"Imported {recorder.imported} of {job.total} cards")
+        except Exception as error:
+            logger.exception(f"Import job {job_id} failed")
+            db.rollback()
+            recorder.flush()
+            crud.update_import_job(db, job_id, status="failed",
+                                   finished_at=datetime.now(UTC), message=f"{error}")
+
+
+def resume_import_job(job_id: str):
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return {"error": f"Import job {job_id} not found"}, 404
+    try:
+        with SessionLocal() as db:
+            job = crud.get_import_job(db, job_id)
+            if not job:
+                return {"error": f"Import job {job_id} not found"}, 404
+            if not jobs.is_resumable(job):
+                return {"error": f"Import job {job_id} is {job.status} and has nothing to resume"}, 409
+            job = crud.requeue_import_job(db, job)
+            if not job:
+                return {"error": f"Import job {job_id} was resumed by another request"}, 409
+            data = job.to_dict()
+        _submit_import_job(job.id)
+        response = services.generate_response(
+            message="Import job resumed",
+            status=202,
+            data=data
+        )
+        return response, 202
+    except Exception as error:
+        return {"error resume import job logic": f"{error}"}, 500
+
+
+def get_import_job(job_id: str):
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return {"error": f"Import job {job_id} not found"}, 404
+    try:
+        with SessionLocal() as db:
+            job = crud.get_import_job(db, job_id)
+            if not job:
+                return {"error": f"Import job {job_id} not found"}, 404
+            response = services.generate_response(
+                "Import job retrieved", 200, job.to_dict())
+            return response, 200
+    except Exception as error:
+        return {"error get import job logic": f"{error}"}, 500
+
+
 def register_user(**data):
     try:
         with SessionLocal() as db:
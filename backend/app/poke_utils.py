@@ -1,38 +1,44 @@
 import json
+import threading
 from math import ceil
 from pathlib import Path
-import requests
-from app.pokeapi import Pokemon
+from app.pokeapi import Pokemon, get_json
+from app.reference_data import region_for_generation, get_override_move
 
 
 BASE = Path(__file__).parent
-_MOVE_OVERRIDES = json.loads((BASE / "move_overrides.json").read_text())
 ENERGY_MAP = json.loads((BASE / "lib/data/energyMap.json").read_text())
 
-
-def get_override_move(species: str) -> str | None:
-    return _MOVE_OVERRIDES.get(species.lower())
+# Balance knobs for derived card fields. After changing them, apply them to
+# stored cards with `python -m scripts.rederive_cards` (no refetch needed).
+ENERGY_PER_SYMBOL = 20
+HP_PER_RETREAT = 60
+# (minimum base stat total, rarity), highest first
+RARITY_THRESHOLDS = ((550, "Rare"), (400, "Uncommon"))
+# Species-based rarities; base stats never change these
+SPECIAL_RARITIES = ("Secret Rare", "Ultra Rare")
 
 
 def determine_set_code(p: Pokemon) -> str:
     """
     Uses the Pokémon's species→generation_url→region pipeline
-    to derive a region name (e.g. "Kanto", "Johto").
+    to derive a region name (e.g. "Kanto", "Johto"). The region comes from
+    the bundled generation table, so no request is made per card.
     """
     species = p.fetch_species_info()
     gen_url = species.get("generation_url")
     if not gen_url:
         return "Unknown"
-    resp = requests.get(gen_url)
-    resp.raise_for_status()
-    region = resp.json().get("main_region", {}).get("name", "")
+    region = region_for_generation(gen_url)
     return region.title() or "Unknown"
 
 
-def get_move_info(move_url: str) -> dict:
-    resp = requests.get(move_url)
-    resp.raise_for_status()
-    data = resp.json()
+# Process-wide move details keyed by move URL, shared by every import.
+_MOVE_STORE: dict[str, dict] = {}
+_MOVE_STORE_LOCK = threading.Lock()
+
+
+def summarize_move(data: dict) -> dict:
     return {
         "name":  data["name"].replace("-", " ").title(),
         "power": data.get("power") or 0,
@@ -40,11 +46,35 @@ def get_move_info(move_url: str) -> dict:
     }
 
 
+def remember_move(move_url: str, data: dict) -> dict:
+    """Store a raw /move/ response in the move store and return its summary."""
+    info = summarize_move(data)
+    with _MOVE_STORE_LOCK:
+        _MOVE_STORE[move_url] = info
+    return info
+
+
+def is_move_known(move_url: str) -> bool:
+    return move_url in _MOVE_STORE
+
+
+def clear_move_store():
+    with _MOVE_STORE_LOCK:
+        _MOVE_STORE.clear()
+
+
+def get_move_info(move_url: str) -> dict:
+    info = _MOVE_STORE.get(move_url)
+    if info is None:
+        info = remember_move(move_url, get_json(move_url))
+    return info
+
+
 def map_power_to_damage(power: int) -> int:
     return power
 
 
-def map_damage_to_cost(damage: int, energy_per_symbol: int = 20) -> int:
+def map_damage_to_cost(damage: int, energy_per_symbol: int = ENERGY_PER_SYMBOL) -> int:
     return max(1, ceil(damage / energy_per_symbol))
 
 
@@ -55,7 +85,7 @@ def format_cost_symbols(count: int, poke_type: str) -> str:
     return symbols
 
 
-def map_hp_to_retreat(hp: int, hp_per_retreat: int = 60) -> int:
+def map_hp_to_retreat(hp: int, hp_per_retreat: int = HP_PER_RETREAT) -> int:
     return max(1, ceil(hp / hp_per_retreat))
 
 
@@ -65,38 +95,95 @@ def calculate_rarity(p: Pokemon) -> str:
         return "Secret Rare"
     if species["is_legendary"]:
         return "Ultra Rare"
-    total = sum(s["base_stat"] for s in p.raw_data["stats"])
-    if total >= 550:
-        return "Rare"
-    if total >= 400:
-        return "Uncommon"
+    return rarity_for_stat_total(sum(p.stats.values()))
+
+
+def rarity_for_stat_total(total: int, thresholds=RARITY_THRESHOLDS) -> str:
+    for minimum, rarity in thresholds:
+        if total >= minimum:
+            return rarity
     return "Common"
 
 
+def candidate_moves(p: Pokemon) -> list[str]:
+    """
+    URLs of the moves select_best_levelup_move will look at:
+    the override move if one is configured, otherwise every level-up move
+    (or every move, for Pokémon without level-up moves).
+    """
+    override = get_override_move(p.name)
+    if override:
+        if p.override_move is None:
+            raise ValueError(f"Override move '{override}' not found for {p.name}")
+        return [p.override_move]
+    return list(p.moves)
+
+
 def select_best_levelup_move(p: Pokemon) -> dict:
     """
     1) If an override move exists, use it.
     2) Else filter for level-up moves, pick the highest-power one.
     """
-    override = get_override_move(p.name)
-    if override:
-        for entry in p.raw_data["moves"]:
-            move_name = entry["move"]["name"]
-            if move_name.lower() == override.lower():
-                return get_move_info(entry["move"]["url"])
-        # override specified but not found
-        raise ValueError(f"Override move '{override}' not found for {p.name}")
-
-    # filter level-up moves
-    level_moves = [
-        e for e in p.raw_data["moves"]
-        if any(v["move_learn_method"]["name"] == "level-up"
-               for v in e["version_group_details"])
-    ] or p.raw_data["moves"]
+    moves = candidate_moves(p)
+    if get_override_move(p.name):
+        return get_move_info(moves[0])
 
     best = {"name": None, "power": 0, "type": p.types[0]}
-    for entry in level_moves:
-        info = get_move_info(entry["move"]["url"])
+    for url in moves:
+        info = get_move_info(url)
         if info["power"] >= best["power"]:
             best = info
     return best
+
+
+def cost_text(symbols: list[str]) -> str:
+    # The text PostgreSQL stores when an import writes the symbol list
+    return "{" + ",".join(symbols) + "}"
+
+
+class CardRules:
+    """
+    The derived-field rules (attack cost, retreat cost, rarity), applied to
+    values already stored on a card. Results are memoized per distinct
+    input, so rederiving a whole catalog costs one computation per distinct
+    (damage, type), hp and stat total rather than one per card.
+    """
+
+    def __init__(self, energy_per_symbol: int | None = None, hp_per_retreat: int | None = None,
+                 rarity_thresholds=None):
+        self.energy_per_symbol = energy_per_symbol or ENERGY_PER_SYMBOL
+        self.hp_per_retreat = hp_per_retreat or HP_PER_RETREAT
+        self.rarity_thresholds = tuple(sorted(rarity_thresholds or RARITY_THRESHOLDS, reverse=True))
+        self._costs = {}
+        self._retreats = {}
+        self._rarities = {}
+
+    def cost(self, damage: int, card_type: str | None) -> str:
+        key = (damage, card_type)
+        if key not in self._costs:
+            count = map_damage_to_cost(damage, self.energy_per_symbol)
+            self._costs[key] = cost_text(format_cost_symbols(count, card_type or "colorless"))
+        return self._costs[key]
+
+    def retreat(self, hp: int) -> int:
+        if hp not in self._retreats:
+            self._retreats[hp] = map_hp_to_retreat(hp, self.hp_per_retreat)
+        return self._retreats[hp]
+
+    def rarity(self, total: int) -> str:
+        if total not in self._rarities:
+            self._rarities[total] = rarity_for_stat_total(total, self.rarity_thresholds)
+        return self._rarities[total]
+
+    def changes(self, card) -> dict:
+        """Derived fields of `card` (a row or Card) whose stored value is out of date."""
+        derived = {}
+        if card.attack_1_dmg is not None:
+            derived["attack_1_cost"] = self.cost(card.attack_1_dmg, card.type)
+        if card.attack_2_dmg is not None:
+            derived["attack_2_cost"] = self.cost(card.attack_2_dmg, card.type)
+        if card.hp is not None:
+            derived["retreat_cost"] = self.retreat(card.hp)
+        if card.base_stat_total is not None and card.rarity not in SPECIAL_RARITIES:
+            derived["rarity"] = self.rarity(card.base_stat_total)
+        return {k: v for k, v in derived.items() if getattr(card, k) != v}
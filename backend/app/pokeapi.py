@@ -1,42 +1,250 @@
 # pokeapi.py
+import os
+import json
+import logging
+import threading
 import requests
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import lru_cache
+from app.rate_limit import TokenBucket
+from app.singleflight import SingleFlight
+from app.pokeapi_cache import get_cache
+from app.reference_data import POKEAPI_BASE_URL, get_type_chart, get_override_move
+from app.datasource import DataSource, open_source
+from app.pokeapi_stream import extract_pokemon
+
+logger = logging.getLogger(__name__)
+
+# "network" (default) or the path of a local PokeAPI dump, see app.datasource.
+POKEAPI_SOURCE = os.getenv("POKEAPI_SOURCE", "network")
+# Shared by every outbound PokeAPI request in this process (requests/second).
+POKEAPI_RATE_LIMIT = float(os.getenv("POKEAPI_RATE_LIMIT", "20"))
+POKEAPI_BURST = float(os.getenv("POKEAPI_BURST", "40"))
+limiter = TokenBucket(POKEAPI_RATE_LIMIT, POKEAPI_BURST)
+# Concurrent requests for one URL, from any thread or event loop, share a
+# single fetch. Results are (body, None) or (None, response), as from
+# NetworkSource._fetch.
+inflight = SingleFlight()
+
+# Responses fetched ahead of time (see app.pokeapi_async), keyed by URL;
+# either parsed JSON or the raw response body, or for /pokemon/ URLs the
+# already parsed Pokemon record.
+_primed: ContextVar[dict | None] = ContextVar("pokeapi_primed", default=None)
+
+# Pokemon records parsed by a range prefetch, keyed by /pokemon/ URL, for
+# Pokemon.fetch to take instead of parsing the body again. Each is taken
+# once, so the store drains as the range is imported.
+POKEAPI_PREFETCHED_POKEMON = int(os.getenv("POKEAPI_PREFETCHED_POKEMON", "4096"))
+_PREFETCHED: dict[str, "Pokemon"] = {}
+_PREFETCHED_LOCK = threading.Lock()
+
+
+@contextmanager
+def primed(responses: dict):
+    """Serve get_json() from `responses` first while the block runs."""
+    token = _primed.set(responses)
+    try:
+        yield
+    finally:
+        _primed.reset(token)
+
+
+def remember_pokemon(url: str, record: "Pokemon"):
+    with _PREFETCHED_LOCK:
+        # past the cap (say, an abandoned range) cards just parse again
+        if len(_PREFETCHED) < POKEAPI_PREFETCHED_POKEMON:
+            _PREFETCHED[url] = record
+
+
+def prefetched_pokemon(url: str) -> "Pokemon | None":
+    return _PREFETCHED.get(url)
+
+
+def clear_prefetched_pokemon():
+    with _PREFETCHED_LOCK:
+        _PREFETCHED.clear()
+
+
+def _take_pokemon(url: str) -> "Pokemon | None":
+    with _PREFETCHED_LOCK:
+        record = _PREFETCHED.pop(url, None)
+    responses = _primed.get()
+    primed_record = responses.get(url) if responses else None
+    return primed_record if isinstance(primed_record, Pokemon) else record
+
+
+class NetworkSource(DataSource):
+    """
+    Live PokeAPI, through the persistent response cache and the shared
+    rate limit on cache misses.
+    """
+    name = "network"
+
+    def _fetch(self, url: str):
+        """(cached body, None) or (None, fresh response already cached)."""
+        return inflight.do(url, lambda: self._fetch_now(url))
+
+    def _fetch_now(self, url: str):
+        cache = get_cache()
+        cached = cache.get(url) if cache else None
+        if cached and cached.fresh:
+            return cached.body, None
+
+        limiter.acquire()
+        if cached:
+            resp = requests.get(url, headers=cached.conditional_headers())
+            if resp.status_code == 304:
+                cache.revalidated(url)
+                return cached.body, None
+        else:
+            resp = requests.get(url)
+        resp.raise_for_status()
+        if cache:
+            cache.put(url, resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return None, resp
+
+    def get_json(self, url: str) -> dict:
+        body, resp = self._fetch(url)
+        return json.loads(body) if resp is None else resp.json()
+
+    def get_raw(self, url: str) -> bytes:
+        body, resp = self._fetch(url)
+        return body if resp is None else resp.content
+
+
+_source: DataSource | None = None
+_source_lock = threading.Lock()
+
+
+def get_source() -> DataSource:
+    global _source
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = _make_source(POKEAPI_SOURCE)
+                logger.info(f"PokeAPI data source: {_source.name}")
+    return _source
+
+
+def set_source(source: DataSource | str):
+    """Switch data source, e.g. set_source("/data/pokeapi-dump.tar.gz")."""
+    global _source
+    with _source_lock:
+        _source = source if isinstance(source, DataSource) else _make_source(source)
+    Pokemon.parse_fetched.cache_clear()
+    Pokemon.species_info.cache_clear()
+    clear_prefetched_pokemon()
+
+
+def _make_source(spec: str) -> DataSource:
+    if not spec or spec == "network":
+        return NetworkSource()
+    return open_source(spec)
+
+
+def uses_network() -> bool:
+    return isinstance(get_source(), NetworkSource)
+
+
+def get_json(url: str) -> dict:
+    """Read a PokeAPI resource from the configured data source."""
+    responses = _primed.get()
+    if responses and url in responses:
+        value = responses[url]
+        return value if isinstance(value, dict) else json.loads(value)
+    return get_source().get_json(url)
+
+
+def get_raw(url: str) -> bytes:
+    """The undecoded JSON body of a PokeAPI resource, for streaming parsers."""
+    responses = _primed.get()
+    if responses and url in responses:
+        value = responses[url]
+        return json.dumps(value).encode() if isinstance(value, dict) else value
+    return get_source().get_raw(url)
+
+
+def cache_stats() -> dict:
+    cache = get_cache()
+    stats = cache.stats() if cache else {}
+    stats["inflight"] = inflight.stats()
+    return stats
+
 
 class Pokemon:
-    BASE_URL     = "https://pokeapi.co/api/v2/pokemon/"
-    TYPE_URL     = "https://pokeapi.co/api/v2/type/"
-    SPECIES_URL  = "https://pokeapi.co/api/v2/pokemon-species/"
-
-    def __init__(self, data: dict):
-        self.raw_data = data
-        self.id       = data["id"]
-        self.name     = data["name"].capitalize()
-        self.types    = [t["type"]["name"].title() for t in data["types"]]
-        # find HP stat by name
-        self.hp       = next(s["base_stat"] for s in data["stats"] if s["stat"]["name"] == "hp")
-        self.sprite   = data["sprites"]["front_default"]
+    """
+    Compact record of a /pokemon/ resource holding only what the card
+    pipeline reads. The raw payload is not kept: its `moves` array carries
+    per-version-group details and can run to hundreds of KB per Pokémon.
+
+    `moves` are the URLs of the level-up moves (every move if there are
+    none), deduplicated; `override_move` is the URL of the species' pinned
+    move from move_overrides.json, if it has one and PokeAPI lists it.
+    """
+    __slots__ = ("id", "name", "types", "hp", "stats", "sprite", "moves", "override_move")
+
+    BASE_URL     = f"{POKEAPI_BASE_URL}pokemon/"
+    TYPE_URL     = f"{POKEAPI_BASE_URL}type/"
+    SPECIES_URL  = f"{POKEAPI_BASE_URL}pokemon-species/"
+
+    def __init__(self, id: int, name: str, types: tuple[str, ...], stats: dict[str, int],
+                 sprite: str | None, moves: tuple[str, ...] = (), override_move: str | None = None):
+        self.id       = id
+        self.name     = name
+        self.types    = types
+        self.stats    = stats
+        self.hp       = stats.get("hp", 0)
+        self.sprite   = sprite
+        self.moves    = moves
+        self.override_move = override_move
+
+    @classmethod
+    def from_stream(cls, source, prefix: str = "") -> "Pokemon":
+        """Build straight from the raw bytes (or file) of a /pokemon/ payload."""
+        f = extract_pokemon(source, prefix)
+        return cls._build(f["id"], f["name"], f["types"], f["stats"], f["sprite"], f["moves"])
+
+    @classmethod
+    def _build(cls, id, name, types, stats, sprite, moves) -> "Pokemon":
+        # moves: (name, url, learned_by_level_up) per entry
+        override = (get_override_move(name) or "").lower()
+        override_url = None
+        levelup, every = {}, {}
+        for move_name, url, level_up in moves:
+            every[url] = None
+            if level_up:
+                levelup[url] = None
+            if override_url is None and move_name.lower() == override:
+                override_url = url
+
+        return cls(
+            id=id,
+            name=name.capitalize(),
+            types=tuple(t.title() for t in types),
+            stats=stats,
+            sprite=sprite,
+            moves=tuple(levelup or every),
+            override_move=override_url,
+        )
 
     @classmethod
-    @lru_cache(maxsize=128)
     def fetch(cls, identifier: str|int) -> "Pokemon":
-        resp = requests.get(f"{cls.BASE_URL}{identifier}/")
-        resp.raise_for_status()
-        return cls(resp.json())
+        # A record the prefetch already parsed saves parsing the body again
+        record = _take_pokemon(f"{cls.BASE_URL}{identifier}/")
+        return record if record is not None else cls.parse_fetched(identifier)
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def parse_fetched(cls, identifier: str|int) -> "Pokemon":
+        return cls.from_stream(get_raw(f"{cls.BASE_URL}{identifier}/"))
 
-    @lru_cache(maxsize=32)
     def fetch_damage_relations(self) -> dict:
+        # Served from the bundled type chart; no network involved.
         if not self.types:
             return {"weakness": [], "resistance": []}
-        primary = self.types[0].lower()
-        resp = requests.get(f"{self.TYPE_URL}{primary}/")
-        resp.raise_for_status()
-        dr = resp.json()["damage_relations"]
-        return {
-            "weakness":   [t["name"].title() for t in dr["double_damage_from"]],
-            "resistance": [t["name"].title() for t in dr["half_damage_from"]],
-        }
+        return get_type_chart().damage_relations(self.types[0])
 
-    @lru_cache(maxsize=32)
     def fetch_species_info(self) -> dict:
         """
         Returns:
@@ -44,9 +252,13 @@ class Pokemon:
           - is_mythical:  bool
           - generation_url: str
         """
-        resp = requests.get(f"{self.SPECIES_URL}{self.id}/")
-        resp.raise_for_status()
-        data = resp.json()
+        return self.species_info(self.id)
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def species_info(cls, pokemon_id: int) -> dict:
+        # Keyed on the id, so every record of a species shares one entry
+        data = get_json(f"{cls.SPECIES_URL}{pokemon_id}/")
         return {
             "is_legendary": data.get("is_legendary", False),
             "is_mythical":  data.get("is_mythical", False),
@@ -0,0 +1,256 @@
+# pokeapi_async.py
+import os
+import json
+import asyncio
+import logging
+import threading
+import httpx
+from app import pokeapi
+from app.pokeapi import Pokemon
+from app.pokeapi_cache import get_cache
+from app.poke_utils import candidate_moves, is_move_known, remember_move
+from app.reference_data import is_generation_known
+
+logger = logging.getLogger(__name__)
+
+POKEAPI_PREFETCH = os.getenv("POKEAPI_PREFETCH", "1") not in ("0", "false", "False")
+# Max in-flight requests per card.
+POKEAPI_CONCURRENCY = int(os.getenv("POKEAPI_CONCURRENCY", "10"))
+POKEAPI_TIMEOUT = float(os.getenv("POKEAPI_TIMEOUT", "10"))
+
+
+class AsyncPokeAPIClient:
+    """
+    Fetches everything one card needs with as much overlap as the data
+    dependencies allow:
+
+        pokemon ───── moves (all candidates, concurrently)
+        species ───── generation (only if missing from the bundled table)
+
+    Type relations come from the bundled type chart and need no request.
+
+    `species` starts alongside `pokemon` when the identifier is a dex number,
+    otherwise as soon as `pokemon` returns the id.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, concurrency: int = POKEAPI_CONCURRENCY):
+        self.client = client
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Raw response bodies, which pokeapi.primed() decodes on use, and
+        # the parsed Pokemon record under its /pokemon/ URL.
+        self.responses: dict[str, bytes | Pokemon] = {}
+
+    async def get_raw(self, url: str, keep: bool = True) -> bytes:
+        if url in self.responses:
+            return self.responses[url]
+        # Shared with every other client and sync fetch in the process
+        body, resp = await pokeapi.inflight.do_async(url, lambda: self._fetch(url))
+        if body is None:
+            body = resp.content
+        if keep:
+            self.responses[url] = body
+        return body
+
+    async def _fetch(self, url: str) -> tuple[bytes, None]:
+        cache = get_cache()
+        cached = cache.get(url) if cache else None
+        if cached and cached.fresh:
+            return cached.body, None
+        async with self._semaphore:
+            await asyncio.sleep(pokeapi.limiter.reserve())
+            resp = await self.client.get(
+                url, headers=cached.conditional_headers() if cached else None)
+        if cached and resp.status_code == 304:
+            cache.revalidated(url)
+            return cached.body, None
+        resp.raise_for_status()
+        if cache:
+            cache.put(url, resp.content, resp.headers.get("ETag"),
+                      resp.headers.get("Last-Modified"))
+        return resp.content, None
+
+    async def get_json(self, url: str, keep: bool = True) -> dict:
+        return json.loads(await self.get_raw(url, keep))
+
+    async def _try_get(self, url: str, keep: bool = True, raw: bool = False) -> dict | bytes | None:
+        # Prefetching is best-effort: the sync path refetches and reports errors.
+        try:
+            body = await self.get_raw(url, keep)
+            return body if raw else json.loads(body)
+        except Exception as error:
+            logger.info(f"Prefetch of {url} failed: {error}")
+            return None
+
+    async def _move(self, url: str):
+        # Moves go to the shared move store rather than the per-card responses.
+        if is_move_known(url):
+            return
+        data = await self._try_get(url, keep=False)
+        if data:
+            remember_move(url, data)
+
+    async def _species_chain(self, pokemon_id: int | str):
+        species = await self._try_get(f"{Pokemon.SPECIES_URL}{pokemon_id}/")
+        gen_url = (species or {}).get("generation", {}).get("url")
+        if gen_url and not is_generation_known(gen_url):
+            await self._try_get(gen_url)
+
+    async def _pokemon(self, identifier: str | int) -> Pokemon | None:
+        # Parsed once: a range prefetch leaves its records in the store, and
+        # the card's own record goes to Pokemon.fetch through primed().
+        url = f"{Pokemon.BASE_URL}{identifier}/"
+        record = pokeapi.prefetched_pokemon(url)
+        if record is not None:
+            return record
+        # The raw body is not kept: a range would otherwise pin every
+        # /pokemon/ payload.
+        body = await self._try_get(url, keep=False, raw=True)
+        if not body:
+            return None
+        try:
+            return Pokemon.from_stream(body)
+        except ValueError:
+            return None
+
+    async def _pokemon_chain(self, identifier: str | int, species_started: bool):
+        p = await self._pokemon(identifier)
+        if p is None:
+            return
+        self.responses[f"{Pokemon.BASE_URL}{identifier}/"] = p
+        tasks = []
+        if not species_started:
+            tasks.append(self._species_chain(p.id))
+        try:
+            moves = candidate_moves(p)
+        except ValueError:
+            moves = []
+        tasks.extend(self._move(url) for url in moves)
+        await asyncio.gather(*tasks)
+
+    async def fetch_card_resources(self, identifier: str | int) -> dict[str, bytes | Pokemon]:
+        numeric = str(identifier).isdigit()
+        chains = [self._pokemon_chain(identifier, species_started=numeric)]
+        if numeric:
+            chains.append(self._species_chain(int(identifier)))
+        await asyncio.gather(*chains)
+        return self.responses
+
+    async def _candidate_move_urls(self, identifier: str | int) -> list[str]:
+        p = await self._pokemon(identifier)
+        if p is None:
+            return []
+        pokeapi.remember_pokemon(f"{Pokemon.BASE_URL}{identifier}/", p)
+        try:
+            return candidate_moves(p)
+        except ValueError:
+            return []
+
+    async def fetch_range_moves(self, identifiers) -> int:
+        """
+        Fill the move store with every move a range import will look at,
+        fetching each distinct move once. Returns the number fetched.
+        """
+        url_lists = await asyncio.gather(*(self._candidate_move_urls(i) for i in identifiers))
+        wanted = {url for urls in url_lists for url in urls if not is_move_known(url)}
+        await asyncio.gather(*(self._move(url) for url in wanted))
+        return len(wanted)
+
+
+async def fetch_card_resources(identifier: str | int) -> dict[str, bytes | Pokemon]:
+    async with httpx.AsyncClient(timeout=POKEAPI_TIMEOUT) as client:
+        return await AsyncPokeAPIClient(client).fetch_card_resources(identifier)
+
+
+async def fetch_range_moves(identifiers) -> int:
+    async with httpx.AsyncClient(timeout=POKEAPI_TIMEOUT) as client:
+        return await AsyncPokeAPIClient(client).fetch_range_moves(identifiers)
+
+
+class PrefetchSession:
+    """
+    One event loop and one pooled httpx.AsyncClient shared by every card of
+    an import, so cards reuse kept-alive connections instead of each paying
+    for a new loop, SSL context and connection pool. The loop runs on its
+    own thread and is started on first use; the prefetch functions below may
+    be handed the session from any number of worker threads. close() it (or
+    use it as a context manager) when the import is over.
+    """
+
+    def __init__(self, timeout: float = POKEAPI_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def run(self, make_coro):
+        """Run `make_coro(client)` on the session's loop and wait for its result."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="pokeapi-prefetch", daemon=True)
+                self._thread.start()
+            if self._client is None:
+                self._client = self._submit(self._open()).result()
+        return self._submit(make_coro(self._client)).result()
+
+    async def _open(self) -> httpx.AsyncClient:
+        # created on the loop that will use it
+        return httpx.AsyncClient(timeout=self.timeout)
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                if self._client is not None:
+                    self._submit(self._client.aclose()).result()
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+                self._loop = self._thread = self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prefetch_range_moves(identifiers, session: PrefetchSession | None = None) -> int:
+    """Sync wrapper around `fetch_range_moves`, on `session` if given."""
+    if not POKEAPI_PREFETCH or not pokeapi.uses_network():
+        return 0
+    identifiers = list(identifiers)
+    try:
+        if session is not None:
+            return session.run(lambda client: AsyncPokeAPIClient(client).fetch_range_moves(identifiers))
+        return asyncio.run(fetch_range_moves(identifiers))
+    except Exception as error:
+        logger.info(f"Move prefetch failed: {error}")
+        return 0
+
+
+def prefetch_card_resources(identifier: str | int,
+                            session: PrefetchSession | None = None) -> dict[str, bytes | Pokemon]:
+    """
+    Sync wrapper: returns {url: response body} for every PokeAPI resource the
+    card builder will request (the parsed Pokemon for its /pokemon/ URL),
+    ready for `pokeapi.primed(...)`. Offline data sources are already local,
+    so there is nothing to prefetch. Imports of many cards pass a shared
+    `session`; without one a client is opened for this card alone.
+    """
+    if not POKEAPI_PREFETCH or not pokeapi.uses_network():
+        return {}
+    try:
+        if session is not None:
+            return session.run(lambda client: AsyncPokeAPIClient(client).fetch_card_resources(identifier))
+        return asyncio.run(fetch_card_resources(identifier))
+    except Exception as error:
+        logger.info(f"Prefetch for {identifier} failed: {error}")
+        return {}
@@ -0,0 +1,168 @@
+# pokeapi_cache.py
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# An empty POKEAPI_CACHE_PATH disables the persistent cache.
+POKEAPI_CACHE_PATH = os.getenv(
+    "POKEAPI_CACHE_PATH", os.path.join(tempfile.gettempdir(), "pokeapi_cache.sqlite3"))
+POKEAPI_CACHE_TTL = int(os.getenv("POKEAPI_CACHE_TTL", str(7 * 24 * 3600)))
+POKEAPI_CACHE_MAX_MB = int(os.getenv("POKEAPI_CACHE_MAX_MB", "256"))
+
+
+class CachedResponse:
+    __slots__ = ("url", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, url, body, etag, last_modified, expires_at):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent PokeAPI response cache keyed by URL, stored in SQLite.
+
+    Entries live for `ttl` seconds; stale entries that carried an ETag or
+    Last-Modified header are revalidated instead of refetched. When the
+    stored bodies exceed `max_bytes` the least recently used entries are
+    evicted.
+    """
+
+    def __init__(self, path: str, ttl: int = POKEAPI_CACHE_TTL,
+                 max_bytes: int = POKEAPI_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_last_access ON response (last_access)")
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM response WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            entry = CachedResponse(url, *row)
+            if entry.fresh:
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE response SET last_access = ? WHERE url = ?", (time.time(), url))
+            else:
+                self.misses += 1
+            return entry
+
+    def put(self, url: str, body: bytes, etag: str | None = None,
+            last_modified: str | None = None):
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM response WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now + self.ttl, now, len(body)))
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def revalidated(self, url: str):
+        """Record a 304: the stored body is good for another `ttl` seconds."""
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._conn.execute(
+                "UPDATE response SET expires_at = ?, last_access = ? WHERE url = ?",
+                (now + self.ttl, now, url))
+
+    def _evict(self):
+        # Drop least recently used entries until we are back under 90% of the limit.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT url, size FROM response ORDER BY last_access ASC").fetchall()
+        doomed = []
+        for url, size in rows:
+            if self._size <= target:
+                break
+            doomed.append((url,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM response WHERE url = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response")
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM response").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._size,
+        }
+
+
+_cache: ResponseCache | None = None
+_cache_disabled = not POKEAPI_CACHE_PATH
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """The process-wide cache, or None when it is disabled or unavailable."""
+    global _cache, _cache_disabled
+    if _cache is None and not _cache_disabled:
+        with _cache_lock:
+            if _cache is None and not _cache_disabled:
+                try:
+                    _cache = ResponseCache(POKEAPI_CACHE_PATH)
+                except sqlite3.Error as error:
+                    logger.warning(f"PokeAPI cache disabled, cannot open {POKEAPI_CACHE_PATH}: {error}")
+                    _cache_disabled = True
+    return _cache
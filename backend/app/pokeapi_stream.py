@@ -0,0 +1,89 @@
+# pokeapi_stream.py
+"""
+Streaming extraction of the /pokemon/ fields the card pipeline uses.
+
+A /pokemon/ payload is mostly its `moves` array, where every move repeats
+its learn method for each version group, plus sprites for every game.
+json.loads would build all of that into Python objects only for Pokemon to
+read a few fields and throw the rest away. Here ijson walks the byte stream
+event by event instead, and only these paths become Python values:
+
+    id, name, types[].type.name, stats[].{stat.name, base_stat},
+    sprites.front_default, moves[].move.{name, url} and whether any of the
+    move's version_group_details has the level-up learn method.
+
+Everything else is skipped as it streams past.
+"""
+import io
+import ijson
+
+
+def _paths(prefix: str) -> dict[str, str]:
+    base = f"{prefix}." if prefix else ""
+    return {
+        f"{base}id": "id",
+        f"{base}name": "name",
+        f"{base}types.item.type.name": "type",
+        f"{base}stats.item.stat.name": "stat_name",
+        f"{base}stats.item.base_stat": "base_stat",
+        f"{base}stats.item": "stat_end",
+        f"{base}sprites.front_default": "sprite",
+        f"{base}moves.item.move.name": "move_name",
+        f"{base}moves.item.move.url": "move_url",
+        f"{base}moves.item.version_group_details.item.move_learn_method.name": "learn_method",
+        f"{base}moves.item": "move_end",
+    }
+
+
+_ROOT_PATHS = _paths("")
+
+
+def extract_pokemon(source: bytes | io.RawIOBase, prefix: str = "") -> dict:
+    """
+    Pull the card fields out of a /pokemon/ payload given as bytes or a
+    binary file object. `prefix` is the ijson path of the resource when it
+    is nested in a larger document (e.g. "data" for JSONL dump lines).
+
+    Returns id, name (as in PokeAPI), types, stats ({name: base_stat}),
+    sprite and moves, a list of (name, url, learned_by_level_up) tuples in
+    payload order.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    paths = _ROOT_PATHS if not prefix else _paths(prefix)
+
+    fields = {"id": None, "name": None, "types": [], "stats": {}, "sprite": None, "moves": []}
+    stat_name = base_stat = None
+    move_name = move_url = None
+    level_up = False
+    for path, event, value in ijson.parse(source, use_float=True):
+        kind = paths.get(path)
+        if kind is None:
+            continue
+        if kind == "learn_method":
+            level_up = level_up or value == "level-up"
+        elif kind == "move_name":
+            move_name = value
+        elif kind == "move_url":
+            move_url = value
+        elif kind == "move_end":
+            if event == "end_map":
+                fields["moves"].append((move_name, move_url, level_up))
+                move_name = move_url = None
+                level_up = False
+        elif kind == "stat_name":
+            stat_name = value
+        elif kind == "base_stat":
+            base_stat = value
+        elif kind == "stat_end":
+            if event == "end_map":
+                fields["stats"][stat_name] = base_stat
+                stat_name = base_stat = None
+        elif kind == "type":
+            fields["types"].append(value)
+        elif event not in ("start_map", "start_array", "end_map", "end_array", "map_key"):
+            fields[kind] = value
+
+    if fields["id"] is None or fields["name"] is None:
+        raise ValueError("Not a PokeAPI /pokemon/ resource")
+    return fields
@@ -0,0 +1,47 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `capacity`. A rate of 0 (or less)
+    disables limiting entirely.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self._lock = threading.Lock()
+        self.configure(rate, capacity)
+
+    def configure(self, rate: float, capacity: float | None = None):
+        with self._lock:
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else max(1.0, rate)
+            self._tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take `tokens` from the bucket and return how many seconds the caller
+        must wait before using them. The bucket may go negative, which queues
+        later callers behind earlier ones.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until `tokens` are available. Returns the time spent waiting."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
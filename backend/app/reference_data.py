@@ -0,0 +1,174 @@
+# reference_data.py
+"""
+Small, rarely changing PokeAPI reference tables bundled with the app so card
+imports never need the network for them.
+
+typeChart.json holds the 18 types in PokeAPI id order and a square matrix of
+damage multipliers; rows are the attacking type, columns the defending type.
+generationRegions.json maps generation ids to their main region name.
+move_overrides.json pins the attack used for specific species.
+"""
+import os
+import json
+import threading
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent / "lib/data"
+TYPE_CHART_PATH = DATA_DIR / "typeChart.json"
+GENERATION_REGIONS_PATH = DATA_DIR / "generationRegions.json"
+# Root of the PokeAPI to talk to; point it at a mirror or a local stand-in
+# (see benchmarks/) to import without the public API.
+POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2/").rstrip("/") + "/"
+GENERATION_URL = f"{POKEAPI_BASE_URL}generation/"
+MOVE_OVERRIDES_PATH = Path(__file__).parent / "move_overrides.json"
+
+# Multipliers are stored as one byte each, scaled by 2 (0, ½, 1, 2 -> 0, 1, 2, 4).
+_SCALE = 2
+
+
+class TypeChart:
+    __slots__ = ("types", "_index", "_matrix", "_relations")
+
+    def __init__(self, types: list[str], matrix: list[list[float]]):
+        n = len(types)
+        if len(matrix) != n or any(len(row) != n for row in matrix):
+            raise ValueError(f"Type chart must be {n}x{n}")
+        self.types = tuple(t.lower() for t in types)
+        self._index = {t: i for i, t in enumerate(self.types)}
+        self._matrix = bytes(int(m * _SCALE) for row in matrix for m in row)
+        self._relations = {t: self._derive_relations(i) for t, i in self._index.items()}
+
+    def _derive_relations(self, defending: int) -> dict:
+        n = len(self.types)
+        column = [self._matrix[a * n + defending] for a in range(n)]
+        return {
+            "weakness":   [self.types[a].title() for a, m in enumerate(column) if m == 2 * _SCALE],
+            "resistance": [self.types[a].title() for a, m in enumerate(column) if m == _SCALE // 2],
+        }
+
+    def multiplier(self, attacking: str, defending: str) -> float:
+        a = self._index[attacking.lower()]
+        d = self._index[defending.lower()]
+        return _unscale(self._matrix[a * len(self.types) + d])
+
+    def damage_relations(self, defending: str) -> dict:
+        """Weakness (double damage from) and resistance (half damage from)."""
+        relations = self._relations.get(defending.lower())
+        if relations is None:
+            return {"weakness": [], "resistance": []}
+        return {key: list(value) for key, value in relations.items()}
+
+    def to_dict(self) -> dict:
+        n = len(self.types)
+        return {
+            "types": list(self.types),
+            "matrix": [
+                [_unscale(self._matrix[a * n + d]) for d in range(n)] for a in range(n)
+            ],
+        }
+
+    @classmethod
+    def load(cls, path: Path = TYPE_CHART_PATH) -> "TypeChart":
+        data = json.loads(Path(path).read_text())
+        return cls(data["types"], data["matrix"])
+
+
+def _unscale(value: int) -> int | float:
+    return value // _SCALE if value % _SCALE == 0 else value / _SCALE
+
+
+_type_chart: TypeChart | None = None
+_generation_regions: dict[str, str] | None = None
+_lock = threading.Lock()
+_MOVE_OVERRIDES: dict[str, str] = json.loads(MOVE_OVERRIDES_PATH.read_text())
+
+
+def get_override_move(species: str) -> str | None:
+    return _MOVE_OVERRIDES.get(species.lower())
+
+
+def get_type_chart() -> TypeChart:
+    global _type_chart
+    if _type_chart is None:
+        with _lock:
+            if _type_chart is None:
+                _type_chart = TypeChart.load()
+    return _type_chart
+
+
+def refresh_type_chart(path: Path = TYPE_CHART_PATH) -> TypeChart:
+    """Rebuild the type chart from PokeAPI /type/ resources and save it."""
+    from app.pokeapi import Pokemon, get_json
+
+    global _type_chart
+    types = list(get_type_chart().types)
+    index = {t: i for i, t in enumerate(types)}
+    matrix = [[1] * len(types) for _ in types]
+    for attacking in types:
+        relations = get_json(f"{Pokemon.TYPE_URL}{attacking}/")["damage_relations"]
+        row = matrix[index[attacking]]
+        for key, value in (("double_damage_to", 2), ("half_damage_to", 0.5), ("no_damage_to", 0)):
+            for t in relations[key]:
+                if t["name"] in index:
+                    row[index[t["name"]]] = value
+
+    chart = TypeChart(types, matrix)
+    Path(path).write_text(_format_chart(chart.to_dict()))
+    _type_chart = chart
+    return chart
+
+
+def _format_chart(data: dict) -> str:
+    rows = ",\n".join(f"        {json.dumps(row)}" for row in data["matrix"])
+    return f'{{\n    "types": {json.dumps(data["types"])},\n    "matrix": [\n{rows}\n    ]\n}}\n'
+
+
+def generation_id(generation_url: str) -> str:
+    """'https://pokeapi.co/api/v2/generation/2/' -> '2'"""
+    return generation_url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _regions() -> dict[str, str]:
+    global _generation_regions
+    if _generation_regions is None:
+        with _lock:
+            if _generation_regions is None:
+                _generation_regions = json.loads(GENERATION_REGIONS_PATH.read_text())
+    return _generation_regions
+
+
+def is_generation_known(generation_url: str) -> bool:
+    return generation_id(generation_url) in _regions()
+
+
+def region_for_generation(generation_url: str) -> str:
+    """
+    Main region name (lowercase, "" if PokeAPI has none) for a generation.
+    Generations missing from the bundled table are fetched once and
+    remembered for the life of the process.
+    """
+    from app.pokeapi import get_json
+
+    gen_id = generation_id(generation_url)
+    regions = _regions()
+    if gen_id not in regions:
+        region = get_json(generation_url).get("main_region", {}).get("name", "")
+        with _lock:
+            regions[gen_id] = region
+    return regions[gen_id]
+
+
+def refresh_generation_regions(path: Path = GENERATION_REGIONS_PATH) -> dict[str, str]:
+    """Rebuild the generation -> region table from PokeAPI and save it."""
+    from app.pokeapi import get_json
+
+    global _generation_regions
+    listing = get_json(GENERATION_URL)
+    regions = {}
+    for entry in listing["results"]:
+        data = get_json(entry["url"])
+        regions[str(data["id"])] = (data.get("main_region") or {}).get("name", "")
+    regions = dict(sorted(regions.items(), key=lambda item: int(item[0])))
+    Path(path).write_text(json.dumps(regions, indent=4) + "\n")
+    _generation_regions = regions
+    return regions
@@ -0,0 +1,111 @@
+# response_cache.py
+import os
+import json
+import time
+import hashlib
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import request, Response
+from app import serializers
+
+# Seconds clients and CDNs may reuse a catalog response without asking;
+# after that they revalidate with If-None-Match and usually get a 304.
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "60"))
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "512"))
+# Seconds a cached body is served. Writes made through app.crud invalidate
+# the cache at once; the TTL bounds staleness from writers in other
+# processes (import scripts, other workers and instances).
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", str(CATALOG_CACHE_MAX_AGE)))
+
+
+class ResponseCache:
+    """
+    Serialized 200 responses keyed by route and normalized arguments,
+    tagged with the catalog version they were built at.
+
+    invalidate() bumps the version, which retires every entry at once; an
+    entry built while the version moved is never served. Entries also
+    expire `ttl` seconds after they are stored.
+    """
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL, max_entries: int = CATALOG_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[int, float, bytes, str]] = OrderedDict()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> tuple[int, bytes | None, str | None]:
+        """(current version, body, etag); body and etag are None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.version and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self.version, entry[2], entry[3]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return self.version, None, None
+
+    def put(self, key: tuple, version: int, body: bytes, etag: str):
+        with self._lock:
+            if version != self.version or self.max_entries <= 0 or self.ttl <= 0:
+                return
+            self._entries[key] = (version, time.monotonic() + self.ttl, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"version": self.version, "entries": len(self._entries),
+                    "hits": self.hits, "misses": self.misses}
+
+
+catalog_responses = ResponseCache()
+
+
+def _etag(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def cached_response(cache: ResponseCache, max_age: int = CATALOG_CACHE_MAX_AGE):
+    """
+    Serve a public GET view from `cache`, with a strong ETag, Cache-Control
+    and If-None-Match handling. For MethodView methods; apply it below
+    @arguments so the key is the parsed (defaulted) arguments rather than
+    the raw query string. Views return (response, status) as usual; only
+    200s are cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, *args, **kwargs):
+            key = (request.endpoint, json.dumps([args, kwargs], sort_keys=True, default=str))
+            version, body, etag = cache.get(key)
+            if body is None:
+                response, status = view(self, *args, **kwargs)
+                if status != 200:
+                    return response, status
+                body = serializers.dumps(response)
+                etag = _etag(body)
+                cache.put(key, version, body, etag)
+            headers = {"Cache-Control": f"public, max-age={max_age}"}
+            if request.if_none_match.contains(etag):
+                not_modified = Response(status=304, headers=headers)
+                not_modified.set_etag(etag)
+                return not_modified
+            served = Response(body, status=200, mimetype="application/json", headers=headers)
+            served.set_etag(etag)
+            return served
+        return wrapper
+    return decorator
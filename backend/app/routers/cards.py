@@ -1,11 +1,22 @@
+from flask import request
 from flask.views import MethodView
 from flask_smorest import Blueprint
-from app.schemas import CardIn, CardUpdate, PageArgs
+from app.schemas import CardIn, CardUpdate, CardPageArgs, CardSuggestArgs
 from app import logic
 from app.services import jwt_required
+from app.response_cache import cached_response, catalog_responses
 cards_blp = Blueprint("cards", __name__, url_prefix="/api/cards",
                       description="Pokémon-TCG card operations")
 
+
+@cards_blp.after_request
+def _invalidate_catalog_responses(response):
+    # app.crud also invalidates on every card write; this covers writes
+    # that reach the catalog some other way behind these routes
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        catalog_responses.invalidate()
+    return response
+
 # ───────────────────────────────────────────────────────────────
 # 1) Import-from-Pokémon endpoint
 #    POST /api/cards/import/<identifier>
@@ -30,20 +41,47 @@ class CardImport(MethodView):
 
 @cards_blp.route("/import/range/<int:start>/<int:end>")
 class CardImportRange(MethodView):
-    """Create a range of TCG cards by scraping data from PokeAPI."""
+    """Queue a background job importing a range of TCG cards from PokeAPI."""
     @cards_blp.doc(
         security=[{"Bearer": []}],
-        description="Create a range of TCG cards from a Pokémon, auto-calculating stats, costs, rarity, and weaknesses"
+        description="Queue an import of a range of Pokémon as TCG cards. Returns the job right away; "
+                    "poll /api/cards/import/jobs/<id> for progress"
     )
     @jwt_required(["admin"])
     def post(self, start: int, end: int):
         try:
-            response, status = logic.create_tcg_card_range(start, end)
+            response, status = logic.submit_import_job(start, end)
         except Exception as e:
             return {"message": f"Failed to import Pokémon '{start} to {end}': {e}"}, 500
 
         return response, status
 
+
+@cards_blp.route("/import/jobs/<string:job_id>")
+class CardImportJob(MethodView):
+    """Progress of a card import job."""
+    @cards_blp.doc(
+        security=[{"Bearer": []}],
+        description="Status, progress, throughput, ETA and per-card errors of an import job"
+    )
+    @jwt_required(["admin"])
+    def get(self, job_id: str):
+        response, status = logic.get_import_job(job_id)
+        return response, status
+
+
+@cards_blp.route("/import/jobs/<string:job_id>/resume")
+class CardImportJobResume(MethodView):
+    """Resume an interrupted or partially failed card import job."""
+    @cards_blp.doc(
+        security=[{"Bearer": []}],
+        description="Re-queue an import job from its checkpoint, retrying only the cards that failed"
+    )
+    @jwt_required(["admin"])
+    def post(self, job_id: str):
+        response, status = logic.resume_import_job(job_id)
+        return response, status
+
 # ───────────────────────────────────────────────────────────────
 # 2) Collection endpoints
 #    POST /api/cards/     -> create from raw JSON
@@ -67,17 +105,41 @@ class CardCollection(MethodView):
         return response, status
 
     # LIST
-    @cards_blp.doc(description="Get paginated list of pokemon cards with count and pagination metadata (10 per page)")
-    @cards_blp.arguments(PageArgs, location="query")
+    @cards_blp.doc(description="Get paginated list of pokemon cards with count and pagination metadata (10 per page). "
+                               "Pass cursor (empty for the first page, then pagination.next_cursor) for keyset "
+                               "pagination, which stays fast on deep pages but returns no total count. "
+                               "Pass fields (e.g. name,image_url,type) to return and select only those fields")
+    @cards_blp.arguments(CardPageArgs, location="query")
+    @cached_response(catalog_responses)
     def get(self, args):
         page = args.get("page", 1)
         count_per_page = args.get("count_per_page", 12)
         type_filter = args.get("type_filter", None)
         pokemon_name = args.get("pokemon_name", None)
+        cursor = args.get("cursor", None)
+        card_fields = args.get("card_fields", None)
         print(f"Listing cards with page={page}, type_filter={type_filter}, pokemon_name={pokemon_name}, count_per_page={count_per_page}")
+        if cursor is not None:
+            response, status = logic.list_cards_by_cursor(cursor, type_filter, pokemon_name, count_per_page, card_fields)
+            return response, status
         if page < 1:
             page = 1
-        response, status = logic.list_cards(page, type_filter, pokemon_name, count_per_page)
+        response, status = logic.list_cards(page, type_filter, pokemon_name, count_per_page, card_fields)
+        return response, status
+
+# ───────────────────────────────────────────────────────────────
+#    GET  /api/cards/suggest?q=  -> autocomplete card names
+# ───────────────────────────────────────────────────────────────
+
+
+@cards_blp.route("/suggest")
+class CardSuggest(MethodView):
+    """Autocomplete card names from an in-memory index."""
+    @cards_blp.doc(description="Cards whose name starts with q (case-insensitive), alphabetically: "
+                               "id, name and collector_number of at most limit cards (max 50)")
+    @cards_blp.arguments(CardSuggestArgs, location="query")
+    def get(self, args):
+        response, status = logic.suggest_cards(args["q"], args["limit"])
         return response, status
 
 # ───────────────────────────────────────────────────────────────
@@ -94,6 +156,7 @@ class CardItem(MethodView):
 
     # READ
     @cards_blp.doc(description="Get a single pokemon card by identifier")
+    @cached_response(catalog_responses)
     def get(self, id):
         response, status = logic.get_card_by_id(id)
         return response, status
@@ -1,5 +1,6 @@
 from marshmallow import Schema, fields
 from marshmallow.validate import Length, Regexp
+from app.suggest import CARD_SUGGEST_LIMIT
 
 # Password validation regex (matches frontend - requires 2 uppercase, 2 numbers, 2 special)
 PASSWORD_REGEX = r"^(?=.*[A-Z].*[A-Z])(?=.*[a-z])(?=.*\d.*\d)(?=.*[@$!%*?&].*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
@@ -120,6 +121,24 @@ class PageArgs(Schema):
     class Meta:
         title = "PageArgs"
 
+class CardPageArgs(PageArgs):
+    # Opt-in keyset pagination: pass an empty cursor for the first page, then
+    # the next_cursor of each response. `page` is ignored when present.
+    cursor = fields.Str(required=False, load_default=None)
+    # Sparse fieldset, e.g. fields=name,image_url,type; id is always included
+    card_fields = fields.Str(data_key="fields", required=False, load_default=None)
+
+    class Meta:
+        title = "CardPageArgs"
+
+
+class CardSuggestArgs(Schema):
+    q = fields.Str(required=True)
+    limit = fields.Int(load_default=CARD_SUGGEST_LIMIT)
+
+    class Meta:
+        title = "CardSuggestArgs"
+
 class DeckPageArgs(PageArgs):
     class Meta:
         title="DeckPageArgs"
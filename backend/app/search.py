@@ -0,0 +1,118 @@
+# search.py
+"""
+Indexed substring search over card names.
+
+PostgreSQL: a pg_trgm GIN index on card.name, which ILIKE '%...%' can use,
+with similarity() for ranking. SQLite: an FTS5 trigram table
+<card table>_search holding (name, card_id), kept in sync with the card
+table by triggers, ranked by bm25. Both are created with the card table
+(see install_card_search) or added to existing databases by
+db.ensure_card_search. Without them, searches fall back to an unindexed ILIKE.
+"""
+import logging
+import weakref
+from sqlalchemy import event, inspect, text, table, column, literal_column, bindparam
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Trigram indexes cannot serve shorter queries
+SEARCH_MIN_CHARS = 3
+
+# engine -> {card table name: backend}
+_backends = weakref.WeakKeyDictionary()
+
+
+def search_table_name(card_table) -> str:
+    return f"{card_table.name}_search"
+
+
+def _sqlite_ddl(card_table) -> list[str]:
+    name, search = card_table.name, search_table_name(card_table)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search} "
+        f"USING fts5(name, card_id UNINDEXED, tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {search}(name, card_id) VALUES (new.name, new.id); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_ad AFTER DELETE ON {name} BEGIN "
+        f"DELETE FROM {search} WHERE card_id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_au AFTER UPDATE OF name, id ON {name} BEGIN "
+        f"DELETE FROM {search} WHERE card_id = old.id; "
+        f"INSERT INTO {search}(name, card_id) VALUES (new.name, new.id); END",
+    ]
+
+
+def _postgresql_ddl(card_table) -> list[str]:
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS ix_{card_table.name}_name_trgm "
+        f"ON {card_table.name} USING gin (name gin_trgm_ops)",
+    ]
+
+
+def create_card_search(card_table, connection):
+    """
+    Create the search index for `card_table` on `connection` and fill it
+    from existing rows. Failures (no FTS5 in this SQLite build, no
+    permission to create pg_trgm) are logged; searches then fall back
+    to ILIKE.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        statements = _sqlite_ddl(card_table)
+        fill = not inspect(connection).has_table(search_table_name(card_table))
+    elif dialect == "postgresql":
+        statements, fill = _postgresql_ddl(card_table), False
+    else:
+        return
+    try:
+        with connection.begin_nested():
+            for statement in statements:
+                connection.execute(text(statement))
+            if fill:
+                connection.execute(text(
+                    f"INSERT INTO {search_table_name(card_table)}(name, card_id) "
+                    f"SELECT name, id FROM {card_table.name}"))
+    except DBAPIError as error:
+        logger.warning(f"Card name search index unavailable, searching without it: {error}")
+    _backends.pop(connection.engine, None)
+
+
+def drop_card_search(card_table, connection):
+    if connection.dialect.name == "sqlite":
+        # the triggers go with the card table
+        connection.execute(text(f"DROP TABLE IF EXISTS {search_table_name(card_table)}"))
+    _backends.pop(connection.engine, None)
+
+
+def install_card_search(card_table):
+    """Create and drop the search index along with `card_table`."""
+    event.listen(card_table, "after_create",
+                 lambda target, connection, **kw: create_card_search(target, connection))
+    event.listen(card_table, "before_drop",
+                 lambda target, connection, **kw: drop_card_search(target, connection))
+
+
+def search_backend(connection, card_table) -> str | None:
+    """"fts5", "trgm" or None (plain ILIKE) for `card_table` on `connection`'s database."""
+    known = _backends.setdefault(connection.engine, {})
+    if card_table.name not in known:
+        backend = None
+        if connection.dialect.name == "sqlite":
+            if inspect(connection).has_table(search_table_name(card_table)):
+                backend = "fts5"
+        elif connection.dialect.name == "postgresql":
+            found = connection.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+            backend = "trgm" if found else None
+        known[card_table.name] = backend
+    return known[card_table.name]
+
+
+def fts_hits(card_table, query: str):
+    """Subquery of (card_id, rank) for FTS5 matches of `query`; lower rank is better."""
+    search = table(search_table_name(card_table), column("card_id"), column("rank"))
+    # one quoted phrase: a plain substring match, whatever the query contains
+    phrase = '"' + query.replace('"', '""') + '"'
+    match = literal_column(search.name).op("MATCH")(bindparam("search_phrase", phrase, unique=True))
+    return search.select().with_only_columns(search.c.card_id, search.c.rank).where(match).subquery()
@@ -0,0 +1,54 @@
+# serializers.py
+"""
+JSON encoding on orjson.
+
+orjson encodes dicts, lists, UUIDs and datetimes in C, straight to bytes,
+where Flask's default provider goes through json.dumps and a Python
+fallback for every UUID and datetime. Datetimes come out as ISO 8601
+(naive ones taken as UTC, as Flask assumed) instead of HTTP dates.
+ORM rows with a to_dict() (Card, Deck, DeckCard, ...) can be passed as they
+are. See benchmarks/serialize_bench.py for the numbers.
+"""
+import decimal
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+
+def _default(value):
+    # only called for types orjson does not know
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj, option: int = 0) -> bytes:
+    return orjson.dumps(obj, default=_default, option=OPTIONS | option)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; install with app.json = OrjsonProvider(app)."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        if set(kwargs) - {"sort_keys", "indent", "ensure_ascii"}:
+            # options orjson has no equivalent for (cls=, separators=, ...)
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SORT_KEYS if kwargs.get("sort_keys") else 0
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        # orjson always writes UTF-8, whatever ensure_ascii says
+        return dumps(obj, option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b"\n", mimetype=self.mimetype)
@@ -1,4 +1,7 @@
 import os
+import json
+import base64
+import binascii
 import bcrypt
 from password_strength import PasswordPolicy, PasswordStats
 import jwt
@@ -144,3 +147,29 @@ def generate_pagination(page, total_count, count_per_page):
         "has_prev": has_prev
     }
     return pagination_data
+
+
+def encode_cursor(*values) -> str:
+    """Opaque, URL-safe page cursor holding `values` (JSON-serialisable)."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Values of a cursor from encode_cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"Invalid cursor: {error}") from error
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def generate_cursor_pagination(count_per_page, next_cursor):
+    return {
+        "page_size": count_per_page,
+        "next_cursor": next_cursor,
+        "has_next": next_cursor is not None,
+    }
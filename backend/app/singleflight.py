@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing.
+
+    The first caller for a key (the leader) runs the fetch; callers that
+    arrive for the same key while it is in flight wait for the leader's
+    result, or its exception, instead of fetching again. Once the fetch
+    finishes the key is released, so later callers start a new one (and
+    normally hit whatever cache the leader filled).
+
+    Threads and event loops can be mixed: a coroutine may wait on a fetch
+    led by a plain thread and vice versa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _claim(self, key: str) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _settle(self, key: str, future: Future, result=None, error: BaseException | None = None):
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # the leader was cancelled or interrupted; followers just fail
+            future.set_exception(RuntimeError(f"Fetch of {key} was abandoned"))
+
+    def do(self, key: str, fn):
+        """Return fn(), shared with any concurrent do()/do_async() for `key`."""
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as error:
+            self._settle(key, future, error=error)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def do_async(self, key: str, fn):
+        """Async do(): `fn` is a coroutine function."""
+        future, leader = self._claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as error:
+            self._settle(key, future, error=error)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"fetches": self.leaders, "coalesced": self.coalesced,
+                    "in_flight": len(self._calls)}
@@ -0,0 +1,172 @@
+# suggest.py
+import os
+import time
+import bisect
+import threading
+from collections import Counter
+from app.fuzzy import NGramIndex
+
+CARD_SUGGEST_LIMIT = int(os.getenv("CARD_SUGGEST_LIMIT", "10"))
+CARD_SUGGEST_MAX_LIMIT = 50
+# Upper bound on edits for typo-tolerant name lookups; see NameIndex.similar
+CARD_FUZZY_MAX_DISTANCE = int(os.getenv("CARD_FUZZY_MAX_DISTANCE", "2"))
+# Seconds the index is trusted before the card table is probed again. Writes
+# made through app.crud update it at once; this bounds staleness from
+# writers in other processes (import scripts, other workers and instances).
+CARD_NAMES_TTL = float(os.getenv("CARD_NAMES_TTL", "60"))
+
+
+class NameIndex:
+    """
+    In-memory index over card names for autocomplete and typo-tolerant
+    lookups.
+
+    Names are kept case-folded in one sorted list; a prefix query is a
+    bisect to the first candidate plus a scan of the next `limit` keys, so
+    it never touches the database. The distinct folded names also go into
+    an NGramIndex for similar(). app.crud reports card writes through
+    put() and remove(). Until load() has run the index is empty and
+    unloaded; writes reported before then only bump the generation, so a
+    load that overlapped them reads the table again.
+
+    Writes from other processes are not reported. Once `ttl` seconds have
+    passed since the last check, needs_check() asks the caller to compare
+    a cheap table signature against `signature` and reload on a change.
+    """
+
+    def __init__(self, ttl: float = CARD_NAMES_TTL):
+        self.ttl = ttl
+        self.signature = None
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+        self._keys: list[tuple] = []      # (folded name, collector number, id), sorted
+        self._cards: dict[str, tuple] = {}  # id -> its key
+        self._names: dict[str, str] = {}  # id -> name as stored
+        self._spellings: dict[str, Counter] = {}  # folded name -> names as stored
+        self._fuzzy = NGramIndex()
+        self._generation = 0
+        self.loaded = False
+
+    @staticmethod
+    def _key(card_id: str, name: str, collector_number) -> tuple:
+        # numbered cards before unnumbered ones, as in the catalog
+        number = (0, collector_number) if collector_number is not None else (1, 0)
+        return (name.casefold(), number, card_id)
+
+    def load(self, read_rows):
+        """
+        Replace the index with the rows returned by read_rows(), an iterable
+        of (id, name, collector_number).
+        """
+        while True:
+            with self._lock:
+                generation = self._generation
+            keys, names = {}, {}
+            for card_id, name, collector_number in read_rows():
+                if name:
+                    card_id = str(card_id)
+                    keys[card_id] = self._key(card_id, name, collector_number)
+                    names[card_id] = name
+            with self._lock:
+                if generation != self._generation:
+                    continue  # a write landed while reading; read again
+                self._cards, self._names = keys, names
+                self._keys = sorted(keys.values())
+                self._spellings = {}
+                self._fuzzy.clear()
+                for name in names.values():
+                    self._add_spelling(name)
+                self._generation += 1
+                self.loaded = True
+                return
+
+    def reset(self):
+        with self._lock:
+            self._keys, self._cards, self._names, self._spellings = [], {}, {}, {}
+            self._fuzzy.clear()
+            self._generation += 1
+            self.loaded = False
+            self.signature = self._checked_at = None
+
+    def needs_check(self) -> bool:
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= self.ttl
+
+    def mark_checked(self, signature):
+        """Record the table signature the index was last found to match."""
+        self.signature = signature
+        self._checked_at = time.monotonic()
+
+    def put(self, card_id, name: str | None, collector_number):
+        card_id = str(card_id)
+        with self._lock:
+            self._generation += 1
+            if not self.loaded:
+                return
+            self._discard(card_id)
+            if name:
+                key = self._key(card_id, name, collector_number)
+                bisect.insort(self._keys, key)
+                self._cards[card_id] = key
+                self._names[card_id] = name
+                self._add_spelling(name)
+
+    def remove(self, card_id):
+        with self._lock:
+            self._generation += 1
+            if self.loaded:
+                self._discard(str(card_id))
+
+    def _discard(self, card_id: str):
+        key = self._cards.pop(card_id, None)
+        if key is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            name = self._names.pop(card_id)
+            spellings = self._spellings[key[0]]
+            spellings[name] -= 1
+            if spellings[name] <= 0:
+                del spellings[name]
+            if not spellings:
+                del self._spellings[key[0]]
+                self._fuzzy.discard(key[0])
+
+    def _add_spelling(self, name: str):
+        folded = name.casefold()
+        if folded not in self._spellings:
+            self._spellings[folded] = Counter()
+            self._fuzzy.add(folded)
+        self._spellings[folded][name] += 1
+
+    def suggest(self, prefix: str, limit: int = CARD_SUGGEST_LIMIT) -> list[dict]:
+        """Up to `limit` cards whose name starts with `prefix`, alphabetically."""
+        folded = prefix.casefold()
+        results = []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, (folded,))
+            for name, (unnumbered, collector_number), card_id in self._keys[start:start + limit]:
+                if not name.startswith(folded):
+                    break
+                results.append({"id": card_id, "name": self._names[card_id],
+                                "collector_number": None if unnumbered else collector_number})
+        return results
+
+    def similar(self, query: str, limit: int = CARD_SUGGEST_LIMIT,
+                max_distance: int = CARD_FUZZY_MAX_DISTANCE) -> list[str]:
+        """
+        Stored names within a few edits of `query`, closest first, for up
+        to `limit` distinct names. One edit is allowed per four letters, up
+        to max_distance, so queries under four letters match nothing.
+        """
+        folded = query.strip().casefold()
+        distance = min(max_distance, len(folded) // 4)
+        if distance < 1:
+            return []
+        with self._lock:
+            matches = self._fuzzy.search(folded, distance)[:limit]
+            return [name for _, word in matches for name in sorted(self._spellings[word])]
+
+    def __len__(self):
+        return len(self._keys)
+
+
+card_names = NameIndex()
@@ -0,0 +1,99 @@
+"""
+Synthetic PokeAPI fixtures for the import benchmarks.
+
+Writes a JSONL dump (see app.datasource) whose /pokemon/ payloads have the
+shape and rough size of the real ones (dozens of moves, each with a learn
+method per version group, plus the full sprite tree), so parsing and
+transfer costs are representative. Use a recorded dump instead when you
+have one; the stand-in serves either.
+"""
+import json
+import random
+from pathlib import Path
+from app.reference_data import get_type_chart
+
+BASE = "https://pokeapi.co/api/v2/"
+VERSION_GROUPS = [f"version-group-{n}" for n in range(1, 26)]
+LEARN_METHODS = ["level-up", "machine", "egg", "tutor"]
+
+
+def _pokemon(pokemon_id: int, types: list[str], move_ids: list[int], rng: random.Random) -> dict:
+    name = f"synthmon-{pokemon_id}"
+    moves = []
+    for move_id in move_ids:
+        method = rng.choice(LEARN_METHODS)
+        moves.append({
+            "move": {"name": f"move-{move_id}", "url": f"{BASE}move/{move_id}/"},
+            "version_group_details": [
+                {
+                    "level_learned_at": rng.randint(1, 60) if method == "level-up" else 0,
+                    "move_learn_method": {"name": method, "url": f"{BASE}move-learn-method/1/"},
+                    "version_group": {"name": group, "url": f"{BASE}version-group/{n}/"},
+                }
+                for n, group in enumerate(rng.sample(VERSION_GROUPS, rng.randint(4, 20)), 1)
+            ],
+        })
+    sprite = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon_id}.png"
+    return {
+        "id": pokemon_id,
+        "name": name,
+        "base_experience": rng.randint(40, 300),
+        "height": rng.randint(2, 40),
+        "weight": rng.randint(10, 2000),
+        "abilities": [{"ability": {"name": f"ability-{n}", "url": f"{BASE}ability/{n}/"},
+                       "is_hidden": n == 2, "slot": n} for n in (1, 2)],
+        "game_indices": [{"game_index": pokemon_id, "version": {"name": g, "url": f"{BASE}version/{n}/"}}
+                         for n, g in enumerate(VERSION_GROUPS, 1)],
+        "types": [{"slot": n, "type": {"name": t, "url": f"{BASE}type/{n}/"}}
+                  for n, t in enumerate(types, 1)],
+        "stats": [{"base_stat": rng.randint(20, 150), "effort": 0,
+                   "stat": {"name": stat, "url": f"{BASE}stat/{n}/"}}
+                  for n, stat in enumerate(["hp", "attack", "defense", "special-attack",
+                                            "special-defense", "speed"], 1)],
+        "sprites": {
+            "front_default": sprite,
+            "back_default": sprite,
+            "other": {group: {"front_default": sprite, "front_shiny": sprite}
+                      for group in ("dream_world", "home", "official-artwork", "showdown")},
+            "versions": {group: {"front_default": sprite, "back_default": sprite,
+                                 "front_shiny": sprite, "back_shiny": sprite}
+                         for group in VERSION_GROUPS},
+        },
+        "moves": moves,
+    }
+
+
+def write_dump(path: str | Path, count: int = 151, moves: int = 400,
+               moves_per_pokemon: int = 60, seed: int = 0) -> Path:
+    """
+    Write `count` Pokémon (ids 1..count) with their species, drawing from a
+    pool of `moves` moves, as a JSONL dump at `path`.
+    """
+    rng = random.Random(seed)
+    types = get_type_chart().types
+    path = Path(path)
+    with path.open("w") as f:
+        def put(url, data):
+            f.write(json.dumps({"url": url, "data": data}) + "\n")
+
+        for move_id in range(1, moves + 1):
+            put(f"{BASE}move/{move_id}/", {
+                "id": move_id,
+                "name": f"move-{move_id}",
+                "power": rng.choice([None, *range(10, 160, 5)]),
+                "accuracy": 100,
+                "pp": 20,
+                "type": {"name": rng.choice(types)},
+            })
+        for pokemon_id in range(1, count + 1):
+            picked = rng.sample(range(1, moves + 1), min(moves_per_pokemon, moves))
+            put(f"{BASE}pokemon/{pokemon_id}/",
+                _pokemon(pokemon_id, rng.sample(types, rng.choice((1, 2))), picked, rng))
+            put(f"{BASE}pokemon-species/{pokemon_id}/", {
+                "id": pokemon_id,
+                "name": f"synthmon-{pokemon_id}",
+                "is_legendary": rng.random() < 0.05,
+                "is_mythical": rng.random() < 0.02,
+                "generation": {"url": f"{BASE}generation/{rng.randint(1, 9)}/"},
+            })
+    return path
@@ -0,0 +1,179 @@
+"""
+Benchmark card imports end to end against a local PokeAPI stand-in.
+
+Starts benchmarks.standin in a child process (serving synthetic fixtures,
+or a recorded dump with --dump), points the app at it through
+POKEAPI_BASE_URL and imports cards into a throwaway database, then reports
+cards/second, HTTP calls per card, p50/p99 per-card latency and peak RSS
+as JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_bench 1 151
+    python -m benchmarks.import_bench 1 151 --latency 0.08 --jitter 0.04 --rate 100
+    python -m benchmarks.import_bench 1 20 --mode single --no-prefetch
+    IMPORT_DERIVE_WORKERS=4 python -m benchmarks.import_bench 1 500 --workers 16 --count 500
+
+Import settings not covered by a flag (IMPORT_BATCH_SIZE, IMPORT_QUEUE_SIZE,
+POKEAPI_CONCURRENCY, ...) are read from the environment as usual.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import contextlib
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _prepare_database(url: str):
+    from app import crud
+    from app.db import engine, init_db
+    if url.startswith("sqlite"):
+        # The production models need PostgreSQL (gen_random_uuid); on SQLite
+        # use the test suite's models, as tests/conftest.py does.
+        from tests.test_models import TestBase, TestCard
+        TestBase.metadata.create_all(bind=engine)
+        crud.Card = TestCard
+    else:
+        init_db()
+
+
+def _percentiles(samples: list[float]) -> dict:
+    from app.importer import _summarize
+    return _summarize(samples) if samples else {}
+
+
+def _run_single(start: int, end: int) -> dict:
+    """One create_tcg_card call per identifier, as the single-card endpoint does."""
+    from app import logic
+    latencies, imported = [], 0
+    for identifier in range(start, end + 1):
+        started = time.perf_counter()
+        try:
+            _, status = logic.create_tcg_card(identifier)
+            imported += status < 400
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - started)
+    return {"imported": imported, "card_latency": _percentiles(latencies)}
+
+
+def _run_range(start: int, end: int, workers: int | None) -> dict:
+    from app import logic
+    response, status = logic.create_tcg_card_range(start, end, workers=workers)
+    if status != 200:
+        raise SystemExit(json.dumps(response, indent=2, default=str))
+    stats = response["data"]["stats"]
+    return {
+        "imported": stats["imported"],
+        "card_latency": stats["card_latency"],
+        "stages": stats["stages"],
+        "pipeline": stats["pipeline"],
+        "http_cache": stats["http_cache"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("start", type=int)
+    parser.add_argument("end", type=int)
+    parser.add_argument("--mode", choices=["range", "single"], default="range",
+                        help="range: create_tcg_card_range; single: create_tcg_card per card")
+    parser.add_argument("--dump", help="recorded PokeAPI dump to serve instead of synthetic fixtures")
+    parser.add_argument("--count", type=int, default=151, help="synthetic Pokémon to generate")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=0.0, help="stand-in requests/second (0 = unlimited)")
+    parser.add_argument("--client-rate", type=float, default=0.0,
+                        help="app-side POKEAPI_RATE_LIMIT (0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-prefetch", action="store_true", help="disable async prefetching")
+    parser.add_argument("--http-cache", default="", help="response cache file (default: none)")
+    parser.add_argument("--database-url", default="sqlite:///:memory:",
+                        help="where cards are written; use a scratch PostgreSQL database for real numbers")
+    parser.add_argument("--output", help="also write the report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory(prefix="import-bench-")
+    port = _free_port()
+    # Settings are read at import time, so set them before app is loaded.
+    os.environ.update({
+        "POKEAPI_BASE_URL": f"http://127.0.0.1:{port}/api/v2/",
+        "POKEAPI_SOURCE": "network",
+        "POKEAPI_CACHE_PATH": args.http_cache,
+        "POKEAPI_RATE_LIMIT": str(args.client_rate),
+        "POKEAPI_PREFETCH": "0" if args.no_prefetch else "1",
+        "DATABASE_URL": args.database_url,
+    })
+
+    import requests
+    from benchmarks.fixtures import write_dump
+    from benchmarks.standin import spawn
+
+    # one line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    dump = args.dump or write_dump(Path(workdir.name) / "fixtures.jsonl", count=args.count)
+    _prepare_database(args.database_url)
+    with spawn(dump, port=port, latency=args.latency, jitter=args.jitter, rate=args.rate) as base_url:
+        root = base_url.split("/api/v2/")[0]
+        started = time.perf_counter()
+        # create_tcg_card prints each payload; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.mode == "single":
+                result = _run_single(args.start, args.end)
+            else:
+                result = _run_range(args.start, args.end, args.workers)
+        elapsed = time.perf_counter() - started
+        server = requests.get(f"{root}/_stats").json()
+
+    cards = args.end - args.start + 1
+    report = {
+        "mode": args.mode,
+        "cards": cards,
+        "imported": result.pop("imported"),
+        "elapsed_seconds": round(elapsed, 3),
+        "cards_per_second": round(cards / elapsed, 3) if elapsed else 0.0,
+        "http_calls": server.get("requests", 0),
+        "http_calls_per_card": round(server.get("requests", 0) / cards, 2),
+        "rate_limited": server.get("rate_limited", 0),
+        "requests_by_resource": {k: v for k, v in server.items()
+                                 if k not in ("requests", "rate_limited", "not_found")},
+        "peak_rss_mb": _peak_rss_mb(),
+        "settings": {
+            "latency": args.latency, "jitter": args.jitter, "rate": args.rate,
+            "client_rate": args.client_rate, "workers": args.workers,
+            "prefetch": not args.no_prefetch, "dump": str(args.dump or "synthetic"),
+        },
+        **result,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
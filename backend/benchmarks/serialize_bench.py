@@ -0,0 +1,122 @@
+"""
+Benchmark JSON encoding of card and deck responses.
+
+Builds a page of in-memory Card rows (no database) and decks of DeckCard
+rows, then times the old path (to_dict() and Flask's default JSON
+provider) against app.serializers (to_dict() and orjson, or rows passed
+straight to orjson). Reports microseconds per response and the speedup as
+JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialize_bench
+    python -m benchmarks.serialize_bench --cards 151 --decks 20 --deck-size 60 --repeat 200
+"""
+import json
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, UTC
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app import serializers, services
+from app.models import Card, Deck, DeckCard
+
+
+def _cards(count: int, seed: int = 0) -> list[Card]:
+    rng = random.Random(seed)
+    return [
+        Card(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            created_at=datetime.now(UTC),
+            name=f"Synthmon {n}",
+            rarity=rng.choice(["Common", "Uncommon", "Rare"]),
+            type=rng.choice(["Fire", "Water", "Grass", "Lightning"]),
+            hp=rng.randrange(40, 200, 10),
+            set_code="BENCH",
+            collector_number=n,
+            description="A synthetic Pokémon used to benchmark serialization. " * 3,
+            attack_1_name="Tackle", attack_1_dmg=20, attack_1_cost="{colorless,colorless}",
+            attack_2_name="Hyper Beam", attack_2_dmg=120, attack_2_cost="{fire,fire,colorless}",
+            weakness=["Water"], resistance=["Grass"], retreat_cost=2,
+            image_url=f"https://example.com/cards/{n}.png",
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def _decks(cards: list[Card], decks: int, size: int) -> list[Deck]:
+    result = []
+    for n in range(decks):
+        deck = Deck(id=uuid.uuid4(), name=f"Deck {n}", user_id=uuid.uuid4())
+        deck.deck_cards = [DeckCard(deck_id=deck.id, card_id=card.id, card=card)
+                           for card in cards[:size]]
+        result.append(deck)
+    return result
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-three mean microseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return round(best * 1e6, 1)
+
+
+def _compare(name: str, old, new: dict, repeat: int) -> dict:
+    report = {"name": name, "old_us": _time(old, repeat), "bytes": len(old())}
+    for label, fn in new.items():
+        report[f"{label}_us"] = _time(fn, repeat)
+        report[f"{label}_speedup"] = round(report["old_us"] / report[f"{label}_us"], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=151, help="cards on the list page")
+    parser.add_argument("--decks", type=int, default=20, help="decks on the deck list page")
+    parser.add_argument("--deck-size", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    flask_json = DefaultJSONProvider(Flask(__name__))
+    cards = _cards(args.cards)
+    decks = _decks(cards, args.decks, min(args.deck_size, len(cards)))
+
+    def card_page(rows):
+        return services.generate_response("Card List retrieved", 200, rows,
+                                          services.generate_pagination(1, len(rows), len(rows)))
+
+    reports = [
+        _compare(
+            f"card list ({args.cards} cards)",
+            lambda: flask_json.dumps(card_page([card.to_dict() for card in cards])).encode(),
+            {
+                "orjson": lambda: serializers.dumps(card_page([card.to_dict() for card in cards])),
+                "orjson_rows": lambda: serializers.dumps(card_page(cards)),
+            },
+            args.repeat,
+        ),
+        _compare(
+            f"deck list ({args.decks} decks x {args.deck_size} cards)",
+            lambda: flask_json.dumps(services.generate_response(
+                "Decks retrieved", 200, [deck.to_dict() for deck in decks])).encode(),
+            {"orjson": lambda: serializers.dumps(services.generate_response(
+                "Decks retrieved", 200, [deck.to_dict() for deck in decks]))},
+            max(1, args.repeat // 10),
+        ),
+        _compare(
+            "single card",
+            lambda: flask_json.dumps(services.generate_response("Card retrieved", 200, cards[0].to_dict())).encode(),
+            {"orjson": lambda: serializers.dumps(services.generate_response("Card retrieved", 200, cards[0].to_dict()))},
+            args.repeat * 10,
+        ),
+    ]
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
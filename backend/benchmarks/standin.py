@@ -0,0 +1,182 @@
+"""
+Local PokeAPI stand-in for benchmarks.
+
+Serves resources from any dump app.datasource can open, with configurable
+latency and a server-side rate limit (429 once exceeded), and counts the
+requests it receives. Links inside responses are rewritten to point back
+at the stand-in, so an app with POKEAPI_BASE_URL set to it never talks to
+the real API.
+
+Usage (from the backend directory):
+    python -m benchmarks.standin /data/pokeapi-dump.jsonl --latency 0.05 --rate 100
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from app.datasource import DataSource, ResourceNotFound, open_source
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PUBLIC_BASE = b"https://pokeapi.co/api/v2/"
+
+
+class _Allowance:
+    """Server-side token bucket: take() fails instead of queueing."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, source: DataSource, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, rate: float = 0.0,
+                 burst: float | None = None):
+        super().__init__((host, port), _Handler)
+        self.source = source
+        self.latency = latency
+        self.jitter = jitter
+        self.allowance = _Allowance(rate, burst)
+        self.base = f"http://{host}:{self.server_address[1]}/api/v2/".encode()
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return self.base.decode()
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            return self._send(200, json.dumps(self.server.stats()).encode())
+        if self.path == "/_reset":
+            self.server.reset()
+            return self._send(200, b"{}")
+
+        # /api/v2/<resource>/<id>/ -> counted per resource type
+        parts = self.path.strip("/").split("/")
+        resource = parts[2] if len(parts) > 2 else "other"
+        self.server.count("requests")
+        self.server.count(resource)
+        if not self.server.allowance.take():
+            self.server.count("rate_limited")
+            return self._send(429, b'{"detail": "rate limited"}', {"Retry-After": "1"})
+
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+        try:
+            body = bytes(self.server.source.get_raw(self.path))
+        except ResourceNotFound:
+            self.server.count("not_found")
+            return self._send(404, b'{"detail": "Not found."}')
+        self._send(200, body.replace(PUBLIC_BASE, self.server.base))
+
+    def _send(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve(source: DataSource | str, **options):
+    """Run a stand-in on a background thread of this process."""
+    server = StandInServer(open_source(source) if isinstance(source, str) else source, **options)
+    thread = threading.Thread(target=server.serve_forever, name="pokeapi-standin", daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def spawn(dump: str, port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+          rate: float = 0.0, burst: float | None = None):
+    """
+    Run a stand-in in a child process, so its CPU and memory stay out of the
+    numbers being measured. Yields its base URL.
+    """
+    args = [sys.executable, "-m", "benchmarks.standin", str(dump), "--port", str(port),
+            "--latency", str(latency), "--jitter", str(jitter), "--rate", str(rate)]
+    if burst is not None:
+        args += ["--burst", str(burst)]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, text=True, cwd=BACKEND_DIR)
+    try:
+        base_url = process.stdout.readline().strip()
+        if not base_url:
+            raise RuntimeError("PokeAPI stand-in failed to start")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dump", help="PokeAPI dump (directory, .jsonl[.gz] or .tar[.gz])")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--rate", type=float, default=0.0, help="requests/second before 429s (0 = unlimited)")
+    parser.add_argument("--burst", type=float, default=None)
+    args = parser.parse_args()
+
+    server = StandInServer(open_source(args.dump), port=args.port, latency=args.latency,
+                           jitter=args.jitter, rate=args.rate, burst=args.burst)
+    print(server.base_url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
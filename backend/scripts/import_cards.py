@@ -0,0 +1,33 @@
+"""
+Import a range of cards straight into the database, without the HTTP API.
+
+Usage (from the backend directory):
+    python -m scripts.import_cards 1 151
+    python -m scripts.import_cards 1 1025 --source /data/pokeapi-dump.tar.gz
+"""
+import argparse
+import json
+from app import pokeapi, logic
+from app.db import init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("start", type=int)
+    parser.add_argument("end", type=int)
+    parser.add_argument("--source", help="local PokeAPI dump (directory, .jsonl[.gz] or .tar[.gz])")
+    parser.add_argument("--workers", type=int, default=None, help="fetch stage threads")
+    args = parser.parse_args()
+
+    if args.source:
+        pokeapi.set_source(args.source)
+    init_db()
+    response, status = logic.create_tcg_card_range(args.start, args.end, workers=args.workers)
+    if status != 200:
+        raise SystemExit(json.dumps(response, indent=2, default=str))
+    print(response["message"])
+    print(json.dumps(response["data"]["stats"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
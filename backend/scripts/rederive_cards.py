@@ -0,0 +1,47 @@
+"""
+Recompute derived card fields (attack cost, retreat cost, rarity) from the
+values stored on each card, without refetching anything from PokeAPI.
+
+Usage (from the backend directory):
+    python -m scripts.rederive_cards
+    python -m scripts.rederive_cards --energy-per-symbol 30 --hp-per-retreat 50 --dry-run
+    python -m scripts.rederive_cards --rarity-threshold 500:Rare --rarity-threshold 350:Uncommon
+
+Without options the current rules in app.poke_utils are applied, e.g. after
+editing ENERGY_PER_SYMBOL there.
+"""
+import argparse
+import json
+from app import logic
+from app.db import init_db
+from app.poke_utils import CardRules
+
+
+def _threshold(value: str) -> tuple[int, str]:
+    minimum, _, rarity = value.partition(":")
+    if not rarity:
+        raise argparse.ArgumentTypeError("expected MIN_TOTAL:RARITY, e.g. 550:Rare")
+    return int(minimum), rarity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--energy-per-symbol", type=int, default=None)
+    parser.add_argument("--hp-per-retreat", type=int, default=None)
+    parser.add_argument("--rarity-threshold", type=_threshold, action="append", default=None,
+                        metavar="MIN_TOTAL:RARITY", help="replaces all thresholds; repeat for each")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    args = parser.parse_args()
+
+    init_db()
+    rules = CardRules(args.energy_per_symbol, args.hp_per_retreat, args.rarity_threshold)
+    response, status = logic.rederive_cards(rules, dry_run=args.dry_run, batch_size=args.batch_size)
+    if status != 200:
+        raise SystemExit(json.dumps(response, indent=2, default=str))
+    print(response["message"])
+    print(json.dumps(response["data"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Refresh the bundled PokeAPI reference tables in app/lib/data.
+
+Usage (from the backend directory):
+    python -m scripts.refresh_reference_data types generations
+"""
+import argparse
+from app import reference_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("table", choices=["types", "generations"], nargs="+")
+    args = parser.parse_args()
+
+    if "types" in args.table:
+        chart = reference_data.refresh_type_chart()
+        print(f"Wrote {len(chart.types)} types to {reference_data.TYPE_CHART_PATH}")
+    if "generations" in args.table:
+        regions = reference_data.refresh_generation_regions()
+        print(f"Wrote {len(regions)} generations to {reference_data.GENERATION_REGIONS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
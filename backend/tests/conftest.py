@@ -13,6 +13,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Use SQLite in-memory for tests (isolated, fast, no cleanup needed)
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 print(f"Using database: {os.environ['DATABASE_URL']}")
+# Card imports must never fan out to the real PokeAPI from tests
+os.environ["POKEAPI_PREFETCH"] = "0"
+os.environ["POKEAPI_CACHE_PATH"] = ""
 
 # Safety check: Detect if tests try to use production database
 PRODUCTION_DATABASE_URLS = [
@@ -39,13 +42,14 @@ def setup_database():
     """
 
     # Import test models and base
-    from tests.test_models import TestCard, TestUser, TestPokemon_Collection, TestBase
+    from tests.test_models import TestCard, TestUser, TestPokemon_Collection, TestImportJob, TestBase
 
     # Import and monkeypatch production model names to test models
     import app.models
     app.models.User = TestUser
     app.models.Card = TestCard
     app.models.Pokemon_Collection = TestPokemon_Collection
+    app.models.ImportJob = TestImportJob
     app.models.Base = TestBase
 
     # Create tables in the shared in-memory engine
@@ -112,6 +116,42 @@ def clean_database(db_session):
     yield
 
 
+@pytest.fixture(autouse=True)
+def clear_move_store():
+    """
+    The move store, prefetched Pokemon and species info are process-wide;
+    start every test without them so mocked PokeAPI responses never leak
+    between tests.
+    """
+    from app.poke_utils import clear_move_store
+    from app.pokeapi import Pokemon, clear_prefetched_pokemon
+    clear_move_store()
+    clear_prefetched_pokemon()
+    Pokemon.species_info.cache_clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_card_counts():
+    """
+    clean_database deletes rows behind app.crud's back; start every test
+    without cached card counts or catalog responses.
+    """
+    from app.count_cache import card_counts
+    from app.response_cache import catalog_responses
+    card_counts.invalidate()
+    catalog_responses.invalidate()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_card_names():
+    """Likewise for the autocomplete index; it reloads from the table on first use."""
+    from app.suggest import card_names
+    card_names.reset()
+    yield
+
+
 # Additional safety: Monitor database connections during tests
 @pytest.fixture(autouse=True)
 def monitor_database_connections():
@@ -63,7 +63,7 @@ def patch_logic(monkeypatch):
         lambda **kw: (_DummyCard(kw).to_dict(), 201),
     )
 
-    def _list_cards(page=1, type_filter=None, pokemon_name=None,count_per_page=None):
+    def _list_cards(page=1, type_filter=None, pokemon_name=None,count_per_page=None, fields=None):
         cards = list(storage.values())
         # Sort by collector_number for consistent pagination
         cards.sort(key=lambda x: x.get("collector_number", 0))
@@ -243,3 +243,40 @@ def test_get_single_card_public_access(client):
     """Test that getting a single card is still publicly accessible."""
     rv = client.get("/api/cards/test-id")
     assert rv.status_code == 404  # Card doesn't exist, but endpoint is accessible
+
+
+def test_catalog_reads_are_cached_with_etags(client, auth_headers_admin, monkeypatch):
+    """Catalog GETs are served from the response cache until a card write."""
+    import app.routers.cards as cards_module
+    calls = []
+    list_cards = cards_module.logic.list_cards
+
+    def _counting_list_cards(*args, **kwargs):
+        calls.append(args)
+        return list_cards(*args, **kwargs)
+    monkeypatch.setattr(cards_module.logic, "list_cards", _counting_list_cards)
+
+    first = client.get("/api/cards/")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+    etag = first.headers["ETag"]
+    # same parsed arguments, same entry
+    again = client.get("/api/cards/?page=1&count_per_page=12")
+    assert again.headers["ETag"] == etag and again.get_json() == first.get_json()
+    assert len(calls) == 1
+
+    not_modified = client.get("/api/cards/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b"" and not_modified.headers["ETag"] == etag
+
+    client.post("/api/cards/", json=_dummy_card_payload("Eevee"), headers=auth_headers_admin)
+    changed = client.get("/api/cards/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [card["name"] for card in changed.get_json()["data"]] == ["Eevee"]
+    assert len(calls) == 2
+
+
+def test_missing_cards_are_not_cached(client):
+    rv = client.get("/api/cards/nope")
+    assert rv.status_code == 404
+    assert "ETag" not in rv.headers
@@ -0,0 +1,41 @@
+# tests/test_count_cache.py
+from app.count_cache import CountCache
+
+
+class TestCountCache:
+    def test_counts_are_reused_until_invalidated(self):
+        cache = CountCache(ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls), False
+        assert cache.get_or_compute(("Fire", None), compute) == (1, False)
+        assert cache.get_or_compute(("Fire", None), compute) == (1, False)
+        assert cache.get_or_compute(("Water", None), compute) == (2, False)
+        cache.invalidate()
+        assert cache.get_or_compute(("Fire", None), compute) == (3, False)
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 3}
+
+    def test_count_racing_a_write_is_not_stored(self):
+        cache = CountCache(ttl=60)
+
+        def compute():
+            # a write commits while the count is running
+            cache.invalidate()
+            return 5, False
+        assert cache.get_or_compute(("Fire", None), compute) == (5, False)
+        assert cache.stats()["entries"] == 0
+
+    def test_expired_entries_are_recomputed(self):
+        cache = CountCache(ttl=0)
+        calls = []
+        cache.get_or_compute(("Fire", None), lambda: (calls.append(1), False))
+        cache.get_or_compute(("Fire", None), lambda: (calls.append(1), False))
+        assert len(calls) == 2
+
+    def test_size_is_bounded(self):
+        cache = CountCache(ttl=60, max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.get_or_compute((None, name), lambda: (0, False))
+        assert cache.stats()["entries"] == 2
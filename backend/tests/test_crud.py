@@ -7,7 +7,7 @@ from datetime import datetime, UTC
 import uuid
 from unittest.mock import patch
 from app.crud import (
-    create_card, list_cards, get_card_by_id, update_card, delete_card,
+    create_card, upsert_cards, bulk_update_cards, card_derivation_inputs, list_cards, list_cards_after, count_cards, get_card_by_id, update_card, delete_card,
     create_user, get_user_by_id, user_list, update_user, delete_user, get_user_by_email
 )
 
@@ -310,3 +310,245 @@ class TestCRUDFunctions:
         # Try to delete a card that doesn't exist
         deleted_card = delete_card(db_session, 999)
         assert deleted_card is None
+
+
+def _bulk_card(i, **overrides):
+    card = {
+        "name": f"Card{i}",
+        "rarity": "Common",
+        "type": "Normal",
+        "hp": 50,
+        "set_code": "Test",
+        "collector_number": i,
+        "attack_1_name": "Tackle",
+        "attack_1_dmg": 10,
+        "attack_1_cost": "Normal",
+        "weakness": ["Fighting"],
+        "resistance": [],
+        "retreat_cost": 1,
+    }
+    card.update(overrides)
+    return card
+
+
+class TestUpsertCards:
+    @patch('app.crud.Card', Card)
+    def test_reimport_updates_in_place(self, db_session):
+        """Re-importing a card keeps one row and applies the changes"""
+        first = upsert_cards(db_session, [_bulk_card(1), _bulk_card(2)])
+        assert [action for _, action, _ in first] == ["created", "created"]
+
+        second = upsert_cards(db_session, [_bulk_card(1, hp=90, weakness=["Psychic"]), _bulk_card(2)])
+        assert [action for _, action, _ in second] == ["updated", "unchanged"]
+        assert second[0][0].id == first[0][0].id
+        assert second[0][0].hp == 90
+        assert db_session.query(Card).count() == 2
+        stored = db_session.scalars(select(Card).where(Card.collector_number == 1)).one()
+        assert stored.weakness == ["Psychic"]
+
+    @patch('app.crud.Card', Card)
+    def test_unchanged_rows_are_not_written(self, db_session):
+        upsert_cards(db_session, [_bulk_card(1)])
+        statements = []
+
+        from sqlalchemy import event
+        engine = db_session.get_bind()
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            outcomes = upsert_cards(db_session, [_bulk_card(1)])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert outcomes[0][1] == "unchanged"
+        assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+
+    @patch('app.crud.Card', Card)
+    def test_duplicate_keys_in_one_batch(self, db_session):
+        outcomes = upsert_cards(db_session, [_bulk_card(1, hp=10), _bulk_card(1, hp=20)])
+        assert all(card.hp == 20 for card, _, _ in outcomes)
+        assert db_session.query(Card).count() == 1
+
+    @patch('app.crud.Card', Card)
+    def test_cards_without_number_are_always_created(self, db_session):
+        outcomes = upsert_cards(db_session, [_bulk_card(None), _bulk_card(None)])
+        assert [action for _, action, _ in outcomes] == ["created", "created"]
+        assert db_session.query(Card).count() == 2
+
+
+    @patch('app.crud.Card', Card)
+    def test_rows_skipped_by_the_database_are_unchanged(self, db_session):
+        """Rows the ON CONFLICT clause skips are matched by key and reported unchanged"""
+        first = upsert_cards(db_session, [_bulk_card(1)])
+        with patch("app.crud._card_matches", return_value=False):
+            outcomes = upsert_cards(db_session, [_bulk_card(1), _bulk_card(None, name="Keyless"),
+                                                 _bulk_card(2)])
+        assert [action for _, action, _ in outcomes] == ["unchanged", "created", "created"]
+        assert outcomes[0][0].id == first[0][0].id
+        assert [card.name for card, _, _ in outcomes] == ["Card1", "Keyless", "Card2"]
+
+    @patch('app.crud.Card', Card)
+    def test_bad_row_does_not_sink_the_batch(self, db_session):
+        """A failing batch is retried row by row and only the bad row fails"""
+        upsert_cards(db_session, [_bulk_card(1)])
+        payloads = [_bulk_card(1), _bulk_card(2), _bulk_card(3, attack_1_cost=["Normal"])]
+        with patch("app.crud._card_matches", return_value=False):
+            outcomes = upsert_cards(db_session, payloads)
+        assert [action for _, action, _ in outcomes] == ["unchanged", "created", None]
+        assert outcomes[2][0] is None and outcomes[2][2] is not None
+        stored = db_session.query(Card.collector_number).order_by(Card.collector_number).all()
+        assert [n for (n,) in stored] == [1, 2]
+
+class TestBulkUpdateCards:
+    @patch('app.crud.Card', Card)
+    def test_updates_by_id_in_one_statement(self, db_session):
+        cards = [card for card, _, _ in upsert_cards(db_session, [_bulk_card(i) for i in (1, 2, 3)])]
+        changed = bulk_update_cards(db_session, [
+            {"id": cards[0].id, "retreat_cost": 5},
+            {"id": cards[2].id, "retreat_cost": 7, "rarity": "Rare"},
+        ])
+        assert changed == 2
+        db_session.expire_all()
+        stored = {c.collector_number: (c.retreat_cost, c.rarity) for c in db_session.query(Card)}
+        assert stored == {1: (5, "Common"), 2: (1, "Common"), 3: (7, "Rare")}
+
+    @patch('app.crud.Card', Card)
+    def test_derivation_inputs_page_by_id(self, db_session):
+        upsert_cards(db_session, [_bulk_card(i) for i in range(5)])
+        first = card_derivation_inputs(db_session, limit=3)
+        rest = card_derivation_inputs(db_session, first[-1].id, limit=3)
+        assert len(first) == 3 and len(rest) == 2
+        assert {r.id for r in first}.isdisjoint(r.id for r in rest)
+
+
+class TestKeysetPagination:
+    def _walk(self, db_session, size, **filters):
+        pages, after = [], None
+        while True:
+            page = list_cards_after(db_session, after, filters.get("type_filter"),
+                                    filters.get("pokemon_name"), size)
+            if not page:
+                return pages
+            pages.append([(c.collector_number, c.name) for c in page])
+            after = (page[-1].collector_number, page[-1].id)
+
+    @patch('app.crud.Card', Card)
+    def test_walks_catalog_in_offset_order(self, db_session):
+        numbers = [5, 1, None, 3, 3, None, 2]
+        payloads = [_bulk_card(n, name=f"Mon{i}", set_code=f"S{i}") for i, n in enumerate(numbers)]
+        upsert_cards(db_session, payloads)
+        offset_order = [(c.collector_number, c.name) for c in list_cards(db_session, 1, None, None, 100)[0]]
+        pages = self._walk(db_session, 2)
+        assert [len(p) for p in pages] == [2, 2, 2, 1]
+        assert [card for page in pages for card in page] == offset_order
+        assert [n for n, _ in offset_order] == [1, 2, 3, 3, 5, None, None]
+
+    @patch('app.crud.Card', Card)
+    def test_filters_apply_to_every_page(self, db_session):
+        payloads = [_bulk_card(i, type="Fire" if i % 2 else "Water") for i in range(1, 10)]
+        upsert_cards(db_session, payloads)
+        pages = self._walk(db_session, 2, type_filter="fire")
+        assert [n for page in pages for n, _ in page] == [1, 3, 5, 7, 9]
+
+
+class TestCountCards:
+    @patch('app.crud.Card', Card)
+    def test_count_is_cached_until_a_card_write(self, db_session):
+        upsert_cards(db_session, [_bulk_card(i, type="Fire") for i in range(1, 4)])
+        assert count_cards(db_session, "fire", None) == (3, False)
+        # a write that bypasses app.crud is not seen...
+        db_session.query(Card).filter(Card.collector_number == 1).delete()
+        db_session.commit()
+        assert count_cards(db_session, "FIRE", None) == (3, False)
+        # ...but one through it is
+        created = create_card(db_session, **_bulk_card(9, type="Fire"))
+        assert count_cards(db_session, "Fire", None) == (3, False)
+        delete_card(db_session, created.id)
+        assert count_cards(db_session, "Fire", None) == (2, False)
+        assert list_cards(db_session, 1, "fire", None)[1] == 2
+
+    @patch('app.crud.Card', Card)
+    def test_approximate_mode_counts_exactly_without_planner_estimates(self, db_session):
+        upsert_cards(db_session, [_bulk_card(i) for i in range(1, 4)])
+        assert count_cards(db_session, None, "card", mode="approximate") == (3, False)
+
+
+    @patch('app.crud.Card', Card)
+    def test_planner_estimate_binds_the_search_as_a_parameter(self):
+        """A pattern like ' :foo' must reach EXPLAIN as data, not as SQL"""
+        from unittest.mock import MagicMock
+        from sqlalchemy.dialects import postgresql
+        from app.crud import _estimate_rows, _card_filters
+        db = MagicMock()
+        db.get_bind.return_value.dialect = postgresql.psycopg2.dialect()
+        db.connection.return_value.exec_driver_sql.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 42}}]
+        stmt = select(Card.id).where(*_card_filters(db, "fire", "pika :foo"))
+        assert _estimate_rows(db, stmt) == 42
+        sql, params = db.connection.return_value.exec_driver_sql.call_args.args
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert ":foo" not in sql
+        assert "pika :foo" in params.values() and "Fire" in params.values()
+
+class TestNameSearch:
+    NAMES = ["Raichu", "Pikachu", "Pichu", "Pikachu Libre", "Charizard", "100%_Mon"]
+
+    def _names(self, db_session, query, **kwargs):
+        cards, total = list_cards(db_session, 1, kwargs.get("type_filter"), query, 50)
+        assert total == len(cards)
+        return [card.name for card in cards]
+
+    def _create(self, db_session):
+        return upsert_cards(db_session, [_bulk_card(i, name=name)
+                                         for i, name in enumerate(self.NAMES, 1)])
+
+    @patch('app.crud.Card', Card)
+    def test_matches_are_ranked_by_relevance(self, db_session):
+        self._create(db_session)
+        assert self._names(db_session, "pikachu") == ["Pikachu", "Pikachu Libre"]
+        names = self._names(db_session, "CHU")
+        assert len(names) == 4 and "Charizard" not in names
+        assert self._names(db_session, "pi")[:2] == ["Pikachu", "Pichu"]
+
+    @patch('app.crud.Card', Card)
+    def test_query_characters_are_literal(self, db_session):
+        self._create(db_session)
+        assert self._names(db_session, "0%_") == ["100%_Mon"]
+        assert self._names(db_session, "%") == ["100%_Mon"]
+        assert self._names(db_session, 'chu"') == []
+
+    @patch('app.crud.Card', Card)
+    def test_index_follows_card_writes(self, db_session):
+        (raichu, _, _), *_ = self._create(db_session)
+        update_card(db_session, raichu.id, name="Alolan Raichu")
+        assert self._names(db_session, "alolan") == ["Alolan Raichu"]
+        delete_card(db_session, raichu.id)
+        assert self._names(db_session, "alolan") == []
+        keyset = list_cards_after(db_session, None, None, "chu", 10)
+        assert [card.name for card in keyset] == ["Pikachu", "Pichu", "Pikachu Libre"]
+
+
+class TestSparseFieldsets:
+    @patch('app.crud.Card', Card)
+    def test_only_requested_columns_are_loaded(self, db_session):
+        from sqlalchemy import inspect as sa_inspect
+        upsert_cards(db_session, [_bulk_card(i, image_url=f"{i}.png") for i in (1, 2)])
+        db_session.expire_all()
+        fields = ["id", "name", "attacks"]
+        cards, total = list_cards(db_session, 1, None, None, 12, fields)
+        assert total == 2
+        unloaded = sa_inspect(cards[0]).unloaded
+        assert {"description", "image_url", "weakness", "hp"} <= unloaded
+        assert not {"id", "name", "attack_1_name", "attack_2_cost"} & unloaded
+        assert cards[0].to_dict(fields) == {
+            "id": cards[0].id, "name": "Card1",
+            "attacks": [{"name": "Tackle", "damage": 10, "cost": "Normal"},
+                        {"name": None, "damage": None, "cost": None}]}
+
+    @patch('app.crud.Card', Card)
+    def test_keyset_pages_keep_the_cursor_column(self, db_session):
+        from sqlalchemy import inspect as sa_inspect
+        upsert_cards(db_session, [_bulk_card(i) for i in (1, 2)])
+        db_session.expire_all()
+        page = list_cards_after(db_session, None, None, None, 1, ["id", "name"])
+        assert "collector_number" not in sa_inspect(page[0]).unloaded
@@ -0,0 +1,103 @@
+# tests/test_datasource.py
+import gzip
+import io
+import json
+import tarfile
+import pytest
+from app import pokeapi
+from app.datasource import (
+    DirectorySource, JsonlSource, TarSource, ResourceNotFound, open_source, resource_key
+)
+from app.pokeapi import Pokemon
+from tests.test_poke_utils import MockPokemon
+
+PIKACHU = MockPokemon("pikachu", pokemon_id=25).raw_data
+RESOURCES = {
+    "https://pokeapi.co/api/v2/pokemon/25/": PIKACHU,
+    "https://pokeapi.co/api/v2/pokemon/": {"results": [
+        {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon/25/"},
+    ]},
+    "https://pokeapi.co/api/v2/move/84/": {"name": "thunder-shock", "power": 40, "type": {"name": "electric"}},
+}
+
+
+def _write_directory(root):
+    for url, data in RESOURCES.items():
+        path = root / "data" / resource_key(url) / "index.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+    return root
+
+
+def _write_jsonl(path, compress=False):
+    lines = "".join(json.dumps({"url": url, "data": data}) + "\n" for url, data in RESOURCES.items())
+    opener = gzip.open if compress else open
+    with opener(path, "wt") as f:
+        f.write(lines)
+    return path
+
+
+def _write_tar(path, compress=False):
+    with tarfile.open(path, "w:gz" if compress else "w") as archive:
+        for url, data in RESOURCES.items():
+            body = json.dumps(data).encode()
+            info = tarfile.TarInfo(f"data/{resource_key(url)}/index.json")
+            info.size = len(body)
+            archive.addfile(info, io.BytesIO(body))
+    return path
+
+
+@pytest.fixture(params=["directory", "jsonl", "jsonl.gz", "tar", "tar.gz"])
+def dump(request, tmp_path):
+    kind = request.param
+    if kind == "directory":
+        return _write_directory(tmp_path)
+    if kind.startswith("jsonl"):
+        return _write_jsonl(tmp_path / f"dump.{kind}", compress=kind.endswith(".gz"))
+    return _write_tar(tmp_path / f"dump.{kind}", compress=kind.endswith(".gz"))
+
+
+class TestDataSources:
+    def test_open_source_picks_backend(self, dump):
+        source = open_source(dump)
+        assert isinstance(source, (DirectorySource, JsonlSource, TarSource))
+
+    def test_lookup_by_url(self, dump):
+        source = open_source(dump)
+        assert source.get_json("https://pokeapi.co/api/v2/pokemon/25/") == PIKACHU
+        assert source.get_json("http://localhost:8000/api/v2/move/84")["power"] == 40
+
+    def test_raw_body(self, dump):
+        raw = open_source(dump).get_raw("https://pokeapi.co/api/v2/pokemon/pikachu/")
+        assert json.loads(raw) == PIKACHU
+
+    def test_lookup_by_name(self, dump):
+        source = open_source(dump)
+        assert source.get_json("https://pokeapi.co/api/v2/pokemon/pikachu/")["id"] == 25
+
+    def test_missing_resource(self, dump):
+        with pytest.raises(ResourceNotFound):
+            open_source(dump).get_json("https://pokeapi.co/api/v2/pokemon/9999/")
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / "dump.csv"
+        path.write_text("")
+        with pytest.raises(ValueError):
+            open_source(path)
+
+
+class TestConfiguredSource:
+    def test_pokemon_fetch_reads_offline_dump(self, tmp_path, monkeypatch):
+        def fail(url):
+            raise AssertionError(f"unexpected request to {url}")
+        monkeypatch.setattr("requests.get", fail)
+
+        pokeapi.set_source(str(_write_jsonl(tmp_path / "dump.jsonl")))
+        try:
+            assert not pokeapi.uses_network()
+            p = Pokemon.fetch("pikachu")
+            assert p.id == 25
+            assert p.name == "Pikachu"
+        finally:
+            pokeapi.set_source("network")
+        assert pokeapi.uses_network()
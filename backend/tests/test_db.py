@@ -9,3 +9,34 @@ def test_tables_created(setup_database):
     inspector = inspect(engine)
     tables = inspector.get_table_names()
     assert "card" in tables
+
+
+def test_missing_card_columns_are_added():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.pool import StaticPool
+    from app.db import ensure_card_columns
+    from tests.test_models import TestCard
+    legacy = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE test_card (id VARCHAR(36) PRIMARY KEY, name TEXT)"))
+    ensure_card_columns(TestCard, legacy)
+    columns = {c["name"] for c in inspect(legacy).get_columns("test_card")}
+    assert {"base_stat_total", "retreat_cost", "hp"} <= columns
+
+
+def test_card_search_is_added_and_filled():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.pool import StaticPool
+    from app.db import ensure_card_search
+    from tests.test_models import TestCard
+    legacy = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE test_card (id VARCHAR(36) PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO test_card VALUES ('1', 'Pikachu')"))
+    ensure_card_search(TestCard, legacy)
+    ensure_card_search(TestCard, legacy)
+    with legacy.begin() as conn:
+        conn.execute(text("INSERT INTO test_card VALUES ('2', 'Raichu')"))
+        rows = conn.execute(text(
+            "SELECT card_id FROM test_card_search WHERE test_card_search MATCH '\"chu\"' ORDER BY card_id"))
+        assert [row.card_id for row in rows] == ["1", "2"]
@@ -0,0 +1,61 @@
+# tests/test_fuzzy.py
+import random
+import string
+import time
+from app.fuzzy import NGramIndex, edit_distance
+
+
+class TestEditDistance:
+    def test_distances(self):
+        assert edit_distance("pikachu", "pikachu", 2) == 0
+        assert edit_distance("pikachuu", "pikachu", 2) == 1
+        assert edit_distance("charizrd", "charizard", 2) == 1
+        assert edit_distance("bulbsaur", "bulbasaur", 2) == 1
+        assert edit_distance("kitten", "sitting", 3) == 3
+
+    def test_stops_past_the_limit(self):
+        assert edit_distance("pikachu", "charizard", 2) == 3
+        assert edit_distance("a", "abcdef", 2) == 3
+
+
+class TestNGramIndex:
+    def _index(self, words):
+        index = NGramIndex()
+        for word in words:
+            index.add(word)
+        return index
+
+    def test_finds_words_within_the_distance(self):
+        index = self._index(["pikachu", "raichu", "pichu", "charizard", "charmander"])
+        assert index.search("pikachuu", 2) == [(1, "pikachu")]
+        assert index.search("charizrd", 2) == [(1, "charizard")]
+        assert index.search("picchu", 1) == [(1, "pichu")]
+        assert index.search("zzzzzz", 2) == []
+
+    def test_discard(self):
+        index = self._index(["pikachu", "pichu"])
+        index.discard("pikachu")
+        assert index.search("pikachu", 2) == [(2, "pichu")]
+        assert len(index) == 1
+
+    def test_agrees_with_a_full_scan(self):
+        rng = random.Random(7)
+        words = {"".join(rng.choices(string.ascii_lowercase[:8], k=rng.randint(4, 10))) for _ in range(500)}
+        index = self._index(words)
+        for query in rng.sample(sorted(words), 20):
+            query = query[:2] + "x" + query[3:]
+            expected = sorted((edit_distance(query, w, 2), w) for w in words if edit_distance(query, w, 2) <= 2)
+            assert index.search(query, 2) == expected
+
+    def test_few_thousand_names_answer_quickly(self):
+        rng = random.Random(1)
+        consonants, vowels = "bcdfghjklmnprstvwz", "aeiou"
+        words = {"".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(3, 6)))
+                 for _ in range(3000)}
+        index = self._index(words)
+        queries = [w[:3] + "x" + w[4:] for w in rng.sample(sorted(words), 50)]
+        started = time.perf_counter()
+        for query in queries:
+            index.search(query, 2)
+        # generous bound for slow CI machines; typically a few hundred microseconds
+        assert (time.perf_counter() - started) / len(queries) < 0.01
@@ -0,0 +1,167 @@
+# tests/test_importer.py
+import time
+import pytest
+from app.importer import ImportEngine, Stage
+from app.rate_limit import TokenBucket
+
+
+def _fake_build(identifier, timings):
+    if identifier == 3:
+        raise ValueError("boom")
+    timings["fetch"] = 0.001
+    return {"name": f"Mon{identifier}", "collector_number": identifier}
+
+
+def _fake_persist(payloads):
+    return [({"status": 201, "message": "Card created", "data": p}, 201) for p in payloads]
+
+
+def _engine(build=_fake_build, persist_batch=_fake_persist, workers=1, **kwargs):
+    return ImportEngine([Stage("build", build, workers)], persist_batch, **kwargs)
+
+
+class TestTokenBucket:
+    def test_burst_is_free(self):
+        """Requests within capacity never wait"""
+        bucket = TokenBucket(rate=10, capacity=5)
+        assert all(bucket.reserve() == 0 for _ in range(5))
+
+    def test_wait_after_burst(self):
+        """Once the bucket is empty callers queue at 1/rate intervals"""
+        bucket = TokenBucket(rate=10, capacity=1)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+    def test_zero_rate_disables_limit(self):
+        bucket = TokenBucket(rate=0)
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+class TestImportEngine:
+    def test_results_keep_identifier_order(self):
+        engine = _engine(workers=4)
+        summary = engine.run([5, 1, 2, 4])
+        assert [r["identifier"] for r in summary["results"]] == [5, 1, 2, 4]
+        assert all(r["status"] == 201 for r in summary["results"])
+        assert summary["results"][0]["data"]["name"] == "Mon5"
+
+    def test_failures_are_reported_per_identifier(self):
+        engine = _engine(workers=2)
+        summary = engine.run(range(1, 5))
+        failed = [r for r in summary["results"] if r["error"]]
+        assert len(failed) == 1
+        assert failed[0]["identifier"] == 3
+        assert failed[0]["error"] == "boom"
+        assert summary["stats"]["imported"] == 3
+        assert summary["stats"]["failed"] == 1
+
+    def test_persist_errors_are_reported(self):
+        def persist(payloads):
+            return [({"error": "Card creation failed"}, 500)] * len(payloads)
+        summary = _engine(persist_batch=persist).run([1])
+        assert summary["results"][0]["status"] == 500
+        assert summary["results"][0]["error"] == {"error": "Card creation failed"}
+
+    def test_stats_include_stage_timings(self):
+        summary = _engine().run([1, 2])
+        stages = summary["stats"]["stages"]
+        assert set(stages) == {"fetch", "build", "persist"}
+        assert stages["fetch"]["count"] == 2
+        assert stages["persist"]["count"] == 1, "both cards persisted in one batch"
+        assert summary["stats"]["cards_per_second"] > 0
+
+    def test_builds_run_concurrently(self):
+        def slow_build(identifier, timings):
+            time.sleep(0.05)
+            return {"collector_number": identifier}
+        started = time.perf_counter()
+        _engine(slow_build, workers=8).run(range(8))
+        assert time.perf_counter() - started < 0.3
+
+    def test_payloads_are_persisted_in_batches(self):
+        batches = []
+
+        def persist(payloads):
+            batches.append(len(payloads))
+            return _fake_persist(payloads)
+        summary = _engine(persist_batch=persist, batch_size=2).run([1, 2, 4, 5, 6])
+        assert sorted(batches) == [1, 2, 2]
+        assert summary["stats"]["imported"] == 5
+
+    def test_batch_failure_marks_every_row(self):
+        def persist(payloads):
+            raise RuntimeError("db down")
+        summary = _engine(persist_batch=persist).run([1, 2])
+        assert [r["error"] for r in summary["results"]] == [{"error": "db down"}] * 2
+
+    def test_stages_hand_off_in_order(self):
+        def fetch(identifier, timings):
+            return {"id": identifier}
+
+        def derive(fetched, timings):
+            return {"collector_number": fetched["id"] * 10}
+        engine = ImportEngine([Stage("fetch", fetch, 3), Stage("derive", derive, 2)], _fake_persist)
+        summary = engine.run(range(1, 6))
+        assert [r["data"]["collector_number"] for r in summary["results"]] == [10, 20, 30, 40, 50]
+        pipeline = summary["stats"]["pipeline"]
+        assert set(pipeline) == {"fetch", "derive", "persist"}
+        assert pipeline["fetch"]["workers"] == 3 and pipeline["derive"]["workers"] == 2
+
+    def test_failure_skips_later_stages(self):
+        derived = []
+
+        def derive(payload, timings):
+            derived.append(payload["collector_number"])
+            return payload
+        engine = ImportEngine([Stage("fetch", _fake_build, 2), Stage("derive", derive)], _fake_persist)
+        summary = engine.run([1, 2, 3])
+        assert sorted(derived) == [1, 2]
+        assert summary["results"][2]["error"] == "boom"
+
+    def test_bounded_queues_apply_backpressure(self):
+        """A slow persister holds the fetch stage back instead of buffering everything"""
+        fetched, persisted, ahead = [], [], []
+
+        def fetch(identifier, timings):
+            fetched.append(identifier)
+            return {"collector_number": identifier}
+
+        def persist(payloads):
+            time.sleep(0.02)
+            persisted.extend(payloads)
+            ahead.append(len(fetched) - len(persisted))
+            return _fake_persist(payloads)
+        engine = ImportEngine([Stage("fetch", fetch), Stage("derive", lambda p, t: p)], persist,
+                              batch_size=1, queue_size=2)
+        summary = engine.run(range(12))
+        assert summary["stats"]["imported"] == 12
+        # two full queues plus one card in hand per stage
+        assert max(ahead) <= 2 * 2 + 2
+        assert summary["stats"]["pipeline"]["fetch"]["blocked_seconds"] > 0
+
+    def test_idle_pipeline_flushes_partial_batch(self):
+        def slow_build(identifier, timings):
+            if identifier == 2:
+                time.sleep(0.2)
+            return {"collector_number": identifier}
+        batches = []
+
+        def persist(payloads):
+            batches.append([p["collector_number"] for p in payloads])
+            return _fake_persist(payloads)
+        _engine(slow_build, persist_batch=persist, batch_size=10, flush_interval=0.05).run([1, 2])
+        assert batches == [[1], [2]]
+
+    def test_on_result_error_stops_workers(self):
+        def on_result(result):
+            raise RuntimeError("progress write failed")
+        engine = _engine(workers=2, on_result=on_result, batch_size=1, queue_size=1)
+        with pytest.raises(RuntimeError):
+            engine.run(range(1, 50))
+
+    def test_stats_include_card_latency(self):
+        summary = _engine().run([1, 2, 3, 4])
+        latency = summary["stats"]["card_latency"]
+        assert latency["count"] == 4
+        assert 0 < latency["p50_ms"] <= latency["p99_ms"] <= latency["max_ms"]
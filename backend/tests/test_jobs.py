@@ -0,0 +1,240 @@
+# tests/test_jobs.py
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+import pytest
+from app import jobs
+from app.jobs import ProgressRecorder, job_progress, remaining_identifiers
+from tests.test_models import TestCard as Card, TestImportJob as ImportJob
+
+
+def _job(**fields):
+    defaults = dict(status="running", total=10, imported=0, failed=0,
+                    started_at=None, finished_at=None, processed_before_run=0,
+                    created_at=datetime.now(UTC), updated_at=None, failed_identifiers=None)
+    defaults.update(fields)
+    return SimpleNamespace(**defaults)
+
+
+BROKEN = {3}
+BUILT = []
+
+
+def _fake_build(identifier, timings, session=None):
+    BUILT.append(identifier)
+    if identifier in BROKEN:
+        raise ValueError(f"Pokémon '{identifier}' not found")
+    return {"name": f"Mon{identifier}", "set_code": "Test", "collector_number": identifier,
+            "hp": 50, "weakness": [], "resistance": []}
+
+
+@pytest.fixture
+def inline_jobs(monkeypatch):
+    """Run submitted jobs synchronously against the test database."""
+    monkeypatch.setattr("app.crud.ImportJob", ImportJob)
+    monkeypatch.setattr("app.crud.Card", Card)
+    monkeypatch.setattr("app.logic._fetch_for_import", _fake_build)
+    monkeypatch.setattr("app.logic._derive_for_import", lambda payload, timings: payload)
+    monkeypatch.setattr("app.logic.prefetch_range_moves", lambda identifiers, session=None: 0)
+    monkeypatch.setattr(jobs, "submit", lambda fn, *args: fn(*args))
+    BROKEN.clear()
+    BROKEN.add(3)
+    BUILT.clear()
+
+
+class TestProgressRecorder:
+    def test_counts_and_errors(self):
+        saved = []
+        recorder = ProgressRecorder(lambda **fields: saved.append(fields), interval=3600)
+        recorder({"identifier": 1, "status": 201, "error": None})
+        recorder({"identifier": 2, "status": 404, "error": "not found"})
+        assert saved == [], "writes are throttled"
+        recorder.flush()
+        assert saved[0]["imported"] == 1 and saved[0]["failed"] == 1
+        assert saved[0]["errors"] == [{"identifier": 2, "status": 404, "error": "not found"}]
+
+    def test_checkpoint_waits_for_gaps(self):
+        saved = []
+        recorder = ProgressRecorder(lambda **fields: saved.append(fields), [1, 2, 3, 4], interval=0)
+        recorder({"identifier": 2, "status": 201, "error": None})
+        assert recorder.checkpoint is None, "1 is still running"
+        recorder({"identifier": 1, "status": 500, "error": "boom"})
+        assert recorder.checkpoint == 2
+        recorder({"identifier": 4, "status": 201, "error": None})
+        assert saved[-1]["checkpoint"] == 2
+        assert saved[-1]["failed_identifiers"] == [1]
+
+    def test_retries_below_checkpoint_keep_it(self):
+        recorder = ProgressRecorder(lambda **fields: None, [2, 5, 6], checkpoint=4, imported=3)
+        recorder({"identifier": 2, "status": 201, "error": None})
+        recorder({"identifier": 5, "status": 201, "error": None})
+        assert recorder.checkpoint == 5
+        assert recorder.imported == 5
+
+    def test_earlier_failures_survive_until_retried(self):
+        """A resumed run that dies before its retries finish keeps the old failures"""
+        saved = []
+        recorder = ProgressRecorder(lambda **fields: saved.append(fields), [2, 7, 8, 9, 10],
+                                    checkpoint=6, failed_identifiers=[2], interval=0)
+        recorder({"identifier": 7, "status": 201, "error": None})
+        assert (saved[-1]["checkpoint"], saved[-1]["failed_identifiers"]) == (7, [2])
+        recorder({"identifier": 2, "status": 201, "error": None})
+        assert saved[-1]["failed_identifiers"] == []
+
+    def test_error_list_is_capped(self):
+        recorder = ProgressRecorder(lambda **fields: None, max_errors=2)
+        for i in range(5):
+            recorder({"identifier": i, "status": 500, "error": "boom"})
+        assert recorder.failed == 5
+        assert len(recorder.errors) == 2
+
+
+class TestRemainingIdentifiers:
+    def test_fresh_job_runs_whole_range(self):
+        job = _job(range_start=1, range_end=5, checkpoint=None, failed_identifiers=None)
+        assert remaining_identifiers(job) == [1, 2, 3, 4, 5]
+
+    def test_resume_after_checkpoint_and_failures(self):
+        job = _job(range_start=1, range_end=8, checkpoint=5, failed_identifiers=[2, 7])
+        assert remaining_identifiers(job) == [2, 6, 7, 8]
+
+
+class TestIsResumable:
+    def test_queued_job_with_a_heartbeat_is_not_stale(self):
+        """A job waiting behind long imports must not be submitted twice"""
+        old = datetime.now(UTC) - timedelta(hours=1)
+        assert not jobs.is_resumable(_job(status="queued", created_at=old, updated_at=datetime.now(UTC)))
+
+    def test_queued_job_without_a_heartbeat_is_stale(self):
+        old = datetime.now(UTC) - timedelta(hours=1)
+        assert jobs.is_resumable(_job(status="queued", created_at=old))
+
+    def test_running_job_is_stale_once_progress_stops(self):
+        old = datetime.now(UTC) - timedelta(hours=1)
+        assert jobs.is_resumable(_job(started_at=old, updated_at=old))
+        assert not jobs.is_resumable(_job(started_at=old, updated_at=datetime.now(UTC)))
+
+
+class TestHeartbeat:
+    def test_beats_touch_owned_jobs_until_they_finish(self):
+        touched = []
+        heartbeat = jobs.Heartbeat(touched.append, interval=3600)
+        heartbeat.add("a")
+        heartbeat.add("b")
+        heartbeat.beat()
+        heartbeat.discard("a")
+        heartbeat.beat()
+        heartbeat.discard("b")
+        heartbeat.beat()
+        assert touched == [["a", "b"], ["b"]]
+
+    def test_touch_skips_finished_jobs(self, db_session, monkeypatch):
+        from app import crud
+        monkeypatch.setattr("app.crud.ImportJob", ImportJob)
+        queued = crud.create_import_job(db_session, range_start=1, range_end=2, total=2)
+        done = crud.create_import_job(db_session, range_start=1, range_end=2, total=2,
+                                      status="completed")
+        assert crud.touch_import_jobs(db_session, [queued.id, done.id]) == 1
+
+
+class TestJobProgress:
+    def test_queued_job(self):
+        progress = job_progress(_job(status="queued"))
+        assert progress["progress"] == 0.0
+        assert progress["eta_seconds"] is None
+
+    def test_running_job_throughput_and_eta(self):
+        started = datetime.now(UTC) - timedelta(seconds=10)
+        progress = job_progress(_job(started_at=started, imported=4, failed=1))
+        assert progress["progress"] == 0.5
+        assert progress["cards_per_second"] == pytest.approx(0.5, rel=0.05)
+        assert progress["eta_seconds"] == pytest.approx(10, rel=0.05)
+
+    def test_naive_timestamps_are_utc(self):
+        started = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=4)
+        progress = job_progress(_job(started_at=started, imported=2))
+        assert progress["elapsed_seconds"] == pytest.approx(4, abs=1)
+
+
+class TestImportJobRoutes:
+    def test_range_import_runs_as_job(self, client, auth_headers_admin, inline_jobs):
+        rv = client.post("/api/cards/import/range/1/4", headers=auth_headers_admin)
+        assert rv.status_code == 202
+        job = rv.get_json()["data"]
+        assert job["status"] == "queued"
+        assert job["total"] == 4
+
+        rv = client.get(f"/api/cards/import/jobs/{job['id']}", headers=auth_headers_admin)
+        assert rv.status_code == 200
+        job = rv.get_json()["data"]
+        assert job["status"] == "completed"
+        assert (job["imported"], job["failed"]) == (3, 1)
+        assert job["progress"] == 1.0
+        assert job["errors"] == [{"identifier": 3, "status": 500, "error": "Pokémon '3' not found"}]
+
+    def test_reversed_range_is_rejected(self, client, auth_headers_admin, inline_jobs):
+        rv = client.post("/api/cards/import/range/5/1", headers=auth_headers_admin)
+        assert rv.status_code == 400
+
+    def test_unknown_job(self, client, auth_headers_admin):
+        rv = client.get("/api/cards/import/jobs/not-a-job", headers=auth_headers_admin)
+        assert rv.status_code == 404
+
+    def test_job_status_requires_admin(self, client, auth_headers_user):
+        rv = client.get("/api/cards/import/jobs/not-a-job", headers=auth_headers_user)
+        assert rv.status_code == 403
+
+    def test_resume_retries_only_failures(self, client, auth_headers_admin, inline_jobs):
+        job = client.post("/api/cards/import/range/1/4", headers=auth_headers_admin).get_json()["data"]
+        job = client.get(f"/api/cards/import/jobs/{job['id']}", headers=auth_headers_admin).get_json()["data"]
+        assert (job["checkpoint"], job["failed_identifiers"], job["resumable"]) == (4, [3], True)
+
+        BROKEN.clear()
+        BUILT.clear()
+        rv = client.post(f"/api/cards/import/jobs/{job['id']}/resume", headers=auth_headers_admin)
+        assert rv.status_code == 202
+        assert BUILT == [3]
+
+        job = client.get(f"/api/cards/import/jobs/{job['id']}", headers=auth_headers_admin).get_json()["data"]
+        assert job["status"] == "completed"
+        assert (job["imported"], job["failed"], job["attempts"]) == (4, 0, 2)
+        assert job["failed_identifiers"] == []
+        assert job["resumable"] is False
+
+    def test_interrupted_job_resumes_from_checkpoint(self, client, auth_headers_admin, inline_jobs, db_session):
+        from app import crud
+        job = crud.create_import_job(db_session, range_start=1, range_end=6, total=6)
+        crud.update_import_job(db_session, job.id, status="running", checkpoint=4,
+                               imported=4, attempts=1,
+                               updated_at=datetime.now(UTC) - timedelta(hours=1))
+
+        rv = client.post(f"/api/cards/import/jobs/{job.id}/resume", headers=auth_headers_admin)
+        assert rv.status_code == 202
+        assert sorted(BUILT) == [5, 6]
+        job = client.get(f"/api/cards/import/jobs/{job.id}", headers=auth_headers_admin).get_json()["data"]
+        assert (job["status"], job["imported"], job["checkpoint"]) == ("completed", 6, 6)
+
+    def test_orphaned_queued_job_can_be_recovered(self, client, auth_headers_admin, inline_jobs, db_session):
+        """A job queued on a process that died before running it is resumable"""
+        from app import crud
+        job = crud.create_import_job(db_session, range_start=1, range_end=2, total=2)
+        # no heartbeat since the process that accepted it went away
+        crud.update_import_job(db_session, job.id, updated_at=datetime.now(UTC) - timedelta(hours=1))
+        BROKEN.clear()
+
+        rv = client.post(f"/api/cards/import/jobs/{job.id}/resume", headers=auth_headers_admin)
+        assert rv.status_code == 202
+        job = client.get(f"/api/cards/import/jobs/{job.id}", headers=auth_headers_admin).get_json()["data"]
+        assert (job["status"], job["imported"]) == ("completed", 2)
+
+    def test_queued_job_still_owned_cannot_resume(self, client, auth_headers_admin, inline_jobs, db_session):
+        from app import crud
+        job = crud.create_import_job(db_session, range_start=1, range_end=2, total=2)
+        crud.touch_import_jobs(db_session, [job.id])
+        rv = client.post(f"/api/cards/import/jobs/{job.id}/resume", headers=auth_headers_admin)
+        assert rv.status_code == 409
+
+    def test_finished_job_cannot_resume(self, client, auth_headers_admin, inline_jobs):
+        BROKEN.clear()
+        job = client.post("/api/cards/import/range/1/2", headers=auth_headers_admin).get_json()["data"]
+        rv = client.post(f"/api/cards/import/jobs/{job['id']}/resume", headers=auth_headers_admin)
+        assert rv.status_code == 409
@@ -1,7 +1,7 @@
 # tests/test_logic.py
 import pytest
 from datetime import datetime, UTC
-from app.logic import create_tcg_card, Pokemon
+from app.logic import create_tcg_card, import_cards_logic, Pokemon
 import uuid
 from math import ceil
 from tests.test_poke_utils import MockPokemon
@@ -67,7 +67,7 @@ def patch_logic(monkeypatch):
         }
         return response, 201
 
-    def _list_cards(page=1, type_filter=None, pokemon_name=None,count_per_page=None):
+    def _list_cards(page=1, type_filter=None, pokemon_name=None,count_per_page=None, fields=None):
         cards = list(_test_storage.values())
         # Sort by collector_number for consistent pagination
         cards.sort(key=lambda x: x.get("collector_number", 0))
@@ -169,6 +169,140 @@ class TestLogic:
         # Error responses don't have a data key
         assert "data" not in response.get_json(), "error response should not have data key"
 
+    def test_import_cards_logic_is_idempotent(self, monkeypatch):
+        from tests.test_models import TestCard
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        payloads = [dict(_dummy_card_payload(name=f"Mon{i}"), collector_number=i) for i in (1, 2)]
+        results = import_cards_logic(payloads)
+        assert [status for _, status in results] == [201, 201]
+        assert [r["data"]["name"] for r, _ in results] == ["Mon1", "Mon2"]
+
+        payloads[1]["hp"] = 90
+        results = import_cards_logic(payloads)
+        assert [r["message"] for r, _ in results] == ["Card unchanged", "Card updated"]
+        assert results[1][0]["data"]["hp"] == 90
+        assert results[0][0]["data"]["id"] != results[1][0]["data"]["id"]
+
+    def test_reimported_card_is_unchanged(self, monkeypatch):
+        """A payload built by the importer compares equal to the card it stored"""
+        from tests.test_models import TestCard
+        from app.logic import build_tcg_card_data
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        monkeypatch.setattr("app.logic.select_best_levelup_move",
+                            lambda p: {"name": "vine-whip", "power": 45, "type": "grass"})
+        monkeypatch.setattr("app.logic.calculate_rarity", lambda p: "Common")
+        monkeypatch.setattr("app.logic.determine_set_code", lambda p: "Kanto")
+        payload = build_tcg_card_data(MockPokemon("bulbasaur", pokemon_id=1, types=["grass"], hp=45))
+        assert payload["attack_1_cost"] == "{grass,grass}"
+
+        assert import_cards_logic([payload])[0][0]["message"] == "Card created"
+        assert import_cards_logic([dict(payload)])[0][0]["message"] == "Card unchanged"
+
+    def test_rederive_cards(self, monkeypatch):
+        from tests.test_models import TestCard
+        from app.logic import rederive_cards
+        from app.poke_utils import CardRules
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        payloads = [dict(_dummy_card_payload(name=f"Mon{i}"), collector_number=i, type="Fire",
+                         hp=120, attack_1_dmg=60, attack_1_cost="{fire,fire}", retreat_cost=2,
+                         rarity="Uncommon", base_stat_total=450) for i in (1, 2, 3)]
+        payloads[2]["base_stat_total"] = None
+        import_cards_logic(payloads)
+
+        response, status = rederive_cards(batch_size=2)
+        assert status == 200
+        assert response["data"]["updated"] == 0
+
+        response, status = rederive_cards(CardRules(hp_per_retreat=30, rarity_thresholds=[(400, "Rare")]),
+                                          batch_size=2)
+        assert response["data"]["scanned"] == 3
+        assert response["data"]["updated"] == 3
+        assert response["data"]["fields"]["rarity"] == 2
+        assert response["data"]["missing_stat_total"] == 1
+        from app.db import SessionLocal
+        with SessionLocal() as db:
+            stored = {c.collector_number: (c.retreat_cost, c.rarity) for c in db.query(TestCard)}
+        assert stored == {1: (4, "Rare"), 2: (4, "Rare"), 3: (4, "Uncommon")}
+
+    def test_list_cards_by_cursor(self, monkeypatch):
+        from tests.test_models import TestCard
+        from app.logic import list_cards_by_cursor
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        import_cards_logic([dict(_dummy_card_payload(name=f"Mon{i}"), collector_number=i)
+                            for i in range(1, 6)])
+        seen, cursor = [], ""
+        for _ in range(3):
+            response, status = list_cards_by_cursor(cursor, None, None, 2)
+            assert status == 200
+            seen += [card["collector_number"] for card in response["data"]]
+            cursor = response["pagination"]["next_cursor"]
+        assert seen == [1, 2, 3, 4, 5]
+        assert cursor is None and response["pagination"]["has_next"] is False
+        assert list_cards_by_cursor("not-a-cursor", None, None, 2)[1] == 400
+
+    @pytest.mark.parametrize("values", [
+        (1, "not-a-uuid"),
+        ("x", "00000000-0000-0000-0000-000000000005"),
+        (True, "00000000-0000-0000-0000-000000000005"),
+        (1, 5),
+        (1,),
+        (1, "00000000-0000-0000-0000-000000000005", 3),
+    ])
+    def test_malformed_cursor_contents_are_rejected(self, values):
+        """Cursors that decode but do not hold (number | None, uuid) get the same 400"""
+        from app import services
+        from app.logic import list_cards_by_cursor
+        response, status = list_cards_by_cursor(services.encode_cursor(*values), None, None, 2)
+        assert (status, response) == (400, {"error": "Invalid cursor"})
+
+    def test_suggest_cards(self, monkeypatch, client):
+        from tests.test_models import TestCard
+        from app import crud
+        from app.logic import suggest_cards, SessionLocal
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        import_cards_logic([dict(_dummy_card_payload(name=name), collector_number=i)
+                            for i, name in enumerate(["Pikachu", "Pichu", "Raichu"], 1)])
+        response = client.get("/api/cards/suggest?q=pi&limit=5")
+        assert response.status_code == 200
+        assert [s["name"] for s in response.get_json()["data"]] == ["Pichu", "Pikachu"]
+        pichu = response.get_json()["data"][0]
+        with SessionLocal() as db:  # logic.delete_card is faked by patch_logic
+            crud.delete_card(db, pichu["id"])
+        assert [s["name"] for s in suggest_cards("PI")[0]["data"]] == ["Pikachu"]
+        assert suggest_cards("pi", 0)[1] == 400
+        assert client.get("/api/cards/suggest").status_code == 422
+
+    def test_suggestions_pick_up_other_processes_after_the_ttl(self, monkeypatch):
+        """Cards written elsewhere never reach card_names.put; the TTL probe finds them"""
+        from sqlalchemy import insert
+        from tests.test_models import TestCard
+        from app.logic import suggest_cards, SessionLocal
+        from app.suggest import card_names
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        import_cards_logic([dict(_dummy_card_payload(name="Pikachu"), collector_number=1)])
+        assert [s["name"] for s in suggest_cards("pi")[0]["data"]] == ["Pikachu"]
+
+        with SessionLocal() as db:  # as an import script or another worker would
+            db.execute(insert(TestCard).values(dict(_dummy_card_payload(name="Pichu"), collector_number=2)))
+            db.commit()
+        assert [s["name"] for s in suggest_cards("pi")[0]["data"]] == ["Pikachu"], "within the TTL"
+        monkeypatch.setattr(card_names, "ttl", 0)
+        assert [s["name"] for s in suggest_cards("pi")[0]["data"]] == ["Pichu", "Pikachu"]
+
+    def test_sparse_fieldsets(self, monkeypatch):
+        from tests.test_models import TestCard
+        from app.logic import parse_card_fields, list_cards_by_cursor
+        assert parse_card_fields(None) is None
+        assert parse_card_fields(" name, image_url,name ,id") == ["id", "name", "image_url"]
+        with pytest.raises(ValueError, match="bogus"):
+            parse_card_fields("name,bogus")
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        import_cards_logic([_dummy_card_payload(name="Eevee")])
+        response, status = list_cards_by_cursor("", None, None, 5, "name,type")
+        assert status == 200
+        assert [sorted(card) for card in response["data"]] == [["id", "name", "type"]]
+        assert list_cards_by_cursor("", None, None, 5, "password")[1] == 400
+
     def test_list_cards(self, client, create_test_cards):
         create_test_cards(12)
         response = client.get("/api/cards/")
@@ -240,22 +374,22 @@ class TestLogic:
         # 2. Mock database call - capture what gets saved
         saved_card_data = None
 
-        def mock_create_card_logic(**card_data):
+        def mock_import_card_logic(**card_data):
             nonlocal saved_card_data
             saved_card_data = card_data
             return {"id": "123", **card_data}, 201
 
         # 3. Apply mocks
         monkeypatch.setattr("app.logic.Pokemon.fetch", mock_pokemon_fetch)
-        monkeypatch.setattr("app.logic.create_card_logic",
-                            mock_create_card_logic)
+        monkeypatch.setattr("app.logic.import_card_logic",
+                            mock_import_card_logic)
 
         # 4. Test real function
         from app.logic import create_tcg_card
         result = create_tcg_card("pikachu")
 
         # 5. Assert business logic worked correctly
-        assert saved_card_data is not None, "create_card_logic was not called"
+        assert saved_card_data is not None, "import_card_logic was not called"
         assert saved_card_data["name"] == "pikachu", "should return the correct name"
         assert saved_card_data["hp"] == 35, "should return the correct HP"
         assert saved_card_data["type"] == "electric", "should return the correct type"
@@ -284,22 +418,22 @@ class TestLogic:
         # 2. Mock database call - capture what gets saved
         saved_card_data = None
 
-        def mock_create_card_logic(**card_data):
+        def mock_import_card_logic(**card_data):
             nonlocal saved_card_data
             saved_card_data = card_data
             return {"id": "123", **card_data}, 201
 
         # 3. Apply mocks
         monkeypatch.setattr("app.logic.Pokemon.fetch", mock_pokemon_fetch)
-        monkeypatch.setattr("app.logic.create_card_logic",
-                            mock_create_card_logic)
+        monkeypatch.setattr("app.logic.import_card_logic",
+                            mock_import_card_logic)
 
         # 4. Test real function
         from app.logic import create_tcg_card
         result = create_tcg_card("pikachu")
 
         # 5. Assert all required fields are present
-        assert saved_card_data is not None, "create_card_logic was not called"
+        assert saved_card_data is not None, "import_card_logic was not called"
 
         required_fields = ["name", "hp", "type", "rarity", "set_code", "collector_number",
                            "description", "attack_1_name", "attack_1_dmg", "attack_1_cost",
@@ -318,7 +452,7 @@ class TestLogic:
         saved_card_data_1 = None
         saved_card_data_2 = None
 
-        def mock_create_card_logic(**card_data):
+        def mock_import_card_logic(**card_data):
             nonlocal saved_card_data_1, saved_card_data_2
             if saved_card_data_1 is None:
                 saved_card_data_1 = card_data
@@ -328,8 +462,8 @@ class TestLogic:
 
         # 3. Apply mocks
         monkeypatch.setattr("app.logic.Pokemon.fetch", mock_pokemon_fetch)
-        monkeypatch.setattr("app.logic.create_card_logic",
-                            mock_create_card_logic)
+        monkeypatch.setattr("app.logic.import_card_logic",
+                            mock_import_card_logic)
 
         # 4. Test real function twice
         from app.logic import create_tcg_card
@@ -337,6 +471,6 @@ class TestLogic:
         result2 = create_tcg_card("pikachu")
 
         # 5. Assert both results are identical
-        assert saved_card_data_1 is not None, "First call to create_card_logic was not made"
-        assert saved_card_data_2 is not None, "Second call to create_card_logic was not made"
+        assert saved_card_data_1 is not None, "First call to import_card_logic was not made"
+        assert saved_card_data_2 is not None, "Second call to import_card_logic was not made"
         assert saved_card_data_1 == saved_card_data_2, "Same Pokemon should produce identical cards"
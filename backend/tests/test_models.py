@@ -7,10 +7,13 @@ __test__ = False  # Prevent pytest from collecting this file as a test
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Integer, Text, DateTime, JSON, text, String
+from sqlalchemy import Integer, Text, DateTime, JSON, text, String, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declarative_base
 from typing import List
 from sqlalchemy import ForeignKey
+from app.jobs import job_progress
+from app.search import install_card_search
+from app.models import CARD_COLUMNS
 
 TestBase = declarative_base()
 
@@ -63,6 +66,12 @@ class TestPokemon_Collection(TestBase):
 
 class TestCard(TestBase):
     __tablename__ = "test_card"
+    __table_args__ = (
+        # Imports upsert on this key; see crud.upsert_cards
+        Index("uq_test_card_set_collector", "set_code", "collector_number", unique=True),
+        # Catalog order and keyset pagination; see crud.list_cards_after
+        Index("ix_test_card_collector_id", "collector_number", "id"),
+    )
     id: Mapped[str] = mapped_column(
         String(36),
         primary_key=True,
@@ -91,34 +100,116 @@ class TestCard(TestBase):
     resistance: Mapped[list] = mapped_column(JSON, nullable=True)
     retreat_cost: Mapped[int] = mapped_column(Integer, nullable=True)
     image_url: Mapped[str] = mapped_column(Text, nullable=True)
+    # Sum of the Pokémon's base stats, kept so rarity can be rederived offline
+    base_stat_total: Mapped[int] = mapped_column(Integer, nullable=True)
     pokemon_collection: Mapped[List["TestPokemon_Collection"]] = relationship(
         back_populates="card", cascade="all, delete-orphan")
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
+        """All fields, or only `fields` (keys of CARD_FIELD_COLUMNS) in that order."""
+        if fields is not None:
+            return {field: self._field_value(field) for field in fields}
+        values = self._column_values()
         return {
-            "id": str(self.id),
-            "created_at": self.created_at,
-            "name": self.name,
-            "rarity": self.rarity,
-            "type": self.type,
-            "hp": self.hp,
-            "set_code": self.set_code,
-            "collector_number": self.collector_number,
-            "description": self.description,
+            "id": str(values["id"]),
+            "created_at": values["created_at"],
+            "name": values["name"],
+            "rarity": values["rarity"],
+            "type": values["type"],
+            "hp": values["hp"],
+            "set_code": values["set_code"],
+            "collector_number": values["collector_number"],
+            "description": values["description"],
             "attacks": [
                 {
-                    "name": self.attack_1_name,
-                    "damage": self.attack_1_dmg,
-                    "cost": self.attack_1_cost,
+                    "name": values["attack_1_name"],
+                    "damage": values["attack_1_dmg"],
+                    "cost": values["attack_1_cost"],
                 },
                 {
-                    "name": self.attack_2_name,
-                    "damage": self.attack_2_dmg,
-                    "cost": self.attack_2_cost,
+                    "name": values["attack_2_name"],
+                    "damage": values["attack_2_dmg"],
+                    "cost": values["attack_2_cost"],
                 },
             ],
-            "weakness": self.weakness or [],
-            "resistance": self.resistance or [],
-            "retreat_cost": self.retreat_cost,
-            "image_url": self.image_url,
+            "weakness": values["weakness"] or [],
+            "resistance": values["resistance"] or [],
+            "retreat_cost": values["retreat_cost"],
+            "image_url": values["image_url"],
+        }
+
+    def _column_values(self):
+        # A loaded row keeps its column values in __dict__; reading them
+        # there skips the ORM's per-attribute instrumentation, the bulk of
+        # to_dict's cost. Expired, deferred or never-set columns go through
+        # getattr, which loads or defaults them.
+        values = self.__dict__
+        if CARD_COLUMNS <= values.keys():
+            return values
+        return {column: getattr(self, column) for column in CARD_COLUMNS}
+
+    def _field_value(self, field):
+        if field == "id":
+            return str(self.id)
+        if field == "attacks":
+            return [{"name": self.attack_1_name, "damage": self.attack_1_dmg, "cost": self.attack_1_cost},
+                    {"name": self.attack_2_name, "damage": self.attack_2_dmg, "cost": self.attack_2_cost}]
+        if field in ("weakness", "resistance"):
+            return getattr(self, field) or []
+        return getattr(self, field)
+
+
+install_card_search(TestCard.__table__)
+
+
+class TestImportJob(TestBase):
+    __tablename__ = "test_import_job"
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        index=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP")
+    )
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default=text("'queued'"))
+    range_start: Mapped[int] = mapped_column(Integer, nullable=False)
+    range_end: Mapped[int] = mapped_column(Integer, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+    imported: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    errors: Mapped[list] = mapped_column(JSON, nullable=True)
+    message: Mapped[str] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Resume state: every identifier up to `checkpoint` has finished, and
+    # `failed_identifiers` are the ones that need another attempt.
+    checkpoint: Mapped[int] = mapped_column(Integer, nullable=True)
+    failed_identifiers: Mapped[list] = mapped_column(JSON, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    processed_before_run: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+
+    def to_dict(self):
+        return {
+            "id": str(self.id),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "status": self.status,
+            "start": self.range_start,
+            "end": self.range_end,
+            "total": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors or [],
+            "message": self.message,
+            "updated_at": self.updated_at,
+            "checkpoint": self.checkpoint,
+            "failed_identifiers": self.failed_identifiers or [],
+            "attempts": self.attempts,
+            **job_progress(self),
         }
@@ -1,5 +1,6 @@
 # tests/test_poke_utils.py
 # type: ignore
+import json
 import pytest
 from unittest.mock import patch, Mock
 from app.poke_utils import (
@@ -10,12 +11,22 @@ from app.poke_utils import (
     map_hp_to_retreat,
     calculate_rarity,
     determine_set_code,
-    get_override_move
+    get_override_move,
+    CardRules,
 )
+from app.pokeapi import Pokemon
+
+
+def _parse(data: dict) -> Pokemon:
+    return Pokemon.from_stream(json.dumps(data).encode())
 
 
 class MockPokemon:  # type: ignore[misc]
-    """Mock Pokemon class for testing utility functions"""
+    """
+    Mock Pokemon class for testing utility functions. `raw_data` is the
+    PokeAPI payload it stands for; the compact fields are parsed from it on
+    access, so tests can edit the payload after construction.
+    """
 
     def __init__(self, name="pikachu", pokemon_id=25, types=None, hp=35, is_legendary=False, is_mythical=False):
         # Create a minimal Pokemon-like object that satisfies the type checker
@@ -67,6 +78,18 @@ class MockPokemon:  # type: ignore[misc]
             ]
         }
 
+    @property
+    def stats(self):
+        return _parse(self.raw_data).stats
+
+    @property
+    def moves(self):
+        return _parse(self.raw_data).moves
+
+    @property
+    def override_move(self):
+        return _parse(self.raw_data).override_move
+
     def fetch_damage_relations(self):
         return {"weakness": ["Ground"], "resistance": ["Electric", "Flying"]}
 
@@ -109,6 +132,20 @@ class TestPokeUtils:
         assert len(unknown_cost) == 1
         assert "colorless" in unknown_cost
 
+    def test_card_rules_report_only_stale_fields(self):
+        card = Mock(type="Fire", hp=120, attack_1_dmg=60, attack_1_cost="{fire,fire}",
+                    attack_2_dmg=None, attack_2_cost=None, retreat_cost=2,
+                    rarity="Uncommon", base_stat_total=450)
+        assert CardRules().changes(card) == {}
+        assert CardRules(energy_per_symbol=30, hp_per_retreat=40).changes(card) == {
+            "attack_1_cost": "{fire}", "retreat_cost": 3}
+        assert CardRules(rarity_thresholds=[(400, "Rare")]).changes(card) == {"rarity": "Rare"}
+
+    def test_card_rules_keep_species_rarities(self):
+        card = Mock(type="Psychic", hp=None, attack_1_dmg=None, attack_2_dmg=None,
+                    rarity="Secret Rare", base_stat_total=600)
+        assert CardRules().changes(card) == {}
+
     def test_map_hp_to_retreat(self):
         """Test HP to retreat cost mapping"""
         assert map_hp_to_retreat(35) == 1   # 35/60 = 0.58, ceil = 1
@@ -328,3 +365,73 @@ class TestPokeUtils:
         assert rarity in ["Common", "Uncommon",
                           "Rare", "Ultra Rare", "Secret Rare"]
         assert set_code in ["Kanto", "Johto", "Unknown"]
+
+    def test_move_store_shares_moves_across_pokemon(self, monkeypatch):
+        """Each distinct move URL is fetched once per process"""
+        calls = []
+
+        def mock_get(url):
+            calls.append(url)
+
+            class MockResponse:
+                def raise_for_status(self):
+                    pass
+
+                def json(self):
+                    return {"name": "quick-attack", "power": 40, "type": {"name": "normal"}}
+            return MockResponse()
+
+        monkeypatch.setattr("requests.get", mock_get)
+
+        select_best_levelup_move(MockPokemon("chikorita"))
+        select_best_levelup_move(MockPokemon("cyndaquil"))
+        assert sorted(calls) == [
+            "https://pokeapi.co/api/v2/move/84/",
+            "https://pokeapi.co/api/v2/move/98/",
+        ]
+
+
+class TestCompactPokemon:
+    def test_parses_only_card_fields(self):
+        data = MockPokemon("pikachu", hp=35).raw_data
+        p = _parse(data)
+        assert (p.id, p.name, p.types, p.hp) == (25, "Pikachu", ("Electric",), 35)
+        assert sum(p.stats.values()) == 320
+        assert p.moves == ("https://pokeapi.co/api/v2/move/84/", "https://pokeapi.co/api/v2/move/98/")
+        assert p.override_move == "https://pokeapi.co/api/v2/move/84/"
+        assert not hasattr(p, "raw_data")
+        assert not hasattr(p, "__dict__"), "slotted record"
+
+    def test_keeps_level_up_moves_only(self):
+        data = MockPokemon("chikorita", pokemon_id=152).raw_data
+        data["moves"].append({
+            "move": {"name": "solar-beam", "url": "https://pokeapi.co/api/v2/move/76/"},
+            "version_group_details": [{"move_learn_method": {"name": "machine"}}],
+        })
+        data["moves"].append(data["moves"][0])
+        p = _parse(data)
+        assert p.moves == ("https://pokeapi.co/api/v2/move/84/", "https://pokeapi.co/api/v2/move/98/")
+        assert p.override_move is None
+
+    def test_missing_override_move(self):
+        from app.poke_utils import candidate_moves
+        data = MockPokemon("bulbasaur", pokemon_id=1).raw_data
+        p = _parse(data)
+        assert p.override_move is None
+        with pytest.raises(ValueError):
+            candidate_moves(p)
+
+    def test_species_info_is_shared_across_records(self, monkeypatch):
+        urls = []
+
+        def fake_get_json(url):
+            urls.append(url)
+            return {"is_legendary": False, "is_mythical": False,
+                    "generation": {"url": "https://pokeapi.co/api/v2/generation/1/"}}
+
+        monkeypatch.setattr("app.pokeapi.get_json", fake_get_json)
+        first = _parse(MockPokemon("pikachu").raw_data)
+        second = _parse(MockPokemon("pikachu").raw_data)
+        assert first is not second
+        assert first.fetch_species_info() == second.fetch_species_info()
+        assert urls == [f"{Pokemon.SPECIES_URL}25/"]
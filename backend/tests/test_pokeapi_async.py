@@ -0,0 +1,169 @@
+# tests/test_pokeapi_async.py
+import asyncio
+import httpx
+import pytest
+from app import pokeapi
+from app.pokeapi import Pokemon
+from app.poke_utils import get_move_info, is_move_known
+from app.pokeapi_async import AsyncPokeAPIClient, PrefetchSession, prefetch_card_resources
+from tests.test_poke_utils import MockPokemon
+
+GEN_2_URL = "https://pokeapi.co/api/v2/generation/2/"
+
+
+def _fixtures():
+    pokemon = MockPokemon("chikorita", pokemon_id=152, types=["grass"], hp=45).raw_data
+    return {
+        f"{Pokemon.BASE_URL}152/": pokemon,
+        f"{Pokemon.SPECIES_URL}152/": {
+            "is_legendary": False, "is_mythical": False,
+            "generation": {"url": GEN_2_URL},
+        },
+        GEN_2_URL: {"main_region": {"name": "johto"}},
+        "https://pokeapi.co/api/v2/move/84/": {"name": "thunder-shock", "power": 40, "type": {"name": "electric"}},
+        "https://pokeapi.co/api/v2/move/98/": {"name": "quick-attack", "power": 40, "type": {"name": "normal"}},
+    }
+
+
+MOVE_URLS = {"https://pokeapi.co/api/v2/move/84/", "https://pokeapi.co/api/v2/move/98/"}
+
+
+def _run(identifier, fixtures, requested, method="fetch_card_resources"):
+    def handler(request):
+        url = str(request.url)
+        requested.append(url)
+        if url not in fixtures:
+            return httpx.Response(404)
+        return httpx.Response(200, json=fixtures[url])
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await getattr(AsyncPokeAPIClient(client), method)(identifier)
+    return asyncio.run(main())
+
+
+class TestAsyncPokeAPIClient:
+    def test_fetches_whole_dependency_graph(self):
+        fixtures = _fixtures()
+        requested = []
+        responses = _run(152, fixtures, requested)
+        assert set(responses) == set(fixtures) - MOVE_URLS - {GEN_2_URL}
+        assert all(is_move_known(url) for url in MOVE_URLS), "moves go to the move store"
+        assert GEN_2_URL not in requested, "bundled generations are not fetched"
+        assert len(requested) == len(set(requested)), "each resource is requested once"
+
+    def test_unknown_generation_is_fetched(self):
+        fixtures = _fixtures()
+        gen_url = "https://pokeapi.co/api/v2/generation/99/"
+        fixtures[f"{Pokemon.SPECIES_URL}152/"]["generation"]["url"] = gen_url
+        fixtures[gen_url] = {"main_region": {"name": "terarium"}}
+        requested = []
+        _run(152, fixtures, requested)
+        assert gen_url in requested
+
+    def test_known_moves_are_not_refetched(self):
+        requested = []
+        _run(152, _fixtures(), requested)
+        requested.clear()
+        _run(152, _fixtures(), requested)
+        assert not MOVE_URLS & set(requested)
+
+    def test_range_prefetch_fetches_each_move_once(self):
+        fixtures = _fixtures()
+        fixtures[f"{Pokemon.BASE_URL}153/"] = fixtures[f"{Pokemon.BASE_URL}152/"]
+        requested = []
+        fetched = _run([152, 153], fixtures, requested, method="fetch_range_moves")
+        assert fetched == 2
+        assert sorted(u for u in requested if "/move/" in u) == sorted(MOVE_URLS)
+        assert get_move_info("https://pokeapi.co/api/v2/move/84/")["power"] == 40
+
+    def test_each_pokemon_body_is_parsed_once(self, monkeypatch):
+        """A range import parses a /pokemon/ body in the prefetch and reuses the record"""
+        parsed = []
+        from_stream = Pokemon.from_stream.__func__
+
+        def counting(cls, source, prefix=""):
+            parsed.append(source)
+            return from_stream(cls, source, prefix)
+        monkeypatch.setattr(Pokemon, "from_stream", classmethod(counting))
+
+        fixtures = _fixtures()
+        _run([152], fixtures, [], method="fetch_range_moves")
+        requested = []
+        responses = _run(152, fixtures, requested)
+        assert f"{Pokemon.BASE_URL}152/" not in requested
+        with pokeapi.primed(responses):
+            p = Pokemon.fetch(152)
+        assert p.id == 152
+        assert len(parsed) == 1
+        assert pokeapi.prefetched_pokemon(f"{Pokemon.BASE_URL}152/") is None, "taken once used"
+
+    def test_species_starts_with_pokemon_for_numeric_ids(self):
+        requested = []
+        _run(152, _fixtures(), requested)
+        assert set(requested[:2]) == {f"{Pokemon.BASE_URL}152/", f"{Pokemon.SPECIES_URL}152/"}
+
+    def test_missing_pokemon_returns_partial_results(self):
+        requested = []
+        responses = _run("missingno", _fixtures(), requested)
+        assert responses == {}
+
+    def test_primed_responses_skip_the_network(self, monkeypatch):
+        def fail(url):
+            raise AssertionError(f"unexpected request to {url}")
+        monkeypatch.setattr("requests.get", fail)
+
+        fixtures = _fixtures()
+        with pokeapi.primed(fixtures):
+            assert pokeapi.get_json(GEN_2_URL)["main_region"]["name"] == "johto"
+        with pytest.raises(AssertionError):
+            pokeapi.get_json(GEN_2_URL)
+
+    def test_concurrent_clients_share_requests(self):
+        """Cards imported side by side fetch a shared resource once"""
+        fixtures = _fixtures()
+        requested = []
+
+        async def handler(request):
+            url = str(request.url)
+            requested.append(url)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=fixtures[url])
+
+        async def main():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                clients = [AsyncPokeAPIClient(client) for _ in range(3)]
+                return await asyncio.gather(*(c.get_raw(GEN_2_URL) for c in clients))
+        bodies = asyncio.run(main())
+        assert len(set(bodies)) == 1
+        assert requested == [GEN_2_URL]
+
+
+class TestPrefetchSession:
+    def test_cards_share_one_client_and_loop(self, monkeypatch):
+        """An import opens one connection pool, not one per card"""
+        fixtures = _fixtures()
+        fixtures[f"{Pokemon.BASE_URL}153/"] = fixtures[f"{Pokemon.BASE_URL}152/"]
+        fixtures[f"{Pokemon.SPECIES_URL}153/"] = fixtures[f"{Pokemon.SPECIES_URL}152/"]
+        opened = []
+        async_client = httpx.AsyncClient
+
+        def client(**kwargs):
+            transport = httpx.MockTransport(lambda request: httpx.Response(200, json=fixtures[str(request.url)]))
+            opened.append(async_client(transport=transport, **kwargs))
+            return opened[-1]
+        monkeypatch.setattr("app.pokeapi_async.httpx.AsyncClient", client)
+        monkeypatch.setattr("app.pokeapi.uses_network", lambda: True)
+        monkeypatch.setattr("app.pokeapi_async.POKEAPI_PREFETCH", True)
+
+        with PrefetchSession() as session:
+            first = prefetch_card_resources(152, session)
+            second = prefetch_card_resources(153, session)
+            assert len(opened) == 1
+            assert not opened[0].is_closed
+        assert opened[0].is_closed
+        assert f"{Pokemon.SPECIES_URL}152/" in first and f"{Pokemon.SPECIES_URL}153/" in second
+
+    def test_unused_session_starts_nothing(self):
+        session = PrefetchSession()
+        session.close()
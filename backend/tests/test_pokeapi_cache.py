@@ -0,0 +1,91 @@
+# tests/test_pokeapi_cache.py
+import json
+import pytest
+from app import pokeapi
+from app.pokeapi_cache import ResponseCache
+
+URL = "https://pokeapi.co/api/v2/move/84/"
+BODY = {"name": "thunder-shock", "power": 40, "type": {"name": "electric"}}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "pokeapi.sqlite3"), ttl=60)
+    monkeypatch.setattr("app.pokeapi.get_cache", lambda: cache)
+    monkeypatch.setattr(pokeapi.limiter, "rate", 0)
+    return cache
+
+
+class TestResponseCache:
+    def test_put_and_get(self, cache):
+        cache.put(URL, b'{"a": 1}', etag='"v1"')
+        entry = cache.get(URL)
+        assert entry.fresh
+        assert entry.body == b'{"a": 1}'
+        assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+        assert cache.stats()["hits"] == 1
+
+    def test_miss_is_counted(self, cache):
+        assert cache.get(URL) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_survive_reopen(self, cache):
+        cache.put(URL, b"{}")
+        reopened = ResponseCache(cache.path, ttl=60)
+        assert reopened.get(URL).body == b"{}"
+
+    def test_expired_entry_is_stale(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=-1)
+        cache.put(URL, b"{}")
+        assert not cache.get(URL).fresh
+
+    def test_size_based_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttl=60, max_bytes=250)
+        for i in range(5):
+            cache.put(f"{URL}{i}", b"x" * 100)
+        stats = cache.stats()
+        assert stats["bytes"] <= 250
+        assert stats["evictions"] >= 3
+        assert cache.get(f"{URL}4") is not None, "most recent entry is kept"
+
+
+class TestCachedGetJson:
+    def test_second_call_is_served_from_cache(self, cache, monkeypatch):
+        calls = []
+
+        def fake_get(url, headers=None):
+            calls.append(url)
+            return FakeResponse(body=BODY, headers={"ETag": '"v1"'})
+        monkeypatch.setattr("requests.get", fake_get)
+
+        assert pokeapi.get_json(URL) == BODY
+        assert pokeapi.get_json(URL) == BODY
+        assert len(calls) == 1
+
+    def test_stale_entry_is_revalidated(self, cache, monkeypatch):
+        cache.ttl = -1
+        cache.put(URL, json.dumps(BODY).encode(), etag='"v1"')
+        seen_headers = []
+
+        def fake_get(url, headers=None):
+            seen_headers.append(headers)
+            return FakeResponse(status_code=304)
+        monkeypatch.setattr("requests.get", fake_get)
+
+        assert pokeapi.get_json(URL) == BODY
+        assert seen_headers == [{"If-None-Match": '"v1"'}]
+        assert cache.stats()["revalidations"] == 1
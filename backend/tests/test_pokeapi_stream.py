@@ -0,0 +1,55 @@
+# tests/test_pokeapi_stream.py
+import json
+import pytest
+from app.pokeapi import Pokemon
+from app.pokeapi_stream import extract_pokemon
+from tests.test_poke_utils import MockPokemon
+
+
+def _payload(name="pikachu", pokemon_id=25):
+    data = MockPokemon(name, pokemon_id=pokemon_id).raw_data
+    # Bulk the stream up with paths the extractor must skip
+    data["moves"].append({
+        "move": {"name": "thunderbolt", "url": "https://pokeapi.co/api/v2/move/85/"},
+        "version_group_details": [
+            {"level_learned_at": 0, "move_learn_method": {"name": "machine"},
+             "version_group": {"name": f"vg-{i}", "url": "https://pokeapi.co/api/v2/version-group/1/"}}
+            for i in range(20)
+        ],
+    })
+    data["sprites"]["other"] = {"home": {"front_default": "https://example.com/home.png"}}
+    data["game_indices"] = [{"game_index": pokemon_id, "version": {"name": "red"}}]
+    data["species"] = {"name": name, "url": "https://pokeapi.co/api/v2/pokemon-species/25/"}
+    return data
+
+
+class TestExtractPokemon:
+    def test_keeps_only_card_fields(self):
+        fields = extract_pokemon(json.dumps(_payload()).encode())
+        assert fields["id"] == 25
+        assert fields["name"] == "pikachu"
+        assert fields["types"] == ["electric"]
+        assert fields["sprite"] == "https://example.com/pikachu.png"
+        assert fields["stats"]["hp"] == 35
+        assert fields["moves"] == [
+            ("thunder-shock", "https://pokeapi.co/api/v2/move/84/", True),
+            ("quick-attack", "https://pokeapi.co/api/v2/move/98/", True),
+            ("thunderbolt", "https://pokeapi.co/api/v2/move/85/", False),
+        ]
+
+    def test_layout_does_not_matter(self):
+        data = _payload("chikorita", 152)
+        compact = Pokemon.from_stream(json.dumps(data).encode())
+        indented = Pokemon.from_stream(json.dumps(data, indent=4).encode())
+        for field in Pokemon.__slots__:
+            assert getattr(indented, field) == getattr(compact, field), field
+        assert (compact.id, compact.name, compact.types) == (152, "Chikorita", ("Electric",))
+        assert compact.moves == ("https://pokeapi.co/api/v2/move/84/", "https://pokeapi.co/api/v2/move/98/")
+
+    def test_nested_resource(self):
+        line = json.dumps({"url": "https://pokeapi.co/api/v2/pokemon/25/", "data": _payload()})
+        assert extract_pokemon(line.encode(), prefix="data")["id"] == 25
+
+    def test_rejects_other_resources(self):
+        with pytest.raises(ValueError):
+            extract_pokemon(b'{"results": []}')
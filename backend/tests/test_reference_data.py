@@ -0,0 +1,99 @@
+# tests/test_reference_data.py
+import json
+from app import reference_data
+from app.pokeapi import Pokemon
+from app.reference_data import TypeChart, get_type_chart
+
+
+class TestTypeChart:
+    def test_bundled_chart_is_complete(self):
+        chart = get_type_chart()
+        assert len(chart.types) == 18
+        assert chart.multiplier("water", "fire") == 2
+        assert chart.multiplier("fire", "water") == 0.5
+        assert chart.multiplier("normal", "ghost") == 0
+
+    def test_damage_relations(self):
+        """Weakness/resistance match PokeAPI's double/half_damage_from"""
+        relations = get_type_chart().damage_relations("Fire")
+        assert relations["weakness"] == ["Ground", "Rock", "Water"]
+        assert relations["resistance"] == ["Bug", "Steel", "Fire", "Grass", "Ice", "Fairy"]
+
+    def test_immunities_are_not_resistances(self):
+        relations = get_type_chart().damage_relations("ghost")
+        assert "Normal" not in relations["resistance"]
+        assert "Fighting" not in relations["resistance"]
+
+    def test_unknown_type_has_no_relations(self):
+        assert get_type_chart().damage_relations("stellar") == {"weakness": [], "resistance": []}
+
+    def test_pokemon_uses_chart_without_network(self, monkeypatch):
+        def fail(url):
+            raise AssertionError(f"unexpected request to {url}")
+        monkeypatch.setattr("requests.get", fail)
+        p = Pokemon.__new__(Pokemon)
+        p.types = ["Electric"]
+        assert p.fetch_damage_relations() == {"weakness": ["Ground"],
+                                              "resistance": ["Flying", "Steel", "Electric"]}
+
+    def test_refresh_rebuilds_from_pokeapi(self, monkeypatch, tmp_path):
+        bundled = get_type_chart()
+        n = len(bundled.types)
+
+        def fake_get_json(url):
+            attacking = url.rstrip("/").rsplit("/", 1)[-1]
+            a = bundled.types.index(attacking)
+            row = bundled.to_dict()["matrix"][a]
+            by_value = lambda v: [{"name": bundled.types[d]} for d in range(n) if row[d] == v]
+            return {"damage_relations": {
+                "double_damage_to": by_value(2),
+                "half_damage_to": by_value(0.5),
+                "no_damage_to": by_value(0),
+            }}
+        monkeypatch.setattr("app.pokeapi.get_json", fake_get_json)
+        monkeypatch.setattr(reference_data, "_type_chart", bundled)
+
+        path = tmp_path / "typeChart.json"
+        chart = reference_data.refresh_type_chart(path)
+        assert chart.to_dict() == bundled.to_dict()
+        assert TypeChart.load(path).to_dict() == json.loads(reference_data.TYPE_CHART_PATH.read_text())
+
+
+class TestGenerationRegions:
+    def test_bundled_generations(self, monkeypatch):
+        def fail(url):
+            raise AssertionError(f"unexpected request to {url}")
+        monkeypatch.setattr("requests.get", fail)
+        assert reference_data.region_for_generation("https://pokeapi.co/api/v2/generation/1/") == "kanto"
+        assert reference_data.region_for_generation("https://pokeapi.co/api/v2/generation/9/") == "paldea"
+        assert reference_data.is_generation_known("https://pokeapi.co/api/v2/generation/4/")
+
+    def test_unknown_generation_is_fetched_once(self, monkeypatch):
+        calls = []
+
+        def fake_get_json(url):
+            calls.append(url)
+            return {"main_region": {"name": "kitakami"}}
+        monkeypatch.setattr("app.pokeapi.get_json", fake_get_json)
+        monkeypatch.setattr(reference_data, "_generation_regions", dict(reference_data._regions()))
+
+        url = "https://pokeapi.co/api/v2/generation/42/"
+        assert reference_data.region_for_generation(url) == "kitakami"
+        assert reference_data.region_for_generation(url) == "kitakami"
+        assert calls == [url]
+
+    def test_refresh_writes_table(self, monkeypatch, tmp_path):
+        pages = {
+            reference_data.GENERATION_URL: {"results": [
+                {"url": f"{reference_data.GENERATION_URL}2/"},
+                {"url": f"{reference_data.GENERATION_URL}1/"},
+            ]},
+            f"{reference_data.GENERATION_URL}1/": {"id": 1, "main_region": {"name": "kanto"}},
+            f"{reference_data.GENERATION_URL}2/": {"id": 2, "main_region": {"name": "johto"}},
+        }
+        monkeypatch.setattr("app.pokeapi.get_json", pages.__getitem__)
+        monkeypatch.setattr(reference_data, "_generation_regions", None)
+
+        path = tmp_path / "generationRegions.json"
+        assert reference_data.refresh_generation_regions(path) == {"1": "kanto", "2": "johto"}
+        assert json.loads(path.read_text()) == {"1": "kanto", "2": "johto"}
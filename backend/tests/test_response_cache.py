@@ -0,0 +1,51 @@
+# tests/test_response_cache.py
+from unittest.mock import patch
+from app.response_cache import ResponseCache
+from app.crud import create_card
+from tests.test_models import TestCard as Card
+from tests.test_crud import _bulk_card
+
+
+class TestResponseCache:
+    def test_entries_retire_with_the_version(self):
+        cache = ResponseCache()
+        version, body, _ = cache.get(("cards", "[]"))
+        assert body is None
+        cache.put(("cards", "[]"), version, b"{}", "tag")
+        assert cache.get(("cards", "[]")) == (version, b"{}", "tag")
+        cache.invalidate()
+        assert cache.get(("cards", "[]"))[1] is None
+
+    def test_response_built_across_a_write_is_dropped(self):
+        cache = ResponseCache()
+        version, _, _ = cache.get(("cards", "[]"))
+        cache.invalidate()  # a card write lands while the response is built
+        cache.put(("cards", "[]"), version, b"{}", "tag")
+        assert cache.stats()["entries"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put((key,), 0, b"{}", key)
+        cache.get(("a",))
+        cache.put(("c",), 0, b"{}", "c")
+        assert cache.get(("b",))[1] is None and cache.get(("a",))[1] == b"{}"
+
+    def test_entries_expire_after_the_ttl(self):
+        """Writes from other processes never bump the version; the TTL bounds how stale a body gets"""
+        cache = ResponseCache(ttl=60)
+        with patch("app.response_cache.time.monotonic", return_value=1000.0):
+            version, _, _ = cache.get(("cards", "[]"))
+            cache.put(("cards", "[]"), version, b"{}", "tag")
+        with patch("app.response_cache.time.monotonic", return_value=1059.0):
+            assert cache.get(("cards", "[]"))[1] == b"{}"
+        with patch("app.response_cache.time.monotonic", return_value=1061.0):
+            assert cache.get(("cards", "[]"))[1] is None
+        assert cache.stats()["entries"] == 0
+
+    @patch("app.crud.Card", Card)
+    def test_card_writes_bump_the_catalog_version(self, db_session):
+        from app.response_cache import catalog_responses
+        version = catalog_responses.version
+        create_card(db_session, **_bulk_card(1))
+        assert catalog_responses.version == version + 1
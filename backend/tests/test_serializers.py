@@ -0,0 +1,48 @@
+# tests/test_serializers.py
+import uuid
+import decimal
+import orjson
+from datetime import datetime, UTC
+from unittest.mock import patch
+from app import serializers
+from app.crud import create_card, get_card_by_id
+from tests.test_models import TestCard as Card
+from tests.test_crud import _bulk_card
+
+
+class TestSerializers:
+    def test_encodes_uuids_datetimes_and_decimals(self):
+        card_id = uuid.uuid4()
+        body = serializers.dumps({"id": card_id, "at": datetime(2025, 1, 2, 3, 4, 5),
+                                  "price": decimal.Decimal("1.50")})
+        assert orjson.loads(body) == {"id": str(card_id), "at": "2025-01-02T03:04:05+00:00",
+                                      "price": "1.50"}
+
+    def test_rows_encode_like_their_to_dict(self):
+        card = Card(id=uuid.uuid4(), created_at=datetime.now(UTC), name="Pikachu", weakness=None)
+        assert orjson.loads(serializers.dumps([card])) == orjson.loads(serializers.dumps([card.to_dict()]))
+
+    def test_unknown_types_are_rejected(self):
+        try:
+            serializers.dumps({"bad": object()})
+        except TypeError:
+            return
+        raise AssertionError("object() should not serialize")
+
+    def test_provider_honours_sort_keys_and_indent(self, app):
+        text = app.json.dumps({"b": 1, "a": 2}, sort_keys=True, indent=2)
+        assert text == '{\n  "a": 2,\n  "b": 1\n}'
+        assert app.json.loads(text) == {"a": 2, "b": 1}
+
+    def test_openapi_spec_still_serves(self, client):
+        response = client.get("/openapi.json")
+        assert response.status_code == 200
+        assert "paths" in response.get_json()
+
+    @patch("app.crud.Card", Card)
+    def test_to_dict_reloads_expired_rows(self, db_session):
+        card = create_card(db_session, **_bulk_card(1))
+        expected = card.to_dict()
+        db_session.expire(card)
+        assert card.to_dict() == expected
+        assert get_card_by_id(db_session, card.id).to_dict() == expected
@@ -0,0 +1,82 @@
+# tests/test_singleflight.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return b"body"
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: flight.do("url", fetch), range(8)))
+        assert results == [b"body"] * 8
+        assert len(calls) == 1
+        assert flight.stats() == {"fetches": 1, "coalesced": 7, "in_flight": 0}
+
+    def test_keys_are_independent(self):
+        flight = SingleFlight()
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+
+    def test_finished_key_is_fetched_again(self):
+        flight = SingleFlight()
+        calls = []
+        flight.do("url", lambda: calls.append(1))
+        flight.do("url", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def fetch():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("404")
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flight.do, "url", fetch)
+            started.wait()
+            follower = pool.submit(flight.do, "url", fetch)
+            for future in (leader, follower):
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_coroutines_wait_on_a_thread_led_fetch(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def fetch():
+            started.set()
+            time.sleep(0.05)
+            return b"body"
+
+        async def follow():
+            started.wait()
+            return await flight.do_async("url", pytest.fail)
+        with ThreadPoolExecutor(1) as pool:
+            leader = pool.submit(flight.do, "url", fetch)
+            assert asyncio.run(follow()) == b"body"
+            assert leader.result() == b"body"
+
+    def test_coroutines_in_one_loop_coalesce(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"body"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("url", fetch) for _ in range(5)))
+        assert asyncio.run(main()) == [b"body"] * 5
+        assert len(calls) == 1
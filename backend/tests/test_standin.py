@@ -0,0 +1,23 @@
+# tests/test_standin.py
+import requests
+from benchmarks.fixtures import write_dump
+from benchmarks.standin import serve
+from app.datasource import open_source
+
+
+class TestStandIn:
+    def test_serves_dump_with_rewritten_links(self, tmp_path):
+        dump = write_dump(tmp_path / "dump.jsonl", count=2, moves=5, moves_per_pokemon=3)
+        with serve(str(dump)) as server:
+            data = requests.get(f"{server.base_url}pokemon/1/").json()
+            assert data["name"] == "synthmon-1"
+            assert all(m["move"]["url"].startswith(server.base_url) for m in data["moves"])
+            assert requests.get(f"{server.base_url}pokemon/99/").status_code == 404
+            assert server.stats() == {"requests": 2, "pokemon": 2, "not_found": 1}
+
+    def test_rate_limit_returns_429(self, tmp_path):
+        dump = write_dump(tmp_path / "dump.jsonl", count=1, moves=1, moves_per_pokemon=1)
+        with serve(open_source(dump), rate=1, burst=2) as server:
+            statuses = [requests.get(f"{server.base_url}move/1/").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        assert server.stats()["rate_limited"] == 1
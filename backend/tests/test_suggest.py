@@ -0,0 +1,79 @@
+# tests/test_suggest.py
+from app.suggest import NameIndex
+from tests.test_crud import _bulk_card
+
+
+def _index(rows):
+    index = NameIndex()
+    index.load(lambda: rows)
+    return index
+
+
+class TestNameIndex:
+    ROWS = [("1", "Pikachu", 25), ("2", "Pichu", 172), ("3", "Raichu", 26),
+            ("4", "pikachu libre", None), ("5", "Pidgey", 16), ("6", None, 7)]
+
+    def test_prefix_is_case_insensitive_and_alphabetical(self):
+        index = _index(self.ROWS)
+        assert [s["name"] for s in index.suggest("PI")] == ["Pichu", "Pidgey", "Pikachu", "pikachu libre"]
+        assert index.suggest("pika", limit=1) == [{"id": "1", "name": "Pikachu", "collector_number": 25}]
+        assert index.suggest("pikachu l") == [{"id": "4", "name": "pikachu libre", "collector_number": None}]
+        assert index.suggest("zz") == []
+        assert len(index) == 5
+
+    def test_writes_update_the_index(self):
+        index = _index(self.ROWS)
+        index.put("3", "Alolan Raichu", 26)
+        index.put("7", "Pikipek", 731)
+        index.remove("2")
+        assert [s["name"] for s in index.suggest("pi")] == ["Pidgey", "Pikachu", "pikachu libre", "Pikipek"]
+        assert [s["id"] for s in index.suggest("a")] == ["3"]
+        assert index.suggest("rai") == []
+
+    def test_writes_during_a_load_trigger_a_reread(self):
+        index = NameIndex()
+        reads = []
+
+        def read_rows():
+            reads.append(1)
+            if len(reads) == 1:
+                index.put("9", "Mew", 151)  # committed while the table was being read
+                return self.ROWS
+            return self.ROWS + [("9", "Mew", 151)]
+        index.load(read_rows)
+        assert len(reads) == 2
+        assert index.suggest("mew")[0]["id"] == "9"
+
+    def test_similar_names(self):
+        index = _index(self.ROWS + [("7", "PIKACHU", 8)])
+        assert index.similar("pikachuu") == ["PIKACHU", "Pikachu"]
+        assert index.similar("rachu") == ["Raichu"]
+        assert index.similar("pxy") == []  # too short to guess at
+        index.remove("1")
+        index.remove("7")
+        index.put("8", "Pikachi", 9)
+        assert index.similar("pikachuu") == ["Pikachi"]
+
+    def test_reset_unloads(self):
+        index = _index(self.ROWS)
+        index.reset()
+        index.put("1", "Pikachu", 25)
+        assert not index.loaded and index.suggest("p") == []
+
+
+class TestFuzzyFallback:
+    def test_misspelled_name_lists_close_matches(self, monkeypatch):
+        from tests.test_models import TestCard
+        from app import logic
+        monkeypatch.setattr("app.crud.Card", TestCard)
+        logic.import_cards_logic([_bulk_card(i, name=name) for i, name in
+                                  enumerate(["Charizard", "Charmander", "Pikachu"], 1)])
+        response, status = logic.list_cards(1, None, "charizrd", 12)
+        assert status == 200
+        assert [card["name"] for card in response["data"]] == ["Charizard"]
+        assert response["pagination"]["total_count"] == 1
+        assert "close matches" in response["message"]
+        response, _ = logic.list_cards(1, "water", "charizrd", 12)
+        assert response["data"] == []
+        response, _ = logic.list_cards(1, None, "charizard", 12)
+        assert response["message"] == "Card List retrieved"
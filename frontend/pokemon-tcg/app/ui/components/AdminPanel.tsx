@@ -73,9 +73,10 @@ const AdminPanel = () => {
                 'Content-Type': 'application/json',
                 'Authorization': `Bearer ${session?.accessToken}`
             }
-        }).then(response => {
+        }).then(async response => {
             if (response.ok) {
-                console.log("Card range imported successfully");
+                const { data: job } = await response.json();
+                console.log(`Card range import queued as job ${job.id}`);
             } else {
                 console.error("Failed to import card range");
             }